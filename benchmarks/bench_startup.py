@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark for importing marketopy_cpanella and building a client
+
+Each sample runs in a fresh interpreter that imports the package, builds a
+Marketo client and touches every sub-client with sockets disabled, so any
+network I/O during construction fails the run. The script exits non-zero when
+the median time exceeds the budget or when heavy modules are imported eagerly.
+
+    python benchmarks/bench_startup.py --budget-ms 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Modules that must not be imported until the first real request
+DEFERRED_MODULES = ["requests", "urllib3", "pandas"]
+
+SUB_CLIENTS = [
+    "lead_database", "asset", "user_management", "identity", "activities", "fields",
+    "named_accounts", "opportunity_roles", "program_members", "companies",
+    "custom_objects", "field_list", "field_types", "opportunities", "sales_persons",
+]
+
+CHILD = """
+import json, socket, sys, time
+def _no_network(*args, **kwargs):
+    raise RuntimeError("network I/O during client construction")
+socket.socket.connect = _no_network
+socket.create_connection = _no_network
+socket.getaddrinfo = _no_network
+started = time.perf_counter()
+from marketopy_cpanella import Marketo
+imported = time.perf_counter()
+mk = Marketo("000-AAA-000", "client-id", "client-secret")
+constructed = time.perf_counter()
+loaded = [m for m in {deferred!r} if m in sys.modules]
+for name in {sub_clients!r}:
+    getattr(mk, name)
+touched = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "sub_clients_ms": (touched - constructed) * 1000,
+    "eager_modules": loaded,
+}}))
+"""
+
+
+def run_sample():
+    code = CHILD.format(deferred=DEFERRED_MODULES, sub_clients=SUB_CLIENTS)
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                            stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="median budget for import + construction")
+    args = parser.parse_args()
+
+    samples = [run_sample() for _ in range(args.samples)]
+    report = {}
+    for key in ("import_ms", "construct_ms", "sub_clients_ms"):
+        values = sorted(sample[key] for sample in samples)
+        report[key] = {"median": statistics.median(values), "max": values[-1]}
+        print("{0:<16} median {1:8.2f} ms   max {2:8.2f} ms".format(
+            key, report[key]["median"], report[key]["max"]))
+
+    failures = []
+    eager = sorted({module for sample in samples for module in sample["eager_modules"]})
+    if eager:
+        failures.append("imported at construction: " + ", ".join(eager))
+    startup = report["import_ms"]["median"] + report["construct_ms"]["median"]
+    if startup > args.budget_ms:
+        failures.append("startup {0:.2f} ms exceeds budget {1:.2f} ms".format(startup, args.budget_ms))
+    for failure in failures:
+        print("FAIL: " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
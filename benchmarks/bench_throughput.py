@@ -0,0 +1,188 @@
+"""
+Throughput benchmark for the client's hot paths against an in-process fake Marketo
+
+Each scenario runs against a fresh client and a FakeMarketo server on
+127.0.0.1 with the given per-call latency, then once more under tracemalloc
+for peak memory. The scenarios cover lead reads by filter, single-lead
+lookups, bulk upserts, the merged activity stream, offset paging of program
+members, and bulk upserts against a server enforcing Marketo's 606 and 615
+limits. Reported per scenario:
+
+- calls/s: HTTP calls per second, including retries
+- records/s: records read or written per second
+- p50/p99: per-call latency from the client's after_response hook
+- peak memory: tracemalloc peak, including the fake server's own allocations
+
+    python benchmarks/bench_throughput.py --latency-ms 20 --records 30000
+    python benchmarks/bench_throughput.py --scenarios bulk_upserts --json results.json
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_marketo import MAX_BATCH, FakeMarketo  # noqa: E402
+from marketopy_cpanella import Marketo, RetryPolicy  # noqa: E402
+
+SUB_CLIENTS = ["lead_database", "activities", "program_members"]
+
+
+def connect(url: str, **kwargs: Any) -> Marketo:
+    """A Marketo client whose token and API calls go to url"""
+    kwargs.setdefault("rate_limit_calls", 1000000)
+    kwargs.setdefault("retry_policy", RetryPolicy(backoff_base=0.05, backoff_max=1.0))
+    marketo = Marketo("000-AAA-000", "bench-client", "bench-secret", **kwargs)
+    marketo.auth.auth_url = (url + "/identity/oauth/token?grant_type=client_credentials"
+                             "&client_id={1}&client_secret={2}")
+    for name in SUB_CLIENTS:
+        getattr(marketo, name).base_url = url + "/rest"
+    return marketo
+
+
+# Scenarios take the client and the record count and return the records handled
+
+def lead_reads(marketo: Marketo, records: int) -> int:
+    ids = [str(lead_id) for lead_id in range(1, records + 1)]
+    return len(marketo.lead_database.get_leads("id", ids)["result"])
+
+
+def single_lookups(marketo: Marketo, records: int) -> int:
+    count = max(records // 30, 1)
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        responses = list(executor.map(marketo.lead_database.get_lead_by_id, range(1, count + 1)))
+    return sum(len(response["result"]) for response in responses)
+
+
+def bulk_upserts(marketo: Marketo, records: int) -> int:
+    leads = ({"email": f"new{index}@example.com", "firstName": "New"} for index in range(records))
+    return len(marketo.lead_database.bulk_create_or_update_leads(leads)["result"])
+
+
+def activity_stream(marketo: Marketo, records: int) -> int:
+    stream = marketo.activities.stream_activities("2024-01-01T00:00:00Z", range(1, 21))
+    count = 0
+    for _ in stream:
+        count += 1
+        if count >= records:
+            break
+    return count
+
+
+def offset_pagination(marketo: Marketo, records: int) -> int:
+    count = 0
+    for _ in marketo.program_members.iter_program_members(1000, max_return=200):
+        count += 1
+    return count
+
+
+SCENARIOS: Dict[str, Callable[[Marketo, int], int]] = {
+    "lead_reads": lead_reads,
+    "single_lookups": single_lookups,
+    "bulk_upserts": bulk_upserts,
+    "activity_stream": activity_stream,
+    "offset_pagination": offset_pagination,
+    "throttled_upserts": bulk_upserts,
+}
+
+
+def scenario_records(name: str, records: int) -> int:
+    if name == "throttled_upserts":
+        # At least two upsert calls, so the run can exceed a rate limit of one call
+        return max(records, 2 * MAX_BATCH)
+    return records
+
+
+def server_for(name: str, latency: float, records: int) -> FakeMarketo:
+    if name == "throttled_upserts":
+        # Half the calls the run makes fit in the rolling window, so 606 retries must happen
+        calls = -(-records // MAX_BATCH)
+        return FakeMarketo(latency=latency, leads=records, activities=records,
+                           program_members=records, rate_calls=max(calls // 2, 1),
+                           rate_period=1.0, max_concurrent=5)
+    return FakeMarketo(latency=latency, leads=records, activities=records, program_members=records)
+
+
+def run_once(name: str, latency: float, records: int, trace_memory: bool) -> Dict[str, Any]:
+    records = scenario_records(name, records)
+    with server_for(name, latency, records) as server:
+        marketo = connect(server.url)
+        latencies: List[float] = []
+        marketo.hooks.subscribe("after_response", lambda event: latencies.append(event.elapsed))
+        marketo.auth.getAuthToken()
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        handled = SCENARIOS[name](marketo, records)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+        retries = marketo.retry_stats["total_retries"]
+        throttled = server.stats["606"] + server.stats["615"]
+        marketo.session.close()
+    if name == "throttled_upserts" and not retries:
+        raise RuntimeError("throttled_upserts was never throttled; the calls spanned more than "
+                           "the fake's rate window, so lower --latency-ms or raise --records")
+    latencies.sort()
+    return {
+        "records": handled,
+        "calls": len(latencies),
+        "seconds": elapsed,
+        "calls_per_second": len(latencies) / elapsed,
+        "records_per_second": handled / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p99_ms": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+        if latencies else None,
+        "retries": retries,
+        "throttled": throttled,
+        "peak_memory_mb": peak / 1e6 if peak is not None else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="per-call server latency")
+    parser.add_argument("--records", type=int, default=30000, help="records per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    results = {}
+    print("{0:<18} {1:>8} {2:>6} {3:>9} {4:>11} {5:>8} {6:>8} {7:>7} {8:>9}".format(
+        "scenario", "records", "calls", "calls/s", "records/s", "p50 ms", "p99 ms",
+        "retries", "peak MB"))
+    for name in args.scenarios:
+        result = run_once(name, latency, args.records, trace_memory=False)
+        if not args.no_memory:
+            result["peak_memory_mb"] = run_once(name, latency, args.records,
+                                                trace_memory=True)["peak_memory_mb"]
+        results[name] = result
+        print("{0:<18} {records:>8} {calls:>6} {calls_per_second:>9.1f} {records_per_second:>11.1f} "
+              "{p50:>8} {p99:>8} {retries:>7} {peak:>9}".format(
+                  name,
+                  p50="-" if result["p50_ms"] is None else "{0:.2f}".format(result["p50_ms"]),
+                  p99="-" if result["p99_ms"] is None else "{0:.2f}".format(result["p99_ms"]),
+                  peak="-" if result["peak_memory_mb"] is None
+                  else "{0:.2f}".format(result["peak_memory_mb"]),
+                  **result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "records": args.records,
+                       "scenarios": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+In-process stand-in for the Marketo REST API, for benchmarks
+
+Serves the endpoints the hot paths use, over HTTP/1.1 keep-alive on
+127.0.0.1:
+
+- OAuth: /identity/oauth/token issues tokens, and other calls need a valid one (601 otherwise)
+- Leads: lookups by ID, filtered reads with nextPageToken paging (GET, or POST
+  with _method=GET), and upserts of at most 300 records
+- Activities: pagingToken.json positioned at sinceDatetime, and nextPageToken pages of
+  activities.json with moreResult; activity N is dated N-1 seconds after 2024-01-01
+- Program members: maxReturn/offset paging
+
+Every call can be delayed by a fixed latency. Optional limits answer 606 once
+more than rate_calls calls arrive within rate_period seconds, and 615 once
+more than max_concurrent calls are in flight, the way Marketo does: HTTP 200
+with success false.
+
+    with FakeMarketo(latency=0.02, rate_calls=100, rate_period=20) as server:
+        client = connect(server.url)
+"""
+import collections
+import http.server
+import itertools
+import json
+import math
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+MAX_BATCH = 300
+ACTIVITY_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeMarketo:
+    def __init__(self, latency: float = 0.0, leads: int = 100000, activities: int = 100000,
+                 program_members: int = 100000, rate_calls: Optional[int] = None,
+                 rate_period: float = 20.0, max_concurrent: Optional[int] = None,
+                 token_ttl: int = 3600):
+        """
+        Args:
+            latency: Seconds every call is delayed by
+            leads: Leads in the database, with IDs 1..leads
+            activities: Activities served by every activity chain
+            program_members: Members of every program
+            rate_calls: Calls allowed per rolling rate_period before 606 (unlimited when None)
+            rate_period: Length of the rolling window in seconds
+            max_concurrent: Calls allowed in flight before 615 (unlimited when None)
+            token_ttl: expires_in of issued tokens
+        """
+        self.latency = latency
+        self.leads = leads
+        self.activities = activities
+        self.program_members = program_members
+        self.rate_calls = rate_calls
+        self.rate_period = rate_period
+        self.max_concurrent = max_concurrent
+        self.token_ttl = token_ttl
+        self.stats = collections.Counter()
+        self._lock = threading.Lock()
+        self._tokens = set()
+        self._window = collections.deque()
+        self._in_flight = 0
+        self._emails: Dict[str, int] = {}
+        self._next_id = itertools.count(leads + 1)
+        self._server: Optional[http.server.ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, port: int = 0) -> "FakeMarketo":
+        server = _Server(("127.0.0.1", port), _handler(self))
+        self._server = server
+        threading.Thread(target=server.serve_forever, name="fake-marketo", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeMarketo":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # Request handling
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: bytes,
+               headers: Any) -> Dict[str, Any]:
+        if path == "/identity/oauth/token":
+            return self._issue_token()
+        if method == "POST" and query.get("_method") == "GET":
+            query = dict(query, **{key: values[0] for key, values in
+                                   parse_qs(body.decode("utf-8")).items()})
+            method = "GET"
+        payload = json.loads(body) if method == "POST" and body else None
+        token = (headers.get("Authorization") or "").replace("Bearer ", "", 1)
+        with self._lock:
+            self.stats["calls"] += 1
+            if token not in self._tokens:
+                self.stats["601"] += 1
+                return _error("601", "Access token invalid")
+            if self.max_concurrent is not None and self._in_flight >= self.max_concurrent:
+                self.stats["615"] += 1
+                return _error("615", "Concurrent access limit reached")
+            now = time.monotonic()
+            while self._window and self._window[0] <= now - self.rate_period:
+                self._window.popleft()
+            if self.rate_calls is not None and len(self._window) >= self.rate_calls:
+                self.stats["606"] += 1
+                return _error("606", "Max rate limit exceeded")
+            self._window.append(now)
+            self._in_flight += 1
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self._route(method, path, query, payload)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _issue_token(self) -> Dict[str, Any]:
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens.add(token)
+            self.stats["tokens"] += 1
+        return {"access_token": token, "token_type": "bearer",
+                "expires_in": self.token_ttl, "scope": "bench@example.com"}
+
+    def _route(self, method: str, path: str, query: Dict[str, str],
+               payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if path == "/rest/v1/leads.json":
+            if method == "GET":
+                return self._get_leads(query)
+            return self._upsert_leads(payload or {})
+        if path.startswith("/rest/v1/leads/") and path[len("/rest/v1/leads/"):-5].isdigit():
+            lead_id = int(path[len("/rest/v1/leads/"):-5])
+            return _success([self._lead(lead_id)] if lead_id <= self.leads else [])
+        if path == "/rest/v1/activities/pagingToken.json":
+            return _success([], nextPageToken=_token("activities", _activity_position(query)))
+        if path == "/rest/v1/activities.json":
+            return self._get_activities(query)
+        if path.startswith("/rest/v1/programs/") and path.endswith("/members.json"):
+            return self._get_program_members(query)
+        return _error("404", f"unknown endpoint {path}")
+
+    def _lead(self, lead_id: int) -> Dict[str, Any]:
+        return {"id": lead_id, "email": f"lead{lead_id}@example.com", "firstName": "Lead",
+                "lastName": str(lead_id), "updatedAt": "2024-01-01T00:00:00Z",
+                "createdAt": "2023-01-01T00:00:00Z"}
+
+    def _get_leads(self, query: Dict[str, str]) -> Dict[str, Any]:
+        filter_type = query.get("filterType")
+        values = [value for value in query.get("filterValues", "").split(",") if value]
+        if len(values) > MAX_BATCH:
+            return _error("1003", "Too many filter values")
+        if filter_type == "id":
+            ids = [int(value) for value in values if value.isdigit() and 0 < int(value) <= self.leads]
+        elif filter_type == "email":
+            ids = []
+            for value in values:
+                local = value.split("@", 1)[0]
+                if local.startswith("lead") and local[4:].isdigit() and 0 < int(local[4:]) <= self.leads:
+                    ids.append(int(local[4:]))
+        else:
+            return _error("1003", f"Invalid filterType {filter_type}")
+        batch_size = min(int(query.get("batchSize") or MAX_BATCH), MAX_BATCH)
+        start = _offset(query.get("nextPageToken"))
+        page = [self._lead(lead_id) for lead_id in ids[start:start + batch_size]]
+        if start + batch_size < len(ids):
+            return _success(page, nextPageToken=_token("leads", start + batch_size))
+        return _success(page)
+
+    def _upsert_leads(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        records = payload.get("input") or []
+        if len(records) > MAX_BATCH:
+            return _error("1003", "Too many records in request")
+        results = []
+        with self._lock:
+            for record in records:
+                email = record.get("email")
+                if record.get("id"):
+                    results.append({"id": record["id"], "status": "updated"})
+                elif email in self._emails:
+                    results.append({"id": self._emails[email], "status": "updated"})
+                elif email:
+                    self._emails[email] = next(self._next_id)
+                    results.append({"id": self._emails[email], "status": "created"})
+                else:
+                    results.append({"status": "skipped",
+                                    "reasons": [{"code": "1003", "message": "Missing email"}]})
+        return _success(results)
+
+    def _get_activities(self, query: Dict[str, str]) -> Dict[str, Any]:
+        type_ids = [int(value) for value in query.get("activityTypeIds", "1").split(",")]
+        start = _offset(query.get("nextPageToken"))
+        end = min(start + MAX_BATCH, self.activities)
+        page = [{
+            "id": position + 1,
+            "marketoGUID": str(position + 1),
+            "leadId": position % self.leads + 1,
+            "activityDate": (ACTIVITY_EPOCH + timedelta(seconds=position)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "activityTypeId": type_ids[position % len(type_ids)],
+            "primaryAttributeValueId": 1,
+            "primaryAttributeValue": "Value",
+            "attributes": [{"name": "Client IP Address", "value": "127.0.0.1"},
+                           {"name": "Score", "value": str(position % 100)}]
+        } for position in range(start, end)]
+        return _success(page, nextPageToken=_token("activities", end), moreResult=end < self.activities)
+
+    def _get_program_members(self, query: Dict[str, str]) -> Dict[str, Any]:
+        offset = int(query.get("offset") or 0)
+        max_return = min(int(query.get("maxReturn") or 200), 200)
+        end = min(offset + max_return, self.program_members)
+        if offset >= end:
+            return {"success": True, "requestId": _request_id(),
+                    "warnings": ["No assets found for the given search criteria."]}
+        return _success([{"id": position + 1, "leadId": position % self.leads + 1,
+                          "progressionStatus": "Member", "reachedSuccess": False}
+                         for position in range(offset, end)])
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # Read by server_activate's listen(); benchmarks open bursts of keep-alive connections
+    request_queue_size = 128
+
+
+def _request_id() -> str:
+    return f"{uuid.uuid4().hex[:5]}#{int(time.time() * 1000):x}"
+
+
+def _success(result: List[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+    return dict({"requestId": _request_id(), "success": True, "result": result}, **extra)
+
+
+def _error(code: str, message: str) -> Dict[str, Any]:
+    return {"requestId": _request_id(), "success": False,
+            "errors": [{"code": code, "message": message}]}
+
+
+def _token(kind: str, offset: int) -> str:
+    return f"{kind}:{offset}"
+
+
+def _activity_position(query: Dict[str, str]) -> int:
+    since = query.get("sinceDatetime")
+    if not since:
+        return 0
+    seconds = (datetime.fromisoformat(since.replace("Z", "+00:00")) - ACTIVITY_EPOCH).total_seconds()
+    return max(0, math.ceil(seconds))
+
+
+def _offset(token: Optional[str]) -> int:
+    return int(token.rsplit(":", 1)[1]) if token else 0
+
+
+def _handler(server: FakeMarketo) -> type:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; Nagle would hold the body for an ACK
+        disable_nagle_algorithm = True
+
+        def _serve(self) -> None:
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            response = json.dumps(server.handle(self.command, url.path, query, body,
+                                                self.headers)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        do_GET = do_POST = do_DELETE = _serve
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def _parse_args() -> Tuple[float, int]:
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the fake Marketo server in the foreground")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+    return args.latency_ms / 1000, args.port
+
+
+if __name__ == "__main__":
+    latency, port = _parse_args()
+    fake = FakeMarketo(latency=latency).start(port)
+    print(f"fake Marketo listening on {fake.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
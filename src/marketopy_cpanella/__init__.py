@@ -1,5 +1,38 @@
+import importlib
 from .marketo import Marketo
 from .authentication import Authentication
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .lead_cache import LeadCache
+from .hooks import Hooks, RequestEvent
+from .exceptions import MarketoError, MarketoAPIError, QuotaExceededError
 
 __version__ = "0.1.0"
-__all__ = ["Marketo", "Authentication"]
+__all__ = ["Marketo", "AsyncMarketo", "MultiMarketo", "InstanceResult", "Authentication", "RateLimiter", "RetryPolicy",
+           "CheckpointStore", "FileCheckpointStore", "SQLiteCheckpointStore",
+           "ActivityTypeRegistry", "ColumnarBuffer", "LeadCache", "Hooks", "RequestEvent",
+           "QuotaGovernor", "QuotaStore", "FileQuotaStore", "SQLiteQuotaStore",
+           "MarketoError", "MarketoAPIError", "QuotaExceededError"]
+
+# Optional features are imported on first access so that importing the package stays cheap
+_LAZY_IMPORTS = {
+    "AsyncMarketo": "async_client",
+    "MultiMarketo": "multi",
+    "InstanceResult": "multi",
+    "CheckpointStore": "checkpoint",
+    "FileCheckpointStore": "checkpoint",
+    "SQLiteCheckpointStore": "checkpoint",
+    "ActivityTypeRegistry": "activity_types",
+    "ColumnarBuffer": "columnar",
+    "QuotaGovernor": "quota",
+    "QuotaStore": "quota",
+    "FileQuotaStore": "quota",
+    "SQLiteQuotaStore": "quota",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module_name}", __name__), name)
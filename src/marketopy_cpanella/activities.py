@@ -1,15 +1,78 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+import functools
+import itertools
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Union
+from .activity_types import ActivityTypeRegistry
+from .base import MarketoBase, sync_only
+from .batching import chunked, map_ordered
+from .checkpoint import CheckpointStore, iter_checkpointed_pages
+from .pagination import TokenStream, check_response, merge_token_streams
+
+MAX_ACTIVITY_TYPE_IDS = 10
+MAX_LEAD_IDS = 30
+
+
+def activity_date(activity: Dict[str, Any]) -> str:
+    """Sort key for activities; ISO 8601 UTC timestamps order correctly as strings"""
+    return activity.get("activityDate") or ""
+
+
+def parse_datetime(value: Union[str, datetime]) -> datetime:
+    """Parse an ISO 8601 datetime, treating naive values as UTC"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def format_datetime(value: datetime) -> str:
+    """Format a datetime the way Marketo reports activityDate"""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 class Activities(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/activities"
         self.external_endpoint = f"{self.base_endpoint}/external"
+        self._registries: Dict[bool, ActivityTypeRegistry] = {}
 
     def get_activity_types(self) -> Dict[str, Any]:
-        """Get all available activity types and their definitions"""
-        return self._get(f"{self.base_endpoint}/types.json")
+        """Get all available activity types and their definitions (cacheable)"""
+        return self._get_cached(f"{self.base_endpoint}/types.json")
+
+    @sync_only
+    def get_activity_type_registry(self, parse_dates: bool = False,
+                                   refresh: bool = False) -> ActivityTypeRegistry:
+        """
+        Get a registry of activity type names and attribute schemas
+        
+        Built from get_activity_types once per parse_dates value and kept on
+        this client until a custom activity type is changed through it.
+        
+        Args:
+            parse_dates: Convert datetime and date attributes to datetime and date objects
+            refresh: Rebuild the registry from get_activity_types, e.g. after the
+                     types were changed by another client
+        """
+        registry = None if refresh else self._registries.get(parse_dates)
+        if registry is None:
+            registry = ActivityTypeRegistry.from_response(self.get_activity_types(), parse_dates)
+            self._registries[parse_dates] = registry
+        return registry
+
+    def decode_activities(self, activities: Iterable[Dict[str, Any]],
+                          registry: Optional[ActivityTypeRegistry] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Flatten activities into typed records with one field per attribute
+        
+        Args:
+            activities: Activities, e.g. from stream_activities or a result list
+            registry: Registry to decode with (default: get_activity_type_registry())
+        """
+        if registry is None:
+            registry = self.get_activity_type_registry()
+        return registry.decode_all(activities)
 
     def get_paging_token(self, since_datetime: str) -> Dict[str, Any]:
         """
@@ -44,6 +107,157 @@ class Activities(MarketoBase):
             
         return self._get(f"{self.base_endpoint}.json", params=params)
 
+    @sync_only
+    def stream_activities(self, since_datetime: str, activity_type_ids: Iterable[int],
+                          lead_ids: Optional[Iterable[int]] = None,
+                          list_id: Optional[int] = None,
+                          max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream activities for any number of activity types and leads
+        
+        The IDs are partitioned into groups within the API's limits of 10 activity
+        types and 30 leads per call. Every group's paging-token chain runs
+        concurrently from one shared paging token, and the results are yielded as
+        a single stream ordered by activityDate.
+        
+        Args:
+            since_datetime: ISO 8601 datetime to read activities from
+            activity_type_ids: Activity type IDs to include
+            lead_ids: Lead IDs to filter by
+            list_id: Filter activities to leads in this list
+            max_workers: Pages in flight at once (default: the rate limiter's concurrency cap)
+        """
+        token = check_response(self.get_paging_token(since_datetime))["nextPageToken"]
+        since = format_datetime(parse_datetime(since_datetime))
+        streams = [TokenStream(fetch, token, since=since)
+                   for fetch in self._activity_fetchers(activity_type_ids, lead_ids, list_id)]
+        return merge_token_streams(streams, activity_date, self._worker_count(max_workers))
+
+    @sync_only
+    def backfill_activities(self, since_datetime: Union[str, datetime],
+                            until_datetime: Union[str, datetime],
+                            activity_type_ids: Iterable[int], shards: int = 8,
+                            lead_ids: Optional[Iterable[int]] = None,
+                            list_id: Optional[int] = None,
+                            max_workers: Optional[int] = None,
+                            ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Backfill activities in [since, until) with time shards read concurrently
+        
+        The range is split into equal shards, each with its own paging token, so
+        many pages are in flight instead of one sequential token chain. Each
+        shard keeps only the activities dated within its own [start, end), so
+        shards neither overlap nor leave gaps and nothing has to be deduplicated.
+        
+        Args:
+            since_datetime: Start of the range (inclusive)
+            until_datetime: End of the range (exclusive)
+            activity_type_ids: Activity type IDs to include
+            shards: Number of time shards
+            lead_ids: Lead IDs to filter by
+            list_id: Filter activities to leads in this list
+            max_workers: Pages in flight at once (default: the rate limiter's concurrency cap)
+            ordered: Yield in activityDate order; otherwise yield pages as they arrive
+        """
+        since, until = parse_datetime(since_datetime), parse_datetime(until_datetime)
+        if until <= since:
+            raise ValueError("until_datetime must be after since_datetime")
+        shards = max(1, shards)
+        step = (until - since) / shards
+        bounds = [since + step * index for index in range(shards)] + [until]
+        workers = self._worker_count(max_workers)
+        tokens = list(map_ordered(
+            lambda start: check_response(self.get_paging_token(format_datetime(start)))["nextPageToken"],
+            bounds[:-1], workers))
+        fetchers = self._activity_fetchers(activity_type_ids, lead_ids, list_id)
+        streams = [TokenStream(fetch, token, until=format_datetime(end), since=format_datetime(start))
+                   for token, start, end in zip(tokens, bounds, bounds[1:]) for fetch in fetchers]
+        return merge_token_streams(streams, activity_date, workers, ordered=ordered)
+
+    @sync_only
+    def sync_activities(self, store: CheckpointStore, key: str, since_datetime: str,
+                        activity_type_ids: Optional[List[int]] = None,
+                        list_id: Optional[int] = None,
+                        lead_ids: Optional[List[int]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Resumable read of activities, yielding one page of records at a time
+        
+        The token of the next page and the latest activityDate are saved to
+        store once the caller asks for the following page, so a restarted sync
+        continues after the last page it finished. Starts from since_datetime
+        only when store has no checkpoint for key.
+        
+        Args:
+            store: Checkpoint store, e.g. FileCheckpointStore or SQLiteCheckpointStore
+            key: Name of this sync in the store
+            since_datetime: ISO 8601 datetime to start from on the first run
+            activity_type_ids: List of activity type IDs to filter by (max 10)
+            list_id: Filter activities to leads in this list
+            lead_ids: List of lead IDs to filter by (max 30)
+        """
+        return iter_checkpointed_pages(
+            store, key,
+            functools.partial(self.get_activities, activity_type_ids=activity_type_ids,
+                              list_id=list_id, lead_ids=lead_ids),
+            functools.partial(self._first_token, since_datetime))
+
+    @sync_only
+    def sync_lead_changes(self, store: CheckpointStore, key: str, since_datetime: str,
+                          fields: List[str]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Resumable read of data value changes, yielding one page of records at a time
+        
+        Args:
+            store: Checkpoint store, e.g. FileCheckpointStore or SQLiteCheckpointStore
+            key: Name of this sync in the store
+            since_datetime: ISO 8601 datetime to start from on the first run
+            fields: List of fields to get changes for
+        """
+        return iter_checkpointed_pages(
+            store, key, functools.partial(self.get_lead_changes, fields=fields),
+            functools.partial(self._first_token, since_datetime))
+
+    @sync_only
+    def sync_deleted_leads(self, store: CheckpointStore, key: str,
+                           since_datetime: str) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Resumable read of deleted lead activities, yielding one page of records at a time
+        
+        Args:
+            store: Checkpoint store, e.g. FileCheckpointStore or SQLiteCheckpointStore
+            key: Name of this sync in the store
+            since_datetime: ISO 8601 datetime to start from on the first run
+        """
+        return iter_checkpointed_pages(
+            store, key, self.get_deleted_leads,
+            functools.partial(self._first_token, since_datetime))
+
+    def _first_token(self, since_datetime: str, high_water_mark: Optional[str] = None) -> str:
+        # A completed sync restarts from its high-water mark instead of since_datetime
+        return check_response(self.get_paging_token(high_water_mark or since_datetime))["nextPageToken"]
+
+    def _activity_fetchers(self, activity_type_ids: Iterable[int],
+                           lead_ids: Optional[Iterable[int]] = None,
+                           list_id: Optional[int] = None) -> List[Any]:
+        """One page fetcher per legal combination of activity type and lead ID groups"""
+        type_groups = list(chunked(dict.fromkeys(activity_type_ids), MAX_ACTIVITY_TYPE_IDS))
+        if not type_groups:
+            raise ValueError("at least one activity type ID is required")
+        lead_groups: List[Optional[List[int]]] = [None]
+        if lead_ids is not None:
+            lead_groups = list(chunked(dict.fromkeys(lead_ids), MAX_LEAD_IDS))
+            if not lead_groups:
+                return []
+        return [
+            functools.partial(self.get_activities, activity_type_ids=types,
+                              list_id=list_id, lead_ids=leads)
+            for types, leads in itertools.product(type_groups, lead_groups)
+        ]
+
+    def _invalidate_metadata(self) -> None:
+        self._registries.clear()
+        super()._invalidate_metadata()
+
     def get_lead_changes(self, next_page_token: str, fields: List[str]) -> Dict[str, Any]:
         """
         Get data value change activities for specific fields
@@ -88,7 +302,9 @@ class Activities(MarketoBase):
             "primaryAttribute": primary_attribute,
             "attributes": attributes
         }
-        return self._post(f"{self.external_endpoint}/type.json", data=data)
+        response = self._post(f"{self.external_endpoint}/type.json", data=data)
+        self._invalidate_metadata()
+        return response
 
     def create_custom_activity_attributes(self, api_name: str, 
                                         attributes: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -99,8 +315,10 @@ class Activities(MarketoBase):
             api_name: API name of the custom activity type
             attributes: List of attribute definitions
         """
-        return self._post(f"{self.external_endpoint}/type/{api_name}/attributes/create.json",
-                         data={"attributes": attributes})
+        response = self._post(f"{self.external_endpoint}/type/{api_name}/attributes/create.json",
+                              data={"attributes": attributes})
+        self._invalidate_metadata()
+        return response
 
     def update_custom_activity_attributes(self, api_name: str,
                                         attributes: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -111,8 +329,10 @@ class Activities(MarketoBase):
             api_name: API name of the custom activity type
             attributes: List of updated attribute definitions
         """
-        return self._post(f"{self.external_endpoint}/type/{api_name}/attributes/update.json",
-                         data={"attributes": attributes})
+        response = self._post(f"{self.external_endpoint}/type/{api_name}/attributes/update.json",
+                              data={"attributes": attributes})
+        self._invalidate_metadata()
+        return response
 
     def delete_custom_activity_attributes(self, api_name: str,
                                         attributes: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -123,8 +343,10 @@ class Activities(MarketoBase):
             api_name: API name of the custom activity type
             attributes: List of attributes to delete
         """
-        return self._post(f"{self.external_endpoint}/type/{api_name}/attributes/delete.json",
-                         data={"attributes": attributes})
+        response = self._post(f"{self.external_endpoint}/type/{api_name}/attributes/delete.json",
+                              data={"attributes": attributes})
+        self._invalidate_metadata()
+        return response
 
     def add_custom_activities(self, activities: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -0,0 +1,151 @@
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from .pagination import check_response
+
+Converter = Callable[[Any], Any]
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("true", "1")
+
+
+def _to_datetime(value: Any) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _to_date(value: Any) -> date:
+    return date.fromisoformat(value[:10])
+
+
+_CONVERTERS: Dict[str, Converter] = {
+    "integer": int,
+    "score": int,
+    "float": float,
+    "currency": float,
+    "percent": float,
+    "boolean": _to_bool,
+}
+
+_DATE_CONVERTERS: Dict[str, Converter] = {
+    "datetime": _to_datetime,
+    "date": _to_date,
+}
+
+
+class ActivityType:
+    """
+    One activity type definition with a converter per attribute, built once
+
+    Args:
+        definition: Entry of the get_activity_types result
+        parse_dates: Convert datetime and date attributes to datetime and date objects
+    """
+
+    def __init__(self, definition: Dict[str, Any], parse_dates: bool = False):
+        self.id: int = definition["id"]
+        self.name: str = definition.get("name", "")
+        self.description: Optional[str] = definition.get("description")
+        primary = definition.get("primaryAttribute") or {}
+        self.primary_attribute: Optional[str] = primary.get("name")
+        self.attributes: Dict[str, str] = {
+            attribute["name"]: attribute.get("dataType", "string")
+            for attribute in definition.get("attributes") or ()
+        }
+        converters = dict(_CONVERTERS, **_DATE_CONVERTERS) if parse_dates else _CONVERTERS
+        self.converters: Dict[str, Converter] = {
+            name: converters[data_type]
+            for name, data_type in self.attributes.items() if data_type in converters
+        }
+
+
+class ActivityTypeRegistry:
+    """
+    Activity type IDs mapped to names and attribute schemas
+
+    decode turns an activity's attributes array into named fields of the
+    flat record, converting numbers and booleans (and optionally dates) with
+    converters resolved once per type, so decoding a record does one dict
+    lookup per attribute and nothing else.
+    """
+
+    def __init__(self, definitions: Iterable[Dict[str, Any]], parse_dates: bool = False):
+        """
+        Build the registry
+
+        Args:
+            definitions: The result list of Activities.get_activity_types
+            parse_dates: Convert datetime and date attributes to datetime and date objects
+        """
+        self.types: Dict[int, ActivityType] = {}
+        for definition in definitions:
+            activity_type = ActivityType(definition, parse_dates)
+            self.types[activity_type.id] = activity_type
+        self._ids_by_name = {activity_type.name: type_id for type_id, activity_type in self.types.items()}
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any], parse_dates: bool = False) -> "ActivityTypeRegistry":
+        """Build the registry from a get_activity_types response"""
+        return cls(check_response(response).get("result") or [], parse_dates)
+
+    def __getitem__(self, type_id: int) -> ActivityType:
+        return self.types[type_id]
+
+    def __contains__(self, type_id: Any) -> bool:
+        return type_id in self.types
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def name(self, type_id: int) -> Optional[str]:
+        """Name of an activity type, or None if it is unknown"""
+        activity_type = self.types.get(type_id)
+        return activity_type.name if activity_type is not None else None
+
+    def id_for(self, name: str) -> Optional[int]:
+        """ID of the activity type with this name, or None"""
+        return self._ids_by_name.get(name)
+
+    def ids_for(self, names: Iterable[str]) -> List[int]:
+        """IDs of the named activity types, raising KeyError for an unknown name"""
+        return [self._ids_by_name[name] for name in names]
+
+    def decode(self, activity: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Flatten one activity into a typed record
+
+        Top-level fields are kept, the attributes array is replaced by one
+        field per attribute, activityType holds the type name and the primary
+        attribute value is also stored under the primary attribute's name. A
+        value that fails to convert is kept as received.
+        """
+        record = dict(activity)
+        attributes = record.pop("attributes", None) or ()
+        activity_type = self.types.get(record.get("activityTypeId"))
+        if activity_type is None:
+            record["activityType"] = None
+            for attribute in attributes:
+                record[attribute["name"]] = attribute.get("value")
+            return record
+        record["activityType"] = activity_type.name
+        converters = activity_type.converters
+        if activity_type.primary_attribute and "primaryAttributeValue" in record:
+            record[activity_type.primary_attribute] = record["primaryAttributeValue"]
+        for attribute in attributes:
+            name = attribute["name"]
+            value = attribute.get("value")
+            converter = converters.get(name)
+            if converter is not None and value is not None:
+                try:
+                    value = converter(value)
+                except (TypeError, ValueError):
+                    pass
+            record[name] = value
+        return record
+
+    def decode_all(self, activities: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Decode a stream of activities lazily"""
+        decode = self.decode
+        for activity in activities:
+            yield decode(activity)
@@ -1,9 +1,10 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, sync_only
+from .pagination import iter_offset_records
 
 class Asset(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "asset/v1"
 
     def get_emails(self, max_return: int = 200, offset: int = 0) -> Dict[str, Any]:
@@ -11,6 +12,21 @@ class Asset(MarketoBase):
         return self._get(f"{self.base_endpoint}/emails.json", 
                         params={"maxReturn": max_return, "offset": offset})
 
+    @sync_only
+    def iter_emails(self, max_return: int = 200, max_workers: Optional[int] = None,
+                    ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all emails, fetching offset windows concurrently
+        
+        Args:
+            max_return: Maximum number of records per window
+            max_workers: Windows in flight at once (default: the rate limiter's concurrency cap)
+            ordered: Yield records in offset order; otherwise yield each window as it arrives
+        """
+        return iter_offset_records(
+            lambda offset, size: self.get_emails(size, offset),
+            max_return=max_return, max_workers=self._worker_count(max_workers), ordered=ordered)
+
     def get_email_by_id(self, email_id: int) -> Dict[str, Any]:
         """Get an email by ID"""
         return self._get(f"{self.base_endpoint}/email/{email_id}.json")
@@ -20,6 +36,21 @@ class Asset(MarketoBase):
         return self._get(f"{self.base_endpoint}/landingPages.json",
                         params={"maxReturn": max_return, "offset": offset})
 
+    @sync_only
+    def iter_landing_pages(self, max_return: int = 200, max_workers: Optional[int] = None,
+                           ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all landing pages, fetching offset windows concurrently
+        
+        Args:
+            max_return: Maximum number of records per window
+            max_workers: Windows in flight at once (default: the rate limiter's concurrency cap)
+            ordered: Yield records in offset order; otherwise yield each window as it arrives
+        """
+        return iter_offset_records(
+            lambda offset, size: self.get_landing_pages(size, offset),
+            max_return=max_return, max_workers=self._worker_count(max_workers), ordered=ordered)
+
     def get_landing_page_by_id(self, page_id: int) -> Dict[str, Any]:
         """Get a landing page by ID"""
         return self._get(f"{self.base_endpoint}/landingPage/{page_id}.json")
@@ -29,6 +60,21 @@ class Asset(MarketoBase):
         return self._get(f"{self.base_endpoint}/forms.json",
                         params={"maxReturn": max_return, "offset": offset})
 
+    @sync_only
+    def iter_forms(self, max_return: int = 200, max_workers: Optional[int] = None,
+                   ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all forms, fetching offset windows concurrently
+        
+        Args:
+            max_return: Maximum number of records per window
+            max_workers: Windows in flight at once (default: the rate limiter's concurrency cap)
+            ordered: Yield records in offset order; otherwise yield each window as it arrives
+        """
+        return iter_offset_records(
+            lambda offset, size: self.get_forms(size, offset),
+            max_return=max_return, max_workers=self._worker_count(max_workers), ordered=ordered)
+
     def get_form_by_id(self, form_id: int) -> Dict[str, Any]:
         """Get a form by ID"""
         return self._get(f"{self.base_endpoint}/form/{form_id}.json")
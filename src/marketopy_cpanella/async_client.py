@@ -0,0 +1,429 @@
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Type, TypeVar, Union
+from .authentication import Authentication
+from .base import MarketoBase, FORM_CONTENT_TYPE, MAX_FILTER_VALUES
+from .codec import JSONCodec, get_codec
+from .hooks import Hooks, RequestEvent, caller_method_name
+from .rate_limit import RateLimiter, DEFAULT_CALLS, DEFAULT_PERIOD
+from .retry import RetryPolicy, TOKEN_ERROR_CODES
+
+if TYPE_CHECKING:
+    import aiohttp
+    from .lead_database import LeadDatabase
+    from .asset import Asset
+    from .user_management import UserManagement
+    from .identity import Identity
+    from .activities import Activities
+    from .fields import Fields
+    from .named_accounts import NamedAccounts
+    from .opportunity_roles import OpportunityRoles
+    from .program_members import ProgramMembers
+    from .companies import Companies
+    from .custom_objects import CustomObjects
+    from .field_list import FieldList
+    from .field_types import FieldTypes
+    from .opportunities import Opportunities
+    from .sales_persons import SalesPersons
+    from .quota import QuotaGovernor
+
+DEFAULT_MAX_CONCURRENT = 10
+DEFAULT_POOL_SIZE = 20
+
+R = TypeVar("R")
+
+
+class AsyncMarketoSession:
+    """
+    Shared aiohttp connection pool with a cap on in-flight requests and a rolling rate limit
+
+    The aiohttp session and semaphore are created on the first request inside
+    the running event loop, so constructing the client does no I/O. Blocking
+    work (token fetches and quota store access) runs on the session's own
+    threads rather than the event loop's default executor.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: Optional[float] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 codec: Union[None, str, JSONCodec] = None,
+                 hooks: Optional[Hooks] = None,
+                 quota: Optional["QuotaGovernor"] = None):
+        """
+        Initialize the session
+
+        Args:
+            max_concurrent: Maximum number of requests in flight at once, enforced by
+                            this session's own asyncio semaphore
+            pool_size: Maximum number of pooled connections
+            timeout: Total timeout in seconds for a single request
+            rate_limiter: RateLimiter whose rolling window every call reserves a slot in;
+                          its max_concurrent cap is not applied here
+            retry_policy: Policy for re-driving Marketo soft errors such as 606
+            codec: JSON codec for request and response bodies, or the name of one;
+                   defaults to the fastest installed
+            hooks: Request instrumentation hooks; a new empty set when None
+            quota: Daily quota governor counting every call
+        """
+        self.max_concurrent = max_concurrent
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(
+            max_concurrent=max_concurrent)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._codec = codec
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.quota = quota
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def codec(self) -> JSONCodec:
+        """The JSON codec, resolved on first use so construction imports nothing"""
+        if not isinstance(self._codec, JSONCodec):
+            self._codec = get_codec(self._codec)
+        return self._codec
+
+    def _client_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            try:
+                import aiohttp
+            except ImportError as e:
+                raise ImportError("AsyncMarketo requires aiohttp: pip install marketopy[async]") from e
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run_blocking(self, func: Callable[..., R], *args: Any) -> R:
+        """Run a blocking call on the session's threads without blocking the event loop"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                thread_name_prefix="marketo-async")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def request_json(self, method: str, url: str, headers: Dict[str, str],
+                           params: Optional[Dict[str, Any]] = None,
+                           data: Optional[Dict[str, Any]] = None,
+                           form: Optional[Dict[str, Any]] = None,
+                           event: Optional[RequestEvent] = None) -> Dict[str, Any]:
+        """
+        Send a request over the shared pool and decode the JSON response
+
+        With an event, its timing, status and sizes are filled in along the way.
+        """
+        session = self._client_session()
+        queued_at = time.perf_counter()
+        async with self.semaphore:
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if form is not None:
+                body = _query_params(form)
+            else:
+                body = self.codec.dumps(data) if data is not None else None
+            if event is not None:
+                sent_at = time.perf_counter()
+                event.queue_seconds = sent_at - queued_at
+                event.bytes_sent = 0 if body is None else len(body) if isinstance(body, bytes) else None
+            async with session.request(method, url, headers=headers,
+                                       params=_query_params(params), data=body) as response:
+                if event is not None:
+                    event.status_code = response.status
+                response.raise_for_status()
+                content = await response.read()
+                if event is not None:
+                    event.elapsed = time.perf_counter() - sent_at
+                    event.bytes_received = len(content)
+                return self.codec.loads(content)
+
+    async def close(self) -> None:
+        """Close the pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _query_params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    # aiohttp only accepts str/int/float query values and rejects None
+    if not params:
+        return None
+    return {key: str(value) for key, value in params.items() if value is not None}
+
+
+class AsyncMarketoBase(MarketoBase):
+    """
+    Request layer that makes every endpoint method of a sub-client awaitable
+
+    Endpoint methods return the result of _get/_post/_put/_delete, so overriding
+    _make_request with a coroutine turns them into coroutine functions without
+    redefining each one. Helpers that consume responses themselves (marked
+    sync_only: the iter_* generators, streams, bulk upserts, columnar reads,
+    checkpointed syncs and coalesced lookups) and lookups of more than 300
+    filter values are only available on the synchronous Marketo client, and
+    raise NotImplementedError here.
+    """
+
+    def _make_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                      data: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      form: Optional[Dict[str, Any]] = None) -> Any:
+        # The calling endpoint method is only on the stack until the coroutine is returned
+        method_name = caller_method_name(MarketoBase) if self.session.hooks.active else None
+        return self._request(method, endpoint, params, data, headers, form, method_name)
+
+    async def _request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]],
+                       data: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]],
+                       form: Optional[Dict[str, Any]], method_name: Optional[str]) -> Dict[str, Any]:
+        if self.auth.needs_refresh():
+            # Token requests are rare; keep the blocking fetch off the event loop
+            await self.session.run_blocking(self.auth.getAuthToken)
+        url = f"{self.base_url}/{endpoint}"
+        if form is not None:
+            headers = dict(headers or {}, **{"Content-Type": FORM_CONTENT_TYPE})
+        retry_policy = self.session.retry_policy
+        hooks = self.session.hooks
+        quota = self.session.quota
+        attempt = 0
+        while True:
+            if quota is not None:
+                await self._acquire_quota(quota)
+            request_headers = self._build_headers(headers)
+            event = None
+            if hooks.active:
+                event = RequestEvent(method_name or "unknown", method, url, params, attempt,
+                                     time.time())
+                hooks.emit("before_request", event)
+            try:
+                result = await self.session.request_json(method, url, request_headers,
+                                                         params=params, data=data, form=form,
+                                                         event=event)
+            except Exception as e:
+                if event is not None:
+                    event.exception = e
+                    event.success = False
+                    hooks.emit("on_error", event)
+                raise
+            code = retry_policy.retryable_code(result)
+            if event is not None:
+                self._report_result(event, result,
+                                    code is not None and attempt < retry_policy.max_retries)
+            if code is None:
+                return result
+            if attempt >= retry_policy.max_retries:
+                retry_policy.stats.record_exhausted(code)
+                return result
+            if code in TOKEN_ERROR_CODES:
+                self.auth.invalidate(request_headers["Authorization"].split(" ", 1)[-1])
+                await self.session.run_blocking(self.auth.getAuthToken)
+            delay = retry_policy.delay(code, attempt)
+            retry_policy.stats.record_retry(code, delay)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _acquire_quota(self, quota: "QuotaGovernor") -> None:
+        # The job is read here; executor threads do not see this task's context
+        job = quota.current_job()
+        while True:
+            delay = await self.session.run_blocking(quota.try_acquire, job)
+            if delay <= 0:
+                return
+            # Deferred low priority work waits on the loop, not on an executor thread
+            await asyncio.sleep(delay)
+
+    def _get_split_filter(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError(
+            f"lookups of more than {MAX_FILTER_VALUES} filter values are only supported by the "
+            f"synchronous Marketo client; await one call per {MAX_FILTER_VALUES} values instead")
+
+
+def _sync_only_method(class_name: str, name: str) -> Callable[..., Any]:
+    def method(self: Any, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError(
+            f"{class_name}.{name} consumes responses itself and is only available on the "
+            "synchronous Marketo client; await the endpoint methods it is built on instead")
+    method.__name__ = name
+    return method
+
+
+_ASYNC_CLASSES: Dict[str, Type[MarketoBase]] = {}
+
+
+def _async_class(module_name: str, class_name: str) -> Type[MarketoBase]:
+    async_class = _ASYNC_CLASSES.get(class_name)
+    if async_class is None:
+        sync_class = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+        overrides = {name: _sync_only_method(class_name, name) for name in dir(sync_class)
+                     if getattr(getattr(sync_class, name), "_sync_only", False)}
+        async_class = type(f"Async{class_name}", (AsyncMarketoBase, sync_class), overrides)
+        _ASYNC_CLASSES[class_name] = async_class
+    return async_class
+
+
+class AsyncMarketo:
+    def __init__(self, munchkin_id: str, client_id: str, client_secret: str,
+                 max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: Optional[float] = None,
+                 token_refresh_margin: int = 60,
+                 rate_limit_calls: int = DEFAULT_CALLS,
+                 rate_limit_period: float = DEFAULT_PERIOD,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 json_codec: Union[None, str, JSONCodec] = None,
+                 hooks: Optional[Hooks] = None,
+                 quota: Optional["QuotaGovernor"] = None):
+        """
+        Initialize the asyncio Marketo client
+
+        Exposes the sub-clients of Marketo except named_account_lists,
+        bulk_extract and bulk_import, and has no lead cache or metadata cache.
+        Endpoint methods return coroutines that share one connection pool.
+
+        Args:
+            munchkin_id: Your Marketo Munchkin ID
+            client_id: Your Marketo Client ID
+            client_secret: Your Marketo Client Secret
+            max_concurrent: Maximum number of requests in flight from this client
+                            (Marketo allows 10); a shared rate_limiter does not
+                            count them against its own concurrency cap
+            pool_size: Maximum number of pooled connections
+            timeout: Total timeout in seconds for a single request
+            token_refresh_margin: Seconds before expiry at which the shared access
+                                  token is refreshed in the background
+            rate_limit_calls: Calls allowed per rolling window for this subscription
+            rate_limit_period: Length of the rolling window in seconds
+            rate_limiter: Existing RateLimiter to share with other clients of the
+                          same subscription; overrides the rate limit settings.
+                          Only its rolling call window is shared
+            retry_policy: Policy for re-driving Marketo soft errors (601/602/606/615/1029)
+            json_codec: JSON codec, or "orjson", "msgspec" or "json"; defaults to
+                        the fastest installed
+            hooks: Existing Hooks to share, e.g. with a synchronous client
+            quota: QuotaGovernor counting every call, e.g. shared with a synchronous client
+        """
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(calls=rate_limit_calls, period=rate_limit_period,
+                                       max_concurrent=max_concurrent)
+        self.session = AsyncMarketoSession(max_concurrent=max_concurrent, pool_size=pool_size,
+                                           timeout=timeout, rate_limiter=rate_limiter,
+                                           retry_policy=retry_policy, codec=json_codec,
+                                           hooks=hooks, quota=quota)
+        self.rate_limiter = rate_limiter
+        self.hooks = self.session.hooks
+        self.quota = quota
+        self.auth = Authentication(munchkin_id, client_id, client_secret,
+                                   refresh_margin=token_refresh_margin)
+        self._clients: Dict[str, MarketoBase] = {}
+
+    def _sub_client(self, module_name: str, class_name: str) -> Any:
+        client = self._clients.get(class_name)
+        if client is None:
+            client = _async_class(module_name, class_name)(self.auth, self.session)
+            self._clients[class_name] = client
+        return client
+
+    @property
+    def retry_stats(self) -> Dict[str, Any]:
+        """Retry counts and backoff time spent per Marketo error code"""
+        return self.session.retry_policy.stats.as_dict()
+
+    async def close(self) -> None:
+        """Release the pooled connections held by this client"""
+        await self.session.close()
+
+    async def __aenter__(self) -> "AsyncMarketo":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def lead_database(self) -> "LeadDatabase":
+        """Access the Lead Database API"""
+        return self._sub_client("lead_database", "LeadDatabase")
+
+    @property
+    def asset(self) -> "Asset":
+        """Access the Asset API"""
+        return self._sub_client("asset", "Asset")
+
+    @property
+    def user_management(self) -> "UserManagement":
+        """Access the User Management API"""
+        return self._sub_client("user_management", "UserManagement")
+
+    @property
+    def identity(self) -> "Identity":
+        """Access the Identity API"""
+        return self._sub_client("identity", "Identity")
+
+    @property
+    def activities(self) -> "Activities":
+        """Access the Activities API"""
+        return self._sub_client("activities", "Activities")
+
+    @property
+    def fields(self) -> "Fields":
+        """Access the Fields API"""
+        return self._sub_client("fields", "Fields")
+
+    @property
+    def named_accounts(self) -> "NamedAccounts":
+        """Access the Named Accounts API"""
+        return self._sub_client("named_accounts", "NamedAccounts")
+
+    @property
+    def opportunity_roles(self) -> "OpportunityRoles":
+        """Access the Opportunity Roles API"""
+        return self._sub_client("opportunity_roles", "OpportunityRoles")
+
+    @property
+    def program_members(self) -> "ProgramMembers":
+        """Access the Program Members API"""
+        return self._sub_client("program_members", "ProgramMembers")
+
+    @property
+    def companies(self) -> "Companies":
+        """Access the Companies API"""
+        return self._sub_client("companies", "Companies")
+
+    @property
+    def custom_objects(self) -> "CustomObjects":
+        """Access the Custom Objects API"""
+        return self._sub_client("custom_objects", "CustomObjects")
+
+    @property
+    def field_list(self) -> "FieldList":
+        """Access the Field List API"""
+        return self._sub_client("field_list", "FieldList")
+
+    @property
+    def field_types(self) -> "FieldTypes":
+        """Access the Field Types API"""
+        return self._sub_client("field_types", "FieldTypes")
+
+    @property
+    def opportunities(self) -> "Opportunities":
+        """Access the Opportunities API"""
+        return self._sub_client("opportunities", "Opportunities")
+
+    @property
+    def sales_persons(self) -> "SalesPersons":
+        """Access the Sales Persons API"""
+        return self._sub_client("sales_persons", "SalesPersons")
@@ -1,10 +1,22 @@
 from os.path import exists
+import threading
 import time
-import requests
 
 class Authentication:
 
-    def __init__(self, munchkin_id, client_id, client_secret):
+    def __init__(self, munchkin_id, client_id, client_secret, session=None,
+                 refresh_margin=60):
+        """
+        Initialize the token cache
+
+        Args:
+            munchkin_id: Your Marketo Munchkin ID
+            client_id: Your Marketo Client ID
+            client_secret: Your Marketo Client Secret
+            session: Optional MarketoSession used for token requests
+            refresh_margin: Seconds before expiry at which the token is refreshed
+                            in the background
+        """
         self.auth_url = "https://{0}.mktorest.com/identity/oauth/token?grant_type=client_credentials&client_id={1}&client_secret={2}"
         secrets_exist = self.__check_for_secrets__()
         if secrets_exist:
@@ -15,29 +27,119 @@ class Authentication:
         self.munchkin_id = munchkin_id
         self.client_id = client_id
         self.client_secret = client_secret
-        self.TOKEN_SLEEP_TIME = 5  # In Seconds
+        if self.secrets:
+            self.__apply_secrets__()
+        self.session = session
+        self.refresh_margin = refresh_margin
+        self.EXPIRY_SKEW = 2  # In Seconds, treat the token as expired this early
+        self.token = None
+        self.expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._background_refresh = None
+        self._next_background_refresh = 0.0
 
 
     def __check_for_secrets__(self):
         return exists("secrets.py")
 
+    def __apply_secrets__(self):
+        """
+        Take the credentials of this client's subscription from secrets.py
+
+        SUBSCRIPTION_INFORMATION may list several subscriptions; the entry
+        whose MUNCHKIN_ID matches this client's is used, or the first entry
+        when the client was created without a Munchkin ID.
+        """
+        for subscription in self.secrets:
+            if not self.munchkin_id or subscription["MUNCHKIN_ID"] == self.munchkin_id:
+                self.munchkin_id = subscription["MUNCHKIN_ID"]
+                self.client_id = subscription["CLIENT_ID"]
+                self.client_secret = subscription["CLIENT_SECRET"]
+                return
+
     def getAuthToken(self):
-        if self.token < self.TOKEN_SLEEP_TIME:
-            time.sleep(self.TOKEN_SLEEP_TIME)
-            return self.__get_new_token__()
-        else:
-            return self.__get_new_token__()
+        """
+        Get a valid access token from the cache
+
+        A cached token is returned while it is valid. Within refresh_margin of
+        expiry a single background refresh is started and the current token is
+        still returned. Once the token has expired, callers block on one shared
+        refresh rather than each fetching their own.
+        """
+        token, expires_at = self.token, self.expires_at
+        now = time.monotonic()
+        if token is not None and now < expires_at - self.EXPIRY_SKEW:
+            if now >= expires_at - self.refresh_margin:
+                self.__start_background_refresh__(token)
+            return token
+        return self.__refresh__(token)
+
+    def needs_refresh(self):
+        """Whether getAuthToken would block on a token request"""
+        return self.token is None or time.monotonic() >= self.expires_at - self.EXPIRY_SKEW
+
+    def invalidate(self, token=None):
+        """
+        Drop the cached token so the next call fetches a new one
+
+        Args:
+            token: Only invalidate if the cache still holds this token, so a
+                   token another thread already replaced is not discarded
+        """
+        with self._state_lock:
+            if token is None or token == self.token:
+                self.token = None
+                self.expires_at = 0.0
+
+    def __refresh__(self, stale_token):
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited on the lock
+            if (self.token is not None and self.token != stale_token
+                    and time.monotonic() < self.expires_at - self.EXPIRY_SKEW):
+                return self.token
+            token = self.__get_new_token__()
+            remaining = self.expires_at - time.monotonic()
+            if token == stale_token and remaining < self.EXPIRY_SKEW:
+                # Marketo only issues a new token once the old one has expired
+                time.sleep(max(remaining, 0))
+                token = self.__get_new_token__()
+            return token
+
+    def __start_background_refresh__(self, token):
+        with self._state_lock:
+            if time.monotonic() < self._next_background_refresh:
+                return
+            if self._background_refresh is not None and self._background_refresh.is_alive():
+                return
+            self._background_refresh = threading.Thread(
+                target=self.__background_refresh__, args=(token,),
+                name="marketo-token-refresh", daemon=True
+            )
+            self._background_refresh.start()
+
+    def __background_refresh__(self, token):
+        try:
+            new_token = self.__refresh__(token)
+        except Exception:
+            # The next foreground call retries synchronously once the token expires
+            new_token = token
+        if new_token == token:
+            # Marketo hands back the live token until it expires, so wait for
+            # expiry instead of asking again on every call
+            with self._state_lock:
+                self._next_background_refresh = self.expires_at
 
     def __get_new_token__(self):
-        if self.secrets is not None:
-            import secrets
-            print("ARRAY ENTRY WILL BE SUPPORTED IN THE FUTURE")
-            self.munchkin_id = secrets.SUBSCRIPTION_INFORMATION[0]["MUNCHKIN_ID"]
-            self.client_id = secrets.SUBSCRIPTION_INFORMATION[0]["CLIENT_ID"]
-            self.client_secret = secrets.SUBSCRIPTION_INFORMATION[0]["CLIENT_SECRET"]
-            for subscription in secrets.SUBSCRIPTION_INFORMATION:
-                print('Subscription Details:\nMunchkin: {0}\nClient ID: {1}'
-                      .format(subscription["MUNCHKIN_ID"], subscription["CLIENT_ID"]))
+        if self.session is not None:
+            http = self.session
         else:
-            response = requests.get(self.auth_url.format(self.munchkin_id, self.client_id, self.client_secret))
+            import requests as http
+        requested_at = time.monotonic()
+        response = http.get(self.auth_url.format(self.munchkin_id, self.client_id, self.client_secret))
+        response.raise_for_status()
+        payload = response.json()
+        with self._state_lock:
+            self.token = payload["access_token"]
+            self.expires_at = requested_at + int(payload.get("expires_in", 0))
         return self.token
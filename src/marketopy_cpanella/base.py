@@ -1,18 +1,71 @@
-import requests
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, TypeVar
+from urllib.parse import urlencode
 from .authentication import Authentication
+from .batching import chunked, map_ordered
+from .columnar import ColumnarBuffer, field_types_from_describe
+from .exceptions import MarketoAPIError
+from .hooks import RequestEvent, caller_method_name
+from .pagination import check_response
+from .retry import TOKEN_ERROR_CODES
+from .session import MarketoSession
+
+MAX_FILTER_VALUES = 300
+MAX_QUERY_LENGTH = 6000
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def sync_only(method: F) -> F:
+    """
+    Mark a helper that consumes API responses itself, e.g. to page or merge them
+
+    Such helpers cannot be made awaitable by swapping the request layer, so
+    AsyncMarketo replaces them with a method raising NotImplementedError.
+    """
+    method._sync_only = True
+    return method
+
+
+def _body_size(body: Any) -> Optional[int]:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return None
+
 
 class MarketoBase:
-    def __init__(self, auth: Authentication):
+    def __init__(self, auth: Authentication, session: Optional[MarketoSession] = None):
         self.auth = auth
+        self.session = session if session is not None else MarketoSession()
         self.base_url = f"https://{auth.munchkin_id}.mktorest.com/rest"
         self.headers = {
-            "Authorization": f"Bearer {auth.getAuthToken()}",
             "Content-Type": "application/json"
         }
 
+    def _build_headers(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Build request headers with a bearer token from the shared token cache"""
+        request_headers = dict(self.headers)
+        request_headers["Authorization"] = f"Bearer {self.auth.getAuthToken()}"
+        if headers:
+            request_headers.update(headers)
+        # A None value drops a default header, e.g. Content-Type for multipart uploads
+        return {key: value for key, value in request_headers.items() if value is not None}
+
+    def _worker_count(self, max_workers: Optional[int] = None) -> int:
+        """Worker count for parallel helpers, defaulting to the rate limiter's concurrency cap"""
+        return max_workers or self.session.rate_limiter.max_concurrent
+
     def _make_request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, 
-                     data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                     data: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None,
+                     form: Optional[Dict[str, Any]] = None,
+                     raw: bool = False,
+                     files: Optional[Dict[str, Any]] = None) -> Any:
         """
         Make a request to the Marketo API
         
@@ -21,25 +74,220 @@ class MarketoBase:
             endpoint: API endpoint
             params: Query parameters
             data: Request body data
+            headers: Headers that override the defaults for this request
+            form: Form-encoded request body, sent instead of data
+            raw: Stream the body and return the requests.Response unread unless
+                 it is JSON, for file downloads; the caller must close it
+            files: Files for a multipart upload, sent with form as the other fields
             
         Returns:
-            Dict containing the API response
+            Dict containing the API response. Calls that fail with a retryable
+            Marketo error code are re-driven according to the session's
+            retry policy before the last response is returned.
+            
+        Every attempt is counted by the session's quota governor, if any, and
+        raises QuotaExceededError when the governor refuses it. Every attempt
+        is reported to the session's hooks when any are subscribed.
         """
         url = f"{self.base_url}/{endpoint}"
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=self.headers,
-            params=params,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()
+        if form is not None:
+            headers = dict(headers or {}, **{"Content-Type": FORM_CONTENT_TYPE})
+        if files is not None:
+            # requests sets the multipart Content-Type with its boundary
+            headers = dict(headers or {}, **{"Content-Type": None})
+        codec = self.session.codec
+        # Encoded once to bytes; requests would otherwise re-encode on every retry
+        body = codec.dumps(data) if data is not None and form is None and files is None else None
+        retry_policy = self.session.retry_policy
+        hooks = self.session.hooks
+        quota = self.session.quota
+        method_name = None
+        attempt = 0
+        while True:
+            if quota is not None:
+                quota.acquire()
+            request_headers = self._build_headers(headers)
+            event = None
+            if hooks.active:
+                if method_name is None:
+                    method_name = caller_method_name(MarketoBase)
+                event = RequestEvent(method_name, method, url, params, attempt, time.time())
+                hooks.emit("before_request", event)
+                queued_at = time.perf_counter()
+            try:
+                with self.session.rate_limiter:
+                    if event is not None:
+                        sent_at = time.perf_counter()
+                        event.queue_seconds = sent_at - queued_at
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        headers=request_headers,
+                        params=params,
+                        data=form if body is None else body,
+                        files=files,
+                        stream=raw
+                    )
+                response.raise_for_status()
+                if raw and "json" not in response.headers.get("Content-Type", ""):
+                    if event is not None:
+                        self._report_response(event, sent_at, response, None, False)
+                    return response
+                result = codec.loads(response.content)
+            except Exception as e:
+                if event is not None:
+                    self._report_exception(event, sent_at if event.queue_seconds is not None
+                                           else None, e, body)
+                raise
+            code = retry_policy.retryable_code(result)
+            if event is not None:
+                self._report_response(event, sent_at, response, result,
+                                      code is not None and attempt < retry_policy.max_retries)
+            if code is None:
+                return result
+            if attempt >= retry_policy.max_retries:
+                retry_policy.stats.record_exhausted(code)
+                return result
+            if code in TOKEN_ERROR_CODES:
+                self.auth.invalidate(request_headers["Authorization"].split(" ", 1)[-1])
+            delay = retry_policy.delay(code, attempt)
+            retry_policy.stats.record_retry(code, delay)
+            if delay > 0:
+                time.sleep(delay)
+            attempt += 1
+
+    def _report_response(self, event: RequestEvent, sent_at: float, response: Any,
+                         result: Any, will_retry: bool) -> None:
+        """Fill in an event from a received response and run the hooks"""
+        event.elapsed = time.perf_counter() - sent_at
+        event.status_code = response.status_code
+        event.bytes_sent = _body_size(response.request.body)
+        if result is None:
+            length = response.headers.get("Content-Length")
+            event.bytes_received = int(length) if length is not None else None
+        else:
+            event.bytes_received = len(response.content)
+        self._report_result(event, result, will_retry)
+
+    def _report_result(self, event: RequestEvent, result: Any, will_retry: bool) -> None:
+        """Fill in an event from a decoded response and run the hooks"""
+        if isinstance(result, dict):
+            event.request_id = result.get("requestId")
+            event.success = bool(result.get("success", True))
+            event.error_codes = [str(error.get("code")) for error in result.get("errors") or ()]
+        else:
+            event.success = True
+        event.will_retry = will_retry
+        hooks = self.session.hooks
+        hooks.emit("after_response", event)
+        if not event.success:
+            hooks.emit("on_error", event)
+
+    def _report_exception(self, event: RequestEvent, sent_at: Optional[float],
+                          error: Exception, body: Optional[bytes]) -> None:
+        """Fill in an event from a failed attempt and run the on_error hooks"""
+        if sent_at is not None:
+            event.elapsed = time.perf_counter() - sent_at
+        event.exception = error
+        event.success = False
+        response = getattr(error, "response", None)
+        if response is not None:
+            event.status_code = response.status_code
+            event.bytes_sent = _body_size(response.request.body)
+        else:
+            event.bytes_sent = _body_size(body)
+        self.session.hooks.emit("on_error", event)
 
     def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make a GET request"""
         return self._make_request("GET", endpoint, params=params)
 
+    def _get_cached(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a GET request for schema data through the session's metadata cache"""
+        cache = getattr(self.session, "metadata_cache", None)
+        if cache is None:
+            return self._get(endpoint, params=params)
+        key = f"{self.base_url}/{endpoint}"
+        if params:
+            key = f"{key}?{urlencode(sorted(params.items()))}"
+        return cache.get_or_load(self.auth.munchkin_id, key,
+                                 lambda: self._get(endpoint, params=params))
+
+    def _invalidate_metadata(self) -> None:
+        """Drop this subscription's cached schema data after a schema change"""
+        cache = getattr(self.session, "metadata_cache", None)
+        if cache is not None:
+            cache.invalidate(self.auth.munchkin_id)
+
+    def _get_filtered(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a GET request, switching to POST with _method=GET for long queries
+        
+        Marketo accepts the query as a form body on POST ?_method=GET, which
+        avoids URL length limits for long filterValues lists.
+        """
+        if len(urlencode(params)) > MAX_QUERY_LENGTH:
+            return self._make_request("POST", endpoint, params={"_method": "GET"}, form=params)
+        return self._get(endpoint, params=params)
+
+    def _get_split_filter(self, fetch_records: Callable[[List[str]], Iterator[Dict[str, Any]]],
+                          filter_values: Iterable[str], id_field: str = "id",
+                          max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Look up any number of filter values in concurrent batches of 300
+        
+        Args:
+            fetch_records: Callable streaming every record matching one batch of values
+            filter_values: Values to filter by; duplicates are dropped
+            id_field: Field used to deduplicate records matched by more than one batch
+            max_workers: Batches in flight at once (default: the rate limiter's concurrency cap)
+            
+        Returns:
+            Dict with the merged "result", or the first failed batch's response
+        """
+        values = list(dict.fromkeys(filter_values))
+        merged: Dict[Any, Dict[str, Any]] = {}
+        unkeyed: List[Dict[str, Any]] = []
+        try:
+            for records in map_ordered(lambda chunk: list(fetch_records(chunk)),
+                                       chunked(values, MAX_FILTER_VALUES),
+                                       self._worker_count(max_workers)):
+                for record in records:
+                    key = record.get(id_field)
+                    if key is None:
+                        unkeyed.append(record)
+                    else:
+                        merged.setdefault(key, record)
+        except MarketoAPIError as e:
+            return e.response
+        return {"success": True, "result": list(merged.values()) + unkeyed}
+
+    def _read_columnar(self, describe: Dict[str, Any],
+                       fetch_records: Callable[[List[str]], Iterator[Dict[str, Any]]],
+                       filter_values: Iterable[str],
+                       fields: Optional[List[str]] = None) -> ColumnarBuffer:
+        """
+        Stream every record matching the filter values into a ColumnarBuffer
+        
+        Args:
+            describe: Describe response giving each field's data type
+            fetch_records: Callable streaming every record matching one batch of values
+            filter_values: Values to filter by, looked up 300 at a time
+            fields: Columns to create up front, in order
+        """
+        buffer = ColumnarBuffer(field_types_from_describe(describe), fields)
+        for chunk in chunked(dict.fromkeys(filter_values), MAX_FILTER_VALUES):
+            buffer.extend(fetch_records(chunk))
+        return buffer
+
+    @staticmethod
+    def _first_result(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the single record returned by a job endpoint, raising MarketoAPIError on failure"""
+        result = check_response(response).get("result") or []
+        if not result:
+            raise MarketoAPIError(response)
+        return result[0]
+
     def _post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Make a POST request"""
         return self._make_request("POST", endpoint, data=data)
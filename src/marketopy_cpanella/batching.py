@@ -0,0 +1,66 @@
+import collections
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TypeVar
+
+MAX_BATCH_SIZE = 300
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(items: Iterable[T], size: int = MAX_BATCH_SIZE) -> Iterator[List[T]]:
+    """
+    Split any iterable, including a generator, into lists of at most size items
+
+    Args:
+        items: Items to split
+        size: Maximum items per chunk
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def submit_in_context(executor: ThreadPoolExecutor, func: Callable[..., R], *args: Any) -> "Future[R]":
+    """
+    Submit func to an executor in a copy of the caller's context
+
+    Context variables, such as the quota governor's job tag, then follow the
+    work onto the worker thread.
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def map_ordered(func: Callable[[T], R], items: Iterable[T], max_workers: int,
+                max_pending: Optional[int] = None) -> Iterator[R]:
+    """
+    Apply func to items on a worker pool and yield results in input order
+
+    Only max_pending items are submitted ahead of the result being yielded,
+    so a generator input is consumed lazily and memory stays bounded.
+
+    Args:
+        func: Function to apply
+        items: Inputs, consumed lazily
+        max_workers: Worker threads
+        max_pending: Items submitted ahead of the consumer (default: 2 * max_workers)
+    """
+    max_pending = max_pending or max_workers * 2
+    pending: Any = collections.deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="marketo-batch")
+    try:
+        for item in items:
+            pending.append(submit_in_context(executor, func, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,280 @@
+import collections
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple, Union
+from .activities import parse_datetime, format_datetime
+from .base import MarketoBase
+from .exceptions import MarketoAPIError, MarketoError
+
+MAX_EXPORT_DAYS = 31
+MAX_QUEUED_EXPORTS = 10
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_POLL_INTERVAL = 30.0
+
+
+def split_date_range(since_datetime: Union[str, datetime], until_datetime: Union[str, datetime],
+                     days: int = MAX_EXPORT_DAYS) -> List[Tuple[str, str]]:
+    """
+    Split [since, until) into consecutive windows of at most days days
+
+    Bulk export date filters are inclusive at both ends and accept at most 31
+    days, so each window ends one second before the next one starts.
+
+    Args:
+        since_datetime: Start of the range (inclusive)
+        until_datetime: End of the range (exclusive)
+        days: Maximum window length in days
+    """
+    since, until = parse_datetime(since_datetime), parse_datetime(until_datetime)
+    if until <= since:
+        raise ValueError("until_datetime must be after since_datetime")
+    windows = []
+    while since < until:
+        end = min(since + timedelta(days=days), until)
+        windows.append((format_datetime(since), format_datetime(end - timedelta(seconds=1))))
+        since = end
+    return windows
+
+
+class BulkExtract(MarketoBase):
+    """
+    Bulk export jobs for leads and activities
+
+    A job costs a handful of calls (create, enqueue, status polls and the
+    download) however many rows it returns. entity is "leads" or "activities".
+    """
+
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
+        # Bulk endpoints live beside /rest rather than under it
+        self.base_url = f"https://{auth.munchkin_id}.mktorest.com"
+        self.base_endpoint = "bulk/v1"
+
+    def _export_endpoint(self, entity: str) -> str:
+        return f"{self.base_endpoint}/{entity}/export"
+
+    def create_leads_export(self, fields: List[str], filter: Dict[str, Any],
+                            format: str = "CSV",
+                            column_header_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Create a lead export job
+
+        Args:
+            fields: Lead fields to export
+            filter: Export filter, e.g. {"createdAt": {"startAt": ..., "endAt": ...}}
+            format: File format (CSV, TSV or SSV)
+            column_header_names: Map of field names to column headers
+        """
+        data = {"fields": fields, "format": format, "filter": filter}
+        if column_header_names:
+            data["columnHeaderNames"] = column_header_names
+        return self._post(f"{self._export_endpoint('leads')}/create.json", data=data)
+
+    def create_activities_export(self, filter: Dict[str, Any], fields: Optional[List[str]] = None,
+                                 format: str = "CSV",
+                                 column_header_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Create an activity export job
+
+        Args:
+            filter: Export filter with createdAt and optionally activityTypeIds
+            fields: Activity fields to export (default: all)
+            format: File format (CSV, TSV or SSV)
+            column_header_names: Map of field names to column headers
+        """
+        data: Dict[str, Any] = {"format": format, "filter": filter}
+        if fields:
+            data["fields"] = fields
+        if column_header_names:
+            data["columnHeaderNames"] = column_header_names
+        return self._post(f"{self._export_endpoint('activities')}/create.json", data=data)
+
+    def enqueue_export(self, entity: str, export_id: str) -> Dict[str, Any]:
+        """Put a created export job in the processing queue"""
+        return self._post(f"{self._export_endpoint(entity)}/{export_id}/enqueue.json", data={})
+
+    def get_export_status(self, entity: str, export_id: str) -> Dict[str, Any]:
+        """Get the status of an export job"""
+        return self._get(f"{self._export_endpoint(entity)}/{export_id}/status.json")
+
+    def cancel_export(self, entity: str, export_id: str) -> Dict[str, Any]:
+        """Cancel an export job"""
+        return self._post(f"{self._export_endpoint(entity)}/{export_id}/cancel.json", data={})
+
+    def get_export_jobs(self, entity: str, status: Optional[List[str]] = None,
+                        batch_size: Optional[int] = None,
+                        next_page_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        List export jobs from the last 7 days
+
+        Args:
+            entity: "leads" or "activities"
+            status: Only list jobs in these statuses, e.g. ["Queued", "Processing"]
+            batch_size: Number of jobs per page
+            next_page_token: Token for getting the next page of results
+        """
+        params: Dict[str, Any] = {}
+        if status:
+            params["status"] = ",".join(status)
+        if batch_size:
+            params["batchSize"] = batch_size
+        if next_page_token:
+            params["nextPageToken"] = next_page_token
+        return self._get(f"{self._export_endpoint(entity)}.json", params=params)
+
+    def download_export(self, entity: str, export_id: str, path: str,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        file_size: Optional[int] = None, max_attempts: int = 3) -> str:
+        """
+        Stream a completed export's file to disk in chunks
+
+        The file is written to path + ".part" and renamed when complete. An
+        existing .part file is resumed with a Range request, both for a
+        connection dropped during this call and for an earlier interrupted run.
+
+        Args:
+            entity: "leads" or "activities"
+            export_id: ID of a completed export job
+            path: Destination file
+            chunk_size: Bytes read from the connection at a time
+            file_size: Expected size from the job status, used to detect completion
+            max_attempts: Connections opened before giving up on a dropped download
+
+        Returns:
+            path
+        """
+        part_path = f"{path}.part"
+        endpoint = f"{self._export_endpoint(entity)}/{export_id}/file.json"
+        for attempt in range(max_attempts):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if file_size is not None and offset >= file_size:
+                break
+            headers = {"Range": f"bytes={offset}-"} if offset else None
+            try:
+                response = self._make_request("GET", endpoint, headers=headers, raw=True)
+                if isinstance(response, dict):
+                    raise MarketoAPIError(response)
+                try:
+                    # A server that ignores Range sends the whole file again
+                    with open(part_path, "ab" if response.status_code == 206 else "wb") as f:
+                        for chunk in response.iter_content(chunk_size):
+                            f.write(chunk)
+                finally:
+                    response.close()
+            except OSError:
+                if attempt == max_attempts - 1:
+                    raise
+                continue
+            if file_size is None or os.path.getsize(part_path) >= file_size:
+                break
+        if not os.path.exists(part_path):
+            # An empty export never opens the connection
+            open(part_path, "wb").close()
+        if file_size is not None and os.path.getsize(part_path) != file_size:
+            raise MarketoError(
+                f"{entity} export {export_id} download incomplete; call again to resume")
+        os.replace(part_path, path)
+        return path
+
+    def export_leads(self, directory: str, fields: List[str],
+                     since_datetime: Union[str, datetime], until_datetime: Union[str, datetime],
+                     filter_field: str = "createdAt", format: str = "CSV",
+                     max_queued: int = MAX_QUEUED_EXPORTS,
+                     poll_interval: float = DEFAULT_POLL_INTERVAL) -> Iterator[Dict[str, Any]]:
+        """
+        Export leads created or updated in [since, until) to files in directory
+
+        The range is split into 31-day windows with one job each. Jobs are
+        created and enqueued up to max_queued at a time, and as each one
+        completes its file is downloaded and its status is yielded with a
+        "path" entry, in completion order.
+
+        Args:
+            directory: Directory the files are written to
+            fields: Lead fields to export
+            since_datetime: Start of the range (inclusive)
+            until_datetime: End of the range (exclusive)
+            filter_field: Date filter, createdAt or updatedAt
+            format: File format (CSV, TSV or SSV)
+            max_queued: Jobs queued or processing at once (Marketo allows 10)
+            poll_interval: Seconds between status checks
+        """
+        filters = [{filter_field: {"startAt": start, "endAt": end}}
+                   for start, end in split_date_range(since_datetime, until_datetime)]
+        return self._run_exports(
+            "leads", filters, directory, format, max_queued, poll_interval,
+            lambda job_filter: self.create_leads_export(fields, job_filter, format))
+
+    def export_activities(self, directory: str, since_datetime: Union[str, datetime],
+                          until_datetime: Union[str, datetime],
+                          activity_type_ids: Optional[Iterable[int]] = None,
+                          fields: Optional[List[str]] = None, format: str = "CSV",
+                          max_queued: int = MAX_QUEUED_EXPORTS,
+                          poll_interval: float = DEFAULT_POLL_INTERVAL) -> Iterator[Dict[str, Any]]:
+        """
+        Export activities created in [since, until) to files in directory
+
+        Works like export_leads: one job per 31-day window, run back to back
+        within the queue limit, yielding each job's status once downloaded.
+
+        Args:
+            directory: Directory the files are written to
+            since_datetime: Start of the range (inclusive)
+            until_datetime: End of the range (exclusive)
+            activity_type_ids: Activity type IDs to include (default: all)
+            fields: Activity fields to export (default: all)
+            format: File format (CSV, TSV or SSV)
+            max_queued: Jobs queued or processing at once (Marketo allows 10)
+            poll_interval: Seconds between status checks
+        """
+        type_ids = list(activity_type_ids) if activity_type_ids is not None else None
+        filters = []
+        for start, end in split_date_range(since_datetime, until_datetime):
+            job_filter: Dict[str, Any] = {"createdAt": {"startAt": start, "endAt": end}}
+            if type_ids:
+                job_filter["activityTypeIds"] = type_ids
+            filters.append(job_filter)
+        return self._run_exports(
+            "activities", filters, directory, format, max_queued, poll_interval,
+            lambda job_filter: self.create_activities_export(job_filter, fields, format))
+
+    def _run_exports(self, entity: str, filters: List[Dict[str, Any]], directory: str,
+                     format: str, max_queued: int, poll_interval: float,
+                     create: Any) -> Iterator[Dict[str, Any]]:
+        os.makedirs(directory, exist_ok=True)
+        waiting = collections.deque(enumerate(filters))
+        active: Dict[str, Dict[str, Any]] = {}
+        try:
+            while waiting or active:
+                while waiting and len(active) < max(1, max_queued):
+                    index, job_filter = waiting.popleft()
+                    export_id = self._first_result(create(job_filter))["exportId"]
+                    self._first_result(self.enqueue_export(entity, export_id))
+                    active[export_id] = {
+                        "filter": job_filter,
+                        "path": os.path.join(directory, f"{entity}_{index:04d}.{format.lower()}")
+                    }
+                completed = False
+                for export_id, job in list(active.items()):
+                    status = self._first_result(self.get_export_status(entity, export_id))
+                    state = status.get("status")
+                    if state == "Completed":
+                        self.download_export(entity, export_id, job["path"],
+                                             file_size=status.get("fileSize"))
+                        del active[export_id]
+                        completed = True
+                        yield dict(status, **job)
+                    elif state in ("Failed", "Cancelled"):
+                        del active[export_id]
+                        raise MarketoError(f"{entity} export {export_id} {state.lower()}: "
+                                           f"{status.get('errorMsg')}")
+                if active and not completed:
+                    time.sleep(poll_interval)
+        finally:
+            # Free queue slots held by jobs the caller will never download
+            for export_id in active:
+                try:
+                    self.cancel_export(entity, export_id)
+                except Exception:
+                    pass
@@ -0,0 +1,354 @@
+import csv
+import io
+import time
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable, Union
+from .base import MarketoBase
+from .batching import map_ordered
+from .exceptions import MarketoAPIError
+
+MAX_IMPORT_FILE_SIZE = 10_000_000
+MAX_QUEUED_IMPORTS = 10
+DEFAULT_POLL_INTERVAL = 10.0
+
+ImportSource = Union[str, Iterable[Dict[str, Any]]]
+
+
+def iter_csv_files(source: ImportSource, fields: Optional[List[str]] = None,
+                   max_file_size: int = MAX_IMPORT_FILE_SIZE) -> Iterator[bytes]:
+    """
+    Stream rows into UTF-8 CSV files of at most max_file_size bytes, each with the header
+
+    Only one file is held in memory at a time, so any number of rows can be
+    split without loading them all.
+
+    Args:
+        source: Path of a CSV file, or an iterable of dicts such as a generator
+        fields: Columns for dict rows (default: the keys of the first row)
+        max_file_size: Maximum bytes per file, header included
+    """
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            yield from _split_rows(header, reader, max_file_size)
+        return
+    rows = iter(source)
+    first = next(rows, None)
+    if first is None:
+        return
+    header = list(fields) if fields else list(first)
+
+    def values() -> Iterator[List[Any]]:
+        for row in _chain_first(first, rows):
+            yield ["" if row.get(field) is None else row.get(field) for field in header]
+
+    yield from _split_rows(header, values(), max_file_size)
+
+
+def _chain_first(first: Dict[str, Any], rows: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield first
+    yield from rows
+
+
+def _split_rows(header: List[str], rows: Iterable[List[Any]], max_file_size: int) -> Iterator[bytes]:
+    line = io.StringIO()
+    writer = csv.writer(line, lineterminator="\n")
+
+    def encode(row: List[Any]) -> bytes:
+        line.seek(0)
+        line.truncate()
+        writer.writerow(row)
+        return line.getvalue().encode("utf-8")
+
+    header_bytes = encode(header)
+    buffer = io.BytesIO()
+    buffer.write(header_bytes)
+    for row in rows:
+        encoded = encode(row)
+        if len(header_bytes) + len(encoded) > max_file_size:
+            raise ValueError(f"a single row is larger than {max_file_size} bytes")
+        if buffer.tell() + len(encoded) > max_file_size:
+            yield buffer.getvalue()
+            buffer = io.BytesIO()
+            buffer.write(header_bytes)
+        buffer.write(encoded)
+    if buffer.tell() > len(header_bytes):
+        yield buffer.getvalue()
+
+
+class BulkImport(MarketoBase):
+    """
+    Bulk import jobs for leads, custom objects and program members
+
+    Each job takes a CSV file of up to 10MB in a single call, instead of one
+    synchronous call per 300 records.
+    """
+
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
+        # Bulk endpoints live beside /rest rather than under it
+        self.base_url = f"https://{auth.munchkin_id}.mktorest.com"
+        self.base_endpoint = "bulk/v1"
+
+    def import_leads_file(self, file: bytes, lookup_field: Optional[str] = None,
+                          list_id: Optional[int] = None, partition_name: Optional[str] = None,
+                          format: str = "csv") -> Dict[str, Any]:
+        """
+        Submit a lead import job
+
+        Args:
+            file: File contents, at most 10MB
+            lookup_field: Field used to match existing leads (default: email)
+            list_id: Static list to add the imported leads to
+            partition_name: Lead partition to import into
+            format: File format (csv, tsv or ssv)
+        """
+        form: Dict[str, Any] = {"format": format}
+        if lookup_field:
+            form["lookupField"] = lookup_field
+        if list_id:
+            form["listId"] = list_id
+        if partition_name:
+            form["partitionName"] = partition_name
+        return self._make_request("POST", f"{self.base_endpoint}/leads.json", form=form,
+                                  files={"file": (f"leads.{format}", file, "text/plain")})
+
+    def get_leads_import_status(self, batch_id: int) -> Dict[str, Any]:
+        """Get the status of a lead import job"""
+        return self._get(f"{self.base_endpoint}/leads/batch/{batch_id}.json")
+
+    def get_leads_import_failures(self, batch_id: int) -> str:
+        """Get the rows of a lead import job that failed, as CSV with a reason column"""
+        return self._get_file(f"{self.base_endpoint}/leads/batch/{batch_id}/failures.json")
+
+    def get_leads_import_warnings(self, batch_id: int) -> str:
+        """Get the rows of a lead import job imported with warnings, as CSV with a reason column"""
+        return self._get_file(f"{self.base_endpoint}/leads/batch/{batch_id}/warnings.json")
+
+    def import_custom_objects_file(self, api_name: str, file: bytes,
+                                   format: str = "csv") -> Dict[str, Any]:
+        """
+        Submit a custom object import job
+
+        Args:
+            api_name: API name of the custom object
+            file: File contents, at most 10MB
+            format: File format (csv, tsv or ssv)
+        """
+        return self._make_request("POST", f"{self.base_endpoint}/customobjects/{api_name}/import.json",
+                                  form={"format": format},
+                                  files={"file": (f"{api_name}.{format}", file, "text/plain")})
+
+    def get_custom_objects_import_status(self, api_name: str, batch_id: int) -> Dict[str, Any]:
+        """Get the status of a custom object import job"""
+        return self._get(f"{self.base_endpoint}/customobjects/{api_name}/import/{batch_id}/status.json")
+
+    def get_custom_objects_import_failures(self, api_name: str, batch_id: int) -> str:
+        """Get the rows of a custom object import job that failed"""
+        return self._get_file(
+            f"{self.base_endpoint}/customobjects/{api_name}/import/{batch_id}/failures.json")
+
+    def get_custom_objects_import_warnings(self, api_name: str, batch_id: int) -> str:
+        """Get the rows of a custom object import job imported with warnings"""
+        return self._get_file(
+            f"{self.base_endpoint}/customobjects/{api_name}/import/{batch_id}/warnings.json")
+
+    def import_program_members_file(self, program_id: int, file: bytes,
+                                    program_member_status: str,
+                                    format: str = "csv") -> Dict[str, Any]:
+        """
+        Submit a program member import job
+
+        Args:
+            program_id: ID of the program
+            file: File contents, at most 10MB
+            program_member_status: Status given to the imported members
+            format: File format (csv, tsv or ssv)
+        """
+        return self._make_request("POST", f"{self.base_endpoint}/program/{program_id}/members/import.json",
+                                  form={"format": format, "programMemberStatus": program_member_status},
+                                  files={"file": (f"members.{format}", file, "text/plain")})
+
+    def get_program_members_import_status(self, batch_id: int) -> Dict[str, Any]:
+        """Get the status of a program member import job"""
+        return self._get(f"{self.base_endpoint}/program/members/import/{batch_id}/status.json")
+
+    def get_program_members_import_failures(self, batch_id: int) -> str:
+        """Get the rows of a program member import job that failed"""
+        return self._get_file(f"{self.base_endpoint}/program/members/import/{batch_id}/failures.json")
+
+    def get_program_members_import_warnings(self, batch_id: int) -> str:
+        """Get the rows of a program member import job imported with warnings"""
+        return self._get_file(f"{self.base_endpoint}/program/members/import/{batch_id}/warnings.json")
+
+    def import_leads(self, source: ImportSource, fields: Optional[List[str]] = None,
+                     lookup_field: Optional[str] = None, list_id: Optional[int] = None,
+                     partition_name: Optional[str] = None,
+                     max_file_size: int = MAX_IMPORT_FILE_SIZE,
+                     max_queued: int = MAX_QUEUED_IMPORTS,
+                     poll_interval: float = DEFAULT_POLL_INTERVAL,
+                     max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Import any number of leads through bulk jobs
+
+        The source is streamed into CSV files under the 10MB limit. Files are
+        submitted while fewer than max_queued jobs are pending, and pending
+        jobs are polled concurrently until every job has finished.
+
+        Args:
+            source: Path of a CSV file, or an iterable of lead dicts such as a generator
+            fields: Columns for dict rows (default: the keys of the first row)
+            lookup_field: Field used to match existing leads (default: email)
+            list_id: Static list to add the imported leads to
+            partition_name: Lead partition to import into
+            max_file_size: Maximum bytes per file
+            max_queued: Jobs pending at once (Marketo queues up to 10)
+            poll_interval: Seconds between rounds of status checks
+            max_workers: Status checks in flight at once (default: the rate limiter's concurrency cap)
+
+        Returns:
+            Report with "success", the final status of every job under "batches",
+            row totals, and the failed and warned rows with their reasons. Each
+            batch carries the 1-based "file" it was made from; a file whose
+            submission failed has status "Failed" and the exception's message under "error"
+        """
+        return self._run_imports(
+            iter_csv_files(source, fields, max_file_size),
+            lambda file: self.import_leads_file(file, lookup_field, list_id, partition_name),
+            self.get_leads_import_status, self.get_leads_import_failures,
+            self.get_leads_import_warnings, max_queued, poll_interval, max_workers)
+
+    def import_custom_objects(self, api_name: str, source: ImportSource,
+                              fields: Optional[List[str]] = None,
+                              max_file_size: int = MAX_IMPORT_FILE_SIZE,
+                              max_queued: int = MAX_QUEUED_IMPORTS,
+                              poll_interval: float = DEFAULT_POLL_INTERVAL,
+                              max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Import any number of custom object records through bulk jobs
+
+        Args:
+            api_name: API name of the custom object
+            source: Path of a CSV file, or an iterable of record dicts
+            fields: Columns for dict rows (default: the keys of the first row)
+            max_file_size: Maximum bytes per file
+            max_queued: Jobs pending at once (Marketo queues up to 10)
+            poll_interval: Seconds between rounds of status checks
+            max_workers: Status checks in flight at once (default: the rate limiter's concurrency cap)
+        """
+        return self._run_imports(
+            iter_csv_files(source, fields, max_file_size),
+            lambda file: self.import_custom_objects_file(api_name, file),
+            lambda batch_id: self.get_custom_objects_import_status(api_name, batch_id),
+            lambda batch_id: self.get_custom_objects_import_failures(api_name, batch_id),
+            lambda batch_id: self.get_custom_objects_import_warnings(api_name, batch_id),
+            max_queued, poll_interval, max_workers)
+
+    def import_program_members(self, program_id: int, source: ImportSource,
+                               program_member_status: str,
+                               fields: Optional[List[str]] = None,
+                               max_file_size: int = MAX_IMPORT_FILE_SIZE,
+                               max_queued: int = MAX_QUEUED_IMPORTS,
+                               poll_interval: float = DEFAULT_POLL_INTERVAL,
+                               max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Import any number of program members through bulk jobs
+
+        Args:
+            program_id: ID of the program
+            source: Path of a CSV file, or an iterable of lead dicts
+            program_member_status: Status given to the imported members
+            fields: Columns for dict rows (default: the keys of the first row)
+            max_file_size: Maximum bytes per file
+            max_queued: Jobs pending at once (Marketo queues up to 10)
+            poll_interval: Seconds between rounds of status checks
+            max_workers: Status checks in flight at once (default: the rate limiter's concurrency cap)
+        """
+        return self._run_imports(
+            iter_csv_files(source, fields, max_file_size),
+            lambda file: self.import_program_members_file(program_id, file, program_member_status),
+            self.get_program_members_import_status, self.get_program_members_import_failures,
+            self.get_program_members_import_warnings, max_queued, poll_interval, max_workers)
+
+    def _get_file(self, endpoint: str) -> str:
+        response = self._make_request("GET", endpoint, raw=True)
+        if isinstance(response, dict):
+            raise MarketoAPIError(response)
+        try:
+            response.encoding = response.encoding or "utf-8"
+            return response.text
+        finally:
+            response.close()
+
+    def _run_imports(self, files: Iterator[bytes], submit: Callable[[bytes], Dict[str, Any]],
+                     get_status: Callable[[int], Dict[str, Any]],
+                     get_failures: Callable[[int], str], get_warnings: Callable[[int], str],
+                     max_queued: int, poll_interval: float,
+                     max_workers: Optional[int]) -> Dict[str, Any]:
+        workers = self._worker_count(max_workers)
+        pending: List[int] = []
+        file_numbers: Dict[int, int] = {}
+        batches: List[Dict[str, Any]] = []
+        failures: List[Dict[str, Any]] = []
+        warnings: List[Dict[str, Any]] = []
+        submitted = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max(1, max_queued):
+                file = next(files, None)
+                if file is None:
+                    exhausted = True
+                    break
+                submitted += 1
+                try:
+                    batch_id = self._first_result(submit(file))["batchId"]
+                except Exception as e:
+                    # Keep going so the jobs already queued are still reported
+                    batches.append({"file": submitted, "status": "Failed", "error": str(e)})
+                    continue
+                file_numbers[batch_id] = submitted
+                pending.append(batch_id)
+            if not pending:
+                break
+            statuses = list(map_ordered(lambda batch_id: self._first_result(get_status(batch_id)),
+                                        pending, workers))
+            finished = [status for status in statuses if status.get("status") in ("Complete", "Failed")]
+            for status in finished:
+                batch_id = status["batchId"]
+                pending.remove(batch_id)
+                batches.append(dict(status, file=file_numbers[batch_id]))
+                if status.get("numOfRowsFailed"):
+                    failures.extend(_report_rows(batch_id, get_failures(batch_id)))
+                if status.get("numOfRowsWithWarning"):
+                    warnings.extend(_report_rows(batch_id, get_warnings(batch_id)))
+            if pending and not finished:
+                time.sleep(poll_interval)
+        return {
+            "success": all(batch.get("status") == "Complete" for batch in batches),
+            "batches": batches,
+            "rowsProcessed": sum(_rows_processed(batch) for batch in batches),
+            "rowsFailed": sum(batch.get("numOfRowsFailed") or 0 for batch in batches),
+            "rowsWithWarning": sum(batch.get("numOfRowsWithWarning") or 0 for batch in batches),
+            "failures": failures,
+            "warnings": warnings
+        }
+
+
+def _rows_processed(batch: Dict[str, Any]) -> int:
+    # Leads report numOfLeadsProcessed, custom objects numOfObjectsProcessed
+    for key in ("numOfLeadsProcessed", "numOfObjectsProcessed", "numOfRowsProcessed"):
+        if key in batch:
+            return batch[key] or 0
+    return 0
+
+
+def _report_rows(batch_id: int, text: str) -> List[Dict[str, Any]]:
+    """Parse a failures or warnings file, whose last column holds the reason, into row dicts"""
+    rows = []
+    for row in csv.DictReader(io.StringIO(text)):
+        reason_column = next((key for key in row if key and key.startswith("Import ")), None)
+        reason = row.pop(reason_column) if reason_column else None
+        rows.append({"batchId": batch_id, "reason": reason, "row": row})
+    return rows
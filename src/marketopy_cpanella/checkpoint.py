@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from .pagination import PageFetcher, check_response, has_next_page
+
+
+class CheckpointStore:
+    """
+    Persists sync progress: the next page token and a high-water mark per key
+
+    Subclass and implement load, save and delete to plug in another backend.
+    """
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the checkpoint saved under key, or None"""
+        raise NotImplementedError
+
+    def save(self, key: str, checkpoint: Dict[str, Any]) -> None:
+        """Persist a checkpoint under key, replacing any previous one"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Forget the checkpoint saved under key so the next sync starts over"""
+        raise NotImplementedError
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoints kept in one JSON file, rewritten atomically on every save"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the JSON file; created on first save
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, checkpoints: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(checkpoints, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._read().get(key)
+
+    def save(self, key: str, checkpoint: Dict[str, Any]) -> None:
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[key] = checkpoint
+            self._write(checkpoints)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(key, None) is not None:
+                self._write(checkpoints)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoints kept in a SQLite table, safe to share between processes"""
+
+    def __init__(self, path: str, table: str = "marketo_checkpoints"):
+        """
+        Args:
+            path: Path of the SQLite database file
+            table: Table holding the checkpoints; created if missing
+        """
+        self.path = path
+        self.table = table
+        with self._connect() as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, checkpoint TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the store usable from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as connection:
+            row = connection.execute(
+                f"SELECT checkpoint FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key: str, checkpoint: Dict[str, Any]) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, checkpoint, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(checkpoint), checkpoint.get("updated_at") or _now()))
+
+    def delete(self, key: str) -> None:
+        with self._connect() as connection:
+            connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def iter_checkpointed_pages(store: CheckpointStore, key: str, fetch: PageFetcher,
+                            start_token: Callable[[Optional[str]], Optional[str]],
+                            watermark_field: str = "activityDate",
+                            id_field: str = "id") -> Iterator[List[Dict[str, Any]]]:
+    """
+    Follow a nextPageToken chain from its last checkpoint and yield each page's records
+
+    A page counts as committed when the caller asks for the next one; only
+    then is the token of the following page saved along with the highest
+    watermark_field value seen and the IDs of the records carrying it. A
+    process that dies mid-page resumes by re-reading that page and never
+    re-downloads committed pages. When the chain ends, Marketo's continuation
+    token (if any) is saved so the next sync picks up only newer changes.
+    A chain that ends without one is saved as completed, and the next sync
+    starts from the high-water mark, skipping the records already yielded
+    there.
+
+    Args:
+        store: Where checkpoints are persisted
+        key: Name of this sync in the store
+        fetch: Callable taking a page token and returning the response
+        start_token: Callable giving the first token, from the high-water mark
+                     of a completed chain or from the start (None) when there is none
+        watermark_field: Record field tracked as the high-water mark
+        id_field: Record field identifying records at the high-water mark
+    """
+    checkpoint = store.load(key)
+    high_water_mark = checkpoint.get("high_water_mark") if checkpoint else None
+    high_water_ids = list(checkpoint.get("high_water_ids") or ()) if checkpoint else []
+    resumed_after = None
+    if not checkpoint:
+        token = start_token(None)
+    elif checkpoint.get("completed"):
+        token = start_token(high_water_mark)
+        resumed_after = high_water_mark
+    else:
+        token = checkpoint.get("next_page_token")
+    seen_at_mark = set(high_water_ids)
+    while True:
+        response = check_response(fetch(token))
+        records = response.get("result") or []
+        if resumed_after is not None:
+            # The chain restarts at the high-water mark, which was already read up to seen_at_mark
+            records = [record for record in records
+                       if record.get(watermark_field) is None
+                       or record[watermark_field] > resumed_after
+                       or (record[watermark_field] == resumed_after
+                           and record.get(id_field) not in seen_at_mark)]
+        if records:
+            yield records
+        for record in records:
+            value = record.get(watermark_field)
+            if value is None:
+                continue
+            if high_water_mark is None or value > high_water_mark:
+                high_water_mark = value
+                high_water_ids = []
+            if value == high_water_mark and record.get(id_field) is not None:
+                high_water_ids.append(record[id_field])
+        more = has_next_page(response)
+        next_token = response.get("nextPageToken")
+        if next_token:
+            token = next_token
+        store.save(key, {
+            "next_page_token": token,
+            "high_water_mark": high_water_mark,
+            "high_water_ids": high_water_ids,
+            "completed": not more and not next_token,
+            "updated_at": _now()
+        })
+        if not more:
+            return
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Union
+
+
+class JSONCodec:
+    """
+    Encodes request bodies to bytes and decodes response bodies
+
+    The default implementation uses the standard library json module;
+    subclasses wrap faster libraries with the same interface.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes"""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Parse a JSON document"""
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+
+_CODECS = {"orjson": OrjsonCodec, "msgspec": MsgspecCodec, "json": JSONCodec}
+_PREFERENCE = ("orjson", "msgspec", "json")
+
+
+def get_codec(codec: Union[None, str, JSONCodec] = None) -> JSONCodec:
+    """
+    Resolve a codec: an instance is returned as is, a name selects that library,
+    and None picks the fastest installed one (orjson, then msgspec, then json)
+
+    Args:
+        codec: Codec instance, library name, or None
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is not None:
+        if codec not in _CODECS:
+            raise ValueError(f"unknown JSON codec {codec!r}; expected one of {sorted(_CODECS)}")
+        return _CODECS[codec]()
+    for name in _PREFERENCE:
+        try:
+            return _CODECS[name]()
+        except ImportError:
+            continue
+    return JSONCodec()
+
@@ -0,0 +1,272 @@
+import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+INTEGER_TYPES = frozenset(["integer", "reference", "score"])
+FLOAT_TYPES = frozenset(["float", "currency", "percent"])
+BOOLEAN_TYPES = frozenset(["boolean"])
+DATETIME_TYPES = frozenset(["datetime"])
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def field_types_from_describe(response: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Map field names to Marketo data types from a describe response
+
+    Handles both shapes: the lead describe lists fields with their REST name
+    under "rest", while company, opportunity and custom object describes hold
+    a "fields" list on their single result.
+
+    Args:
+        response: Response of a describe endpoint
+    """
+    types: Dict[str, str] = {}
+    for entry in response.get("result") or ():
+        if "fields" in entry:
+            for field in entry["fields"]:
+                types[field["name"]] = field.get("dataType", "string")
+        else:
+            name = (entry.get("rest") or {}).get("name") or entry.get("name")
+            if name:
+                types[name] = entry.get("dataType", "string")
+    return types
+
+
+def _require(module_name: str) -> Any:
+    try:
+        return __import__(module_name)
+    except ImportError as e:
+        raise ImportError(f"this conversion requires {module_name}: pip install {module_name}") from e
+
+
+def _to_bool(value: Any) -> int:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        if value.lower() in ("true", "1"):
+            return 1
+        if value.lower() in ("false", "0"):
+            return 0
+        raise ValueError(value)
+    return int(bool(value))
+
+
+def _to_micros(value: Any) -> int:
+    # Integer arithmetic keeps microseconds exact
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _format_micros(micros: int) -> str:
+    return _from_micros(micros).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class _Column:
+    """One typed column: a flat array.array of values plus a byte per row validity mask"""
+
+    __slots__ = ("kind", "values", "valid", "null_count", "convert")
+
+    def __init__(self, data_type: str, length: int = 0):
+        if data_type in INTEGER_TYPES:
+            self.kind, typecode, self.convert = "int", "q", int
+        elif data_type in FLOAT_TYPES:
+            self.kind, typecode, self.convert = "float", "d", float
+        elif data_type in BOOLEAN_TYPES:
+            self.kind, typecode, self.convert = "bool", "b", _to_bool
+        elif data_type in DATETIME_TYPES:
+            self.kind, typecode, self.convert = "datetime", "q", _to_micros
+        else:
+            self.kind, typecode, self.convert = "object", "", None
+        self.values: Any = array.array(typecode, bytes(length * array.array(typecode).itemsize)) \
+            if typecode else [None] * length
+        self.valid = bytearray(b"\x00" * length)
+        self.null_count = length
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.values.append(0 if self.convert is not None else None)
+            self.valid.append(0)
+            self.null_count += 1
+            return
+        if self.convert is not None:
+            try:
+                value = self.convert(value)
+            except (AttributeError, TypeError, ValueError, OverflowError):
+                self._demote()
+        self.values.append(value)
+        self.valid.append(1)
+
+    def _demote(self) -> None:
+        # A value that does not fit the declared type turns the column into plain objects
+        if self.kind == "datetime":
+            values = [_format_micros(micros) if valid else None
+                      for micros, valid in zip(self.values, self.valid)]
+        elif self.kind == "bool":
+            values = [bool(value) if valid else None for value, valid in zip(self.values, self.valid)]
+        else:
+            values = [value if valid else None for value, valid in zip(self.values, self.valid)]
+        self.kind, self.values, self.convert = "object", values, None
+
+
+class ColumnarBuffer:
+    """
+    Records accumulated straight into typed column buffers
+
+    Integer, float, boolean and datetime fields (by their Marketo data type)
+    are stored in flat array.array buffers, which hand their memory to NumPy,
+    pandas and pyarrow without copying. Other fields are kept as Python lists.
+    Fields missing from the types map, or appearing in later records only,
+    become object columns with nulls for the earlier rows.
+
+    Once a buffer has been handed off with to_numpy, to_pandas or to_arrow,
+    stop appending to it: the exported arrays share its memory.
+    """
+
+    def __init__(self, field_types: Optional[Dict[str, str]] = None,
+                 fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            field_types: Field names mapped to Marketo data types, e.g. from field_types_from_describe
+            fields: Columns to create up front, in order
+        """
+        self.field_types = dict(field_types or {})
+        self.columns: Dict[str, _Column] = {}
+        self.length = 0
+        for field in fields or ():
+            self._add_column(field)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _add_column(self, name: str) -> _Column:
+        column = _Column(self.field_types.get(name, "string"), self.length)
+        self.columns[name] = column
+        return column
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> "ColumnarBuffer":
+        """Append records; each record's dict can be released as soon as it is consumed"""
+        columns = self.columns
+        for record in records:
+            if not columns.keys() >= record.keys():
+                for name in record:
+                    if name not in columns:
+                        self._add_column(name)
+            get = record.get
+            for name, column in columns.items():
+                column.append(get(name))
+            self.length += 1
+        return self
+
+    def to_pydict(self) -> Dict[str, List[Any]]:
+        """Columns as Python lists with None for nulls (copies)"""
+        result: Dict[str, List[Any]] = {}
+        for name, column in self.columns.items():
+            if column.kind == "object":
+                result[name] = list(column.values)
+                continue
+            convert: Any = {"int": int, "float": float, "bool": bool,
+                            "datetime": _from_micros}[column.kind]
+            result[name] = [convert(value) if valid else None
+                            for value, valid in zip(column.values, column.valid)]
+        return result
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Columns as NumPy arrays sharing the buffers' memory
+
+        Columns with nulls come back as masked arrays; object columns are copied
+        into object arrays.
+        """
+        np = _require("numpy")
+        dtypes = {"int": np.int64, "float": np.float64, "bool": np.bool_,
+                  "datetime": "datetime64[us]"}
+        result: Dict[str, Any] = {}
+        for name, column in self.columns.items():
+            if column.kind == "object":
+                values = np.empty(self.length, dtype=object)
+                values[:] = column.values
+                result[name] = values
+                continue
+            values = np.frombuffer(column.values, dtype=dtypes[column.kind])
+            if column.null_count:
+                values = np.ma.MaskedArray(values, mask=~np.frombuffer(column.valid, dtype=np.bool_))
+            result[name] = values
+        return result
+
+    def to_arrow(self) -> Any:
+        """
+        Columns as a pyarrow Table
+
+        Integer, float and datetime columns wrap the existing buffers without
+        copying; booleans are bit-packed and object columns are converted.
+        """
+        pa = _require("pyarrow")
+        arrow_types = {"int": pa.int64(), "float": pa.float64(),
+                       "datetime": pa.timestamp("us", tz="UTC")}
+        arrays = {}
+        for name, column in self.columns.items():
+            if column.kind in arrow_types:
+                validity = self._validity_bitmap(pa, column) if column.null_count else None
+                arrays[name] = pa.Array.from_buffers(
+                    arrow_types[column.kind], self.length,
+                    [validity, pa.py_buffer(column.values)], column.null_count)
+            elif column.kind == "bool":
+                arrays[name] = pa.array([bool(value) if valid else None
+                                         for value, valid in zip(column.values, column.valid)],
+                                        type=pa.bool_())
+            else:
+                arrays[name] = pa.array(column.values)
+        return pa.table(arrays)
+
+    @staticmethod
+    def _validity_bitmap(pa: Any, column: _Column) -> Any:
+        try:
+            import numpy as np
+        except ImportError:
+            bits = bytearray((len(column.valid) + 7) // 8)
+            for index, valid in enumerate(column.valid):
+                if valid:
+                    bits[index >> 3] |= 1 << (index & 7)
+            return pa.py_buffer(bytes(bits))
+        return pa.py_buffer(np.packbits(np.frombuffer(column.valid, dtype=np.uint8),
+                                        bitorder="little").tobytes())
+
+    def to_pandas(self) -> Any:
+        """
+        Columns as a pandas DataFrame
+
+        Goes through pyarrow when it is installed. Otherwise numeric columns
+        become NumPy-backed (nullable where they have nulls) pandas arrays that
+        share the buffers' memory.
+        """
+        pd = _require("pandas")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            return self.to_arrow().to_pandas()
+        import numpy as np
+        data = {}
+        for name, values in self.to_numpy().items():
+            column = self.columns[name]
+            if column.kind == "datetime":
+                series = pd.Series(np.ma.getdata(values)).dt.tz_localize("UTC")
+                data[name] = series.where(~np.ma.getmaskarray(values)) if column.null_count else series
+            elif not column.null_count or column.kind == "object":
+                data[name] = values
+            elif column.kind == "int":
+                data[name] = pd.arrays.IntegerArray(values.data, values.mask)
+            elif column.kind == "float":
+                data[name] = pd.arrays.FloatingArray(values.data, values.mask)
+            else:
+                data[name] = pd.arrays.BooleanArray(values.data, values.mask)
+        return pd.DataFrame(data)
@@ -1,14 +1,16 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, MAX_FILTER_VALUES, sync_only
+from .columnar import ColumnarBuffer
+from .pagination import iter_token_records
 
 class Companies(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/companies"
 
     def describe(self) -> Dict[str, Any]:
-        """Get metadata about the company object and its fields"""
-        return self._get(f"{self.base_endpoint}/describe.json")
+        """Get metadata about the company object and its fields (cacheable)"""
+        return self._get_cached(f"{self.base_endpoint}/describe.json")
 
     def get_companies(self, filter_type: str, filter_values: List[str],
                      fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
@@ -22,7 +24,18 @@ class Companies(MarketoBase):
             fields: List of fields to return (default: id, dedupeFields, updatedAt, createdAt)
             batch_size: Number of records to return per page
             next_page_token: Token for getting the next page of results
+            
+        Long value lists are sent as a form body via POST ?_method=GET. More than
+        300 values are split into concurrent batches of 300 whose pages are all
+        fetched and merged, deduplicated by id, into a single result.
         """
+        if len(filter_values) > MAX_FILTER_VALUES:
+            if next_page_token:
+                raise ValueError("next_page_token cannot be combined with more than "
+                                 f"{MAX_FILTER_VALUES} filter values")
+            return self._get_split_filter(
+                lambda chunk: self.iter_companies(filter_type, chunk, fields, batch_size, prefetch=False),
+                filter_values, id_field="id")
         params = {
             "filterType": filter_type,
             "filterValues": ",".join(filter_values)
@@ -34,7 +47,43 @@ class Companies(MarketoBase):
         if next_page_token:
             params["nextPageToken"] = next_page_token
             
-        return self._get(f"{self.base_endpoint}.json", params=params)
+        return self._get_filtered(f"{self.base_endpoint}.json", params)
+
+    @sync_only
+    def iter_companies(self, filter_type: str, filter_values: List[str],
+                       fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                       prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream companies matching the filter across every page
+        
+        Args:
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_companies(filter_type, filter_values, fields, batch_size, token),
+            prefetch=prefetch)
+
+    @sync_only
+    def get_companies_columnar(self, filter_type: str, filter_values: List[str],
+                               fields: Optional[List[str]] = None,
+                               batch_size: Optional[int] = None) -> ColumnarBuffer:
+        """
+        Read every company matching the filter into typed column buffers
+        
+        Args:
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by, any number
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+        """
+        return self._read_columnar(
+            self.describe(),
+            lambda chunk: self.iter_companies(filter_type, chunk, fields, batch_size),
+            filter_values, fields)
 
     def create_or_update_companies(self, companies: List[Dict[str, Any]], 
                                  action: str = "createOrUpdate",
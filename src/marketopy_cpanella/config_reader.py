@@ -1,18 +1,55 @@
+import csv
 import sys
-import pandas as pd
+
+CONFIG_FILE = 'subscriptions.csv'
+CONFIG_COLUMNS = ['munchkin_id', 'client_id', 'client_secret', 'environment']
+
+def read_subscriptions(path=CONFIG_FILE):
+    """
+    Read every row of the subscriptions config file
+
+    Args:
+        path: Path to the subscriptions CSV file
+
+    Returns:
+        List of dicts keyed by the CSV column headers
+    """
+    with open(path, newline='') as config_file:
+        return [
+            {key.strip(): (value or '').strip() for key, value in row.items() if key is not None}
+            for row in csv.DictReader(config_file)
+        ]
+
+def read_secrets_subscriptions():
+    """
+    Read every entry of SUBSCRIPTION_INFORMATION in secrets.py
+
+    Returns:
+        List of dicts with the same keys as read_subscriptions
+    """
+    import secrets
+    return [
+        {
+            'munchkin_id': entry['MUNCHKIN_ID'],
+            'client_id': entry['CLIENT_ID'],
+            'client_secret': entry['CLIENT_SECRET'],
+            'environment': entry.get('ENVIRONMENT', '')
+        }
+        for entry in secrets.SUBSCRIPTION_INFORMATION
+    ]
 
 def read_configuration_file():
     try:
-        subscriptions = pd.read_csv('subscriptions.csv')
-    except:
+        subscriptions = read_subscriptions()
+    except OSError:
         print("Unable to find the subscriptions.csv file. Please create one within the venv.")
         sys.exit(0)
     try:
-        munchkinList = subscriptions.munchkin_id
-    except:
+        munchkinList = [subscription['munchkin_id'] for subscription in subscriptions]
+    except KeyError:
         print("The subscriptions.csv file does not follow the correct naming convention")
         print("Please ensure the column headers are labeled as the following: ")
-        print("munchkin_id, client_id, client_secret, environment")
+        print(", ".join(CONFIG_COLUMNS))
         sys.exit(0)
     return munchkinList
 
@@ -25,12 +62,12 @@ def read_options_to_user():
         i += 1
 
 def get_subscription_info(knownSubscription):
-    subscriptions = pd.read_csv('subscriptions.csv')
-    munchkin_ids = subscriptions.munchkin_id
-    client_ids = subscriptions.client_id
-    client_secrets = subscriptions.client_secret
+    subscription = read_subscriptions()[knownSubscription]
+    munchkin_id = subscription['munchkin_id']
+    client_id = subscription['client_id']
+    client_secret = subscription['client_secret']
     print()
-    print("Using Sub: \n {0} \n {1} \n {2}".format(munchkin_ids[knownSubscription], client_ids[knownSubscription], client_secrets[knownSubscription]))
+    print("Using Sub: \n {0} \n {1} \n {2}".format(munchkin_id, client_id, client_secret))
     print()
 
-    return munchkin_ids[knownSubscription], client_ids[knownSubscription], client_secrets[knownSubscription]
+    return munchkin_id, client_id, client_secret
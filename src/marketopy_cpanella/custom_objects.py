@@ -1,9 +1,11 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, MAX_FILTER_VALUES, sync_only
+from .columnar import ColumnarBuffer
+from .pagination import iter_token_records
 
 class CustomObjects(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/customobjects"
 
     def list(self) -> Dict[str, Any]:
@@ -12,12 +14,12 @@ class CustomObjects(MarketoBase):
 
     def describe(self, api_name: str) -> Dict[str, Any]:
         """
-        Get metadata about a specific custom object type
+        Get metadata about a specific custom object type (cacheable)
         
         Args:
             api_name: API name of the custom object type
         """
-        return self._get(f"{self.base_endpoint}/{api_name}/describe.json")
+        return self._get_cached(f"{self.base_endpoint}/{api_name}/describe.json")
 
     def get_custom_objects(self, api_name: str, filter_type: str, filter_values: List[str],
                           fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
@@ -32,7 +34,19 @@ class CustomObjects(MarketoBase):
             fields: List of fields to return
             batch_size: Number of records to return per page
             next_page_token: Token for getting the next page of results
+            
+        Long value lists are sent as a form body via POST ?_method=GET. More than
+        300 values are split into concurrent batches of 300 whose pages are all
+        fetched and merged, deduplicated by marketoGUID, into a single result.
         """
+        if len(filter_values) > MAX_FILTER_VALUES:
+            if next_page_token:
+                raise ValueError("next_page_token cannot be combined with more than "
+                                 f"{MAX_FILTER_VALUES} filter values")
+            return self._get_split_filter(
+                lambda chunk: self.iter_custom_objects(api_name, filter_type, chunk, fields,
+                                                      batch_size, prefetch=False),
+                filter_values, id_field="marketoGUID")
         params = {
             "filterType": filter_type,
             "filterValues": ",".join(filter_values)
@@ -44,7 +58,47 @@ class CustomObjects(MarketoBase):
         if next_page_token:
             params["nextPageToken"] = next_page_token
             
-        return self._get(f"{self.base_endpoint}/{api_name}.json", params=params)
+        return self._get_filtered(f"{self.base_endpoint}/{api_name}.json", params)
+
+    @sync_only
+    def iter_custom_objects(self, api_name: str, filter_type: str, filter_values: List[str],
+                            fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                            prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream custom objects matching the filter across every page
+        
+        Args:
+            api_name: API name of the custom object type
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_custom_objects(api_name, filter_type, filter_values,
+                                                  fields, batch_size, token),
+            prefetch=prefetch)
+
+    @sync_only
+    def get_custom_objects_columnar(self, api_name: str, filter_type: str,
+                                    filter_values: List[str],
+                                    fields: Optional[List[str]] = None,
+                                    batch_size: Optional[int] = None) -> ColumnarBuffer:
+        """
+        Read every custom object matching the filter into typed column buffers
+        
+        Args:
+            api_name: API name of the custom object type
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by, any number
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+        """
+        return self._read_columnar(
+            self.describe(api_name),
+            lambda chunk: self.iter_custom_objects(api_name, filter_type, chunk, fields, batch_size),
+            filter_values, fields)
 
     def create_or_update_custom_objects(self, api_name: str, objects: List[Dict[str, Any]],
                                       action: str = "createOrUpdate",
@@ -0,0 +1,36 @@
+from typing import Any, Dict, List, Optional
+
+
+class MarketoError(Exception):
+    """Base class for errors raised by the client"""
+
+
+class MarketoAPIError(MarketoError):
+    """
+    A call returned success false where the client cannot hand back the response
+
+    Plain endpoint methods return error responses as-is; helpers that consume
+    responses themselves, such as the paging iterators, raise this instead.
+    """
+
+    def __init__(self, response: Dict[str, Any]):
+        self.response = response
+        self.errors: List[Dict[str, Any]] = response.get("errors") or []
+        self.request_id: Optional[str] = response.get("requestId")
+        message = "; ".join(
+            "{0}: {1}".format(error.get("code"), error.get("message")) for error in self.errors
+        ) or "request failed"
+        super().__init__("Marketo request {0} failed: {1}".format(self.request_id, message))
+
+    @property
+    def codes(self) -> List[str]:
+        """Marketo error codes carried by the response"""
+        return [str(error.get("code")) for error in self.errors]
+
+
+class QuotaExceededError(MarketoError):
+    """A call was refused by the client's quota governor before it was sent"""
+
+    def __init__(self, message: str, tag: Optional[str] = None):
+        self.tag = tag
+        super().__init__(message)
@@ -1,15 +1,16 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, sync_only
+from .pagination import iter_token_records
 
 class FieldList(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/fields"
 
     def get_fields(self, batch_size: Optional[int] = None,
                    next_page_token: Optional[str] = None) -> Dict[str, Any]:
         """
-        Get list of fields available in the instance
+        Get list of fields available in the instance (cacheable)
         
         Args:
             batch_size: Number of records to return per page
@@ -21,7 +22,21 @@ class FieldList(MarketoBase):
         if next_page_token:
             params["nextPageToken"] = next_page_token
             
-        return self._get(f"{self.base_endpoint}.json", params=params)
+        return self._get_cached(f"{self.base_endpoint}.json", params=params)
+
+    @sync_only
+    def iter_fields(self, batch_size: Optional[int] = None,
+                    prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every field available in the instance across all pages
+        
+        Args:
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_fields(batch_size, token),
+            prefetch=prefetch)
 
     def get_field_by_name(self, field_name: str) -> Dict[str, Any]:
         """
@@ -39,7 +54,9 @@ class FieldList(MarketoBase):
         Args:
             field_data: Dictionary containing field metadata
         """
-        return self._post(f"{self.base_endpoint}.json", data=field_data)
+        response = self._post(f"{self.base_endpoint}.json", data=field_data)
+        self._invalidate_metadata()
+        return response
 
     def update_field(self, field_name: str, field_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -49,7 +66,9 @@ class FieldList(MarketoBase):
             field_name: API name of the field to update
             field_data: Dictionary containing updated field metadata
         """
-        return self._post(f"{self.base_endpoint}/{field_name}.json", data=field_data)
+        response = self._post(f"{self.base_endpoint}/{field_name}.json", data=field_data)
+        self._invalidate_metadata()
+        return response
 
     def delete_field(self, field_name: str) -> Dict[str, Any]:
         """
@@ -58,4 +77,6 @@ class FieldList(MarketoBase):
         Args:
             field_name: API name of the field to delete
         """
-        return self._delete(f"{self.base_endpoint}/{field_name}.json") 
\ No newline at end of file
+        response = self._delete(f"{self.base_endpoint}/{field_name}.json")
+        self._invalidate_metadata()
+        return response 
\ No newline at end of file
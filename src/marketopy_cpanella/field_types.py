@@ -2,13 +2,13 @@ from typing import Dict, Any
 from .base import MarketoBase
 
 class FieldTypes(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/fieldTypes"
 
     def get_field_types(self) -> Dict[str, Any]:
-        """Get list of available field types"""
-        return self._get(f"{self.base_endpoint}.json")
+        """Get list of available field types (cacheable)"""
+        return self._get_cached(f"{self.base_endpoint}.json")
 
     def get_field_type_by_name(self, field_type_name: str) -> Dict[str, Any]:
         """
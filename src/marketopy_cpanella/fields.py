@@ -2,8 +2,8 @@ from typing import Dict, Any, List, Optional
 from .base import MarketoBase
 
 class Fields(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/leads"
         self.field_types_endpoint = "v1/leads/fieldtypes"
 
@@ -57,7 +57,9 @@ class Fields(MarketoBase):
         if description:
             data["description"] = description
             
-        return self._post(f"{self.base_endpoint}/fields.json", data=data)
+        response = self._post(f"{self.base_endpoint}/fields.json", data=data)
+        self._invalidate_metadata()
+        return response
 
     def update_field(self, field_name: str, display_name: Optional[str] = None,
                     description: Optional[str] = None, is_required: Optional[bool] = None,
@@ -82,7 +84,9 @@ class Fields(MarketoBase):
         if is_hidden is not None:
             data["isHidden"] = is_hidden
             
-        return self._put(f"{self.base_endpoint}/field/{field_name}.json", data=data)
+        response = self._put(f"{self.base_endpoint}/field/{field_name}.json", data=data)
+        self._invalidate_metadata()
+        return response
 
     def delete_field(self, field_name: str) -> Dict[str, Any]:
         """
@@ -91,7 +95,9 @@ class Fields(MarketoBase):
         Args:
             field_name: Name of the field to delete
         """
-        return self._delete(f"{self.base_endpoint}/field/{field_name}.json")
+        response = self._delete(f"{self.base_endpoint}/field/{field_name}.json")
+        self._invalidate_metadata()
+        return response
 
     def get_field_types(self) -> Dict[str, Any]:
         """Get all available field types"""
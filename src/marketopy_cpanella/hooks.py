@@ -0,0 +1,135 @@
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+EVENTS = ("before_request", "after_response", "on_error")
+
+Callback = Callable[["RequestEvent"], None]
+
+
+class RequestEvent:
+    """
+    One attempt of an API call, as passed to hook callbacks
+
+    The same event object is passed to before_request, then to
+    after_response and on_error, so a callback can stash its own data in
+    extra. Re-driven attempts of a call get new events with attempt counting
+    up from 0.
+    """
+
+    __slots__ = ("method_name", "http_method", "url", "params", "attempt", "started_at",
+                 "queue_seconds", "elapsed", "bytes_sent", "bytes_received", "status_code",
+                 "request_id", "success", "error_codes", "will_retry", "exception", "extra")
+
+    def __init__(self, method_name: str, http_method: str, url: str,
+                 params: Optional[Dict[str, Any]], attempt: int, started_at: float):
+        self.method_name = method_name
+        self.http_method = http_method
+        self.url = url
+        self.params = params
+        self.attempt = attempt
+        self.started_at = started_at
+        # Seconds spent waiting on the rate limiter before the request was sent
+        self.queue_seconds: Optional[float] = None
+        # Seconds from sending the request to the decoded response (or the error)
+        self.elapsed: Optional[float] = None
+        self.bytes_sent: Optional[int] = None
+        self.bytes_received: Optional[int] = None
+        self.status_code: Optional[int] = None
+        self.request_id: Optional[str] = None
+        self.success: Optional[bool] = None
+        self.error_codes: List[str] = []
+        self.will_retry = False
+        self.exception: Optional[BaseException] = None
+        self.extra: Dict[str, Any] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The event's fields as a dict, e.g. for structured logging"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (f"RequestEvent({self.method_name} {self.http_method} attempt={self.attempt} "
+                f"elapsed={self.elapsed} status={self.status_code} success={self.success})")
+
+
+class Hooks:
+    """
+    Callbacks run around every API call of the clients sharing a session
+
+    before_request runs before an attempt is sent, after_response runs once
+    its response has been decoded, and on_error runs when the attempt raised
+    or Marketo answered with success false. Callbacks run synchronously on
+    the calling thread, and an exception raised by one propagates to the
+    caller, so a before_request callback can veto a call. While no callback
+    is subscribed, requests skip building events altogether.
+    """
+
+    def __init__(self):
+        self._callbacks: Dict[str, List[Callback]] = {event: [] for event in EVENTS}
+        self._lock = threading.Lock()
+        self.active = False
+
+    def subscribe(self, event: str, callback: Callback) -> Callback:
+        """
+        Register a callback for an event
+
+        Args:
+            event: "before_request", "after_response" or "on_error"
+            callback: Callable taking the RequestEvent
+
+        Returns:
+            The callback
+        """
+        if event not in self._callbacks:
+            raise ValueError(f"unknown hook event {event!r}; expected one of {EVENTS}")
+        with self._lock:
+            # Copy on write so emitting never needs the lock
+            self._callbacks[event] = self._callbacks[event] + [callback]
+            self.active = True
+        return callback
+
+    def unsubscribe(self, event: str, callback: Callback) -> None:
+        """Remove a callback registered with subscribe"""
+        with self._lock:
+            self._callbacks[event] = [registered for registered in self._callbacks[event]
+                                      if registered is not callback]
+            self.active = any(self._callbacks.values())
+
+    def before_request(self, callback: Callback) -> Callback:
+        """Decorator registering a before_request callback"""
+        return self.subscribe("before_request", callback)
+
+    def after_response(self, callback: Callback) -> Callback:
+        """Decorator registering an after_response callback"""
+        return self.subscribe("after_response", callback)
+
+    def on_error(self, callback: Callback) -> Callback:
+        """Decorator registering an on_error callback"""
+        return self.subscribe("on_error", callback)
+
+    def emit(self, event: str, request_event: RequestEvent) -> None:
+        """Run the callbacks registered for an event"""
+        for callback in self._callbacks[event]:
+            callback(request_event)
+
+
+def caller_method_name(base_class: type, depth: int = 2) -> str:
+    """
+    Name of the nearest public sub-client method on the call stack
+
+    Walks up from the caller until it finds a frame running a public method
+    of a base_class instance, e.g. LeadDatabase.get_leads for a page fetched
+    by iter_leads, and returns "Class.method". Only called while hooks are
+    subscribed.
+    """
+    frame = sys._getframe(depth)
+    while frame is not None:
+        code = frame.f_code
+        if not code.co_name.startswith("_") and code.co_varnames[:1] == ("self",):
+            instance = frame.f_locals.get("self")
+            if isinstance(instance, base_class):
+                function = getattr(type(instance), code.co_name, None)
+                if getattr(function, "__code__", None) is code:
+                    return f"{type(instance).__name__}.{code.co_name}"
+        frame = frame.f_back
+    return "unknown"
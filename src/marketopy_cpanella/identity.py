@@ -2,8 +2,8 @@ from typing import Dict, Any, Optional
 from .base import MarketoBase
 
 class Identity(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "identity"
 
     def get_access_token(self, grant_type: str = "client_credentials",
@@ -31,5 +31,5 @@ class Identity(MarketoBase):
         Args:
             access_token: The access token to get identity for
         """
-        self.headers["Authorization"] = f"Bearer {access_token}"
-        return self._get(f"{self.base_endpoint}/oauth/userinfo.json") 
\ No newline at end of file
+        return self._make_request("GET", f"{self.base_endpoint}/oauth/userinfo.json",
+                                  headers={"Authorization": f"Bearer {access_token}"}) 
\ No newline at end of file
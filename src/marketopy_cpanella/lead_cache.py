@@ -0,0 +1,209 @@
+import collections
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 300.0
+DEFAULT_NEGATIVE_TTL = 60.0
+
+
+def normalize_email(email: str) -> str:
+    """Emails are matched case-insensitively, ignoring surrounding whitespace"""
+    return email.strip().lower()
+
+
+class LeadCache:
+    """
+    Bounded LRU cache with TTL for single-lead lookups by ID and by email
+
+    Successful responses that found no lead are cached too, for the shorter
+    negative_ttl, so repeated lookups of unknown leads do not spend calls.
+    Failed responses are never cached. Entries are kept per Munchkin ID, so
+    one cache can be shared by clients of several subscriptions. Writes made
+    through a client invalidate the leads they touch, including lookups
+    still loading when the write lands: their responses are not cached.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Entries kept before the least recently used is evicted
+            ttl: Seconds a found lead stays cached
+            negative_ttl: Seconds a lookup that found no lead stays cached
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "collections.OrderedDict[Tuple[str, str, Any], Tuple[float, Dict[str, Any]]]" = \
+            collections.OrderedDict()
+        # Cache keys holding each lead, by the lead's ID and email keys
+        self._holders: Dict[Tuple[str, str, Any], Set[Tuple[str, str, Any]]] = {}
+        self._lock = threading.Lock()
+        # Invalidation generation per key, kept only while loads are in flight
+        self._generation = 0
+        self._invalidated: Dict[Tuple[str, str, Any], int] = {}
+        self._loading = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(munchkin_id: str, kind: str, value: Any) -> Tuple[str, str, Any]:
+        if kind == "email":
+            return munchkin_id, kind, normalize_email(value)
+        return munchkin_id, kind, int(value)
+
+    def get(self, munchkin_id: str, kind: str, value: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of the cached response for a lookup, or None on a miss
+
+        Args:
+            munchkin_id: Subscription the lead belongs to
+            kind: "id" or "email"
+            value: Lead ID or email address
+        """
+        key = self._key(munchkin_id, kind, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            response = entry[1]
+            if response.get("result"):
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        return copy.deepcopy(response)
+
+    def put(self, munchkin_id: str, kind: str, value: Any, response: Dict[str, Any]) -> None:
+        """Cache a successful lookup response; failed responses are ignored"""
+        if not response.get("success"):
+            return
+        key = self._key(munchkin_id, kind, value)
+        with self._lock:
+            self._store(key, response)
+
+    def _store(self, key: Tuple[str, str, Any], response: Dict[str, Any]) -> None:
+        # Caller holds self._lock
+        self._discard(key)
+        ttl = self.ttl if response.get("result") else self.negative_ttl
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(response))
+        for lead_key in self._lead_keys(key[0], response):
+            if lead_key != key:
+                self._holders.setdefault(lead_key, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _discard(self, key: Tuple[str, str, Any]) -> Optional[Tuple[float, Dict[str, Any]]]:
+        # Caller holds self._lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for lead_key in self._lead_keys(key[0], entry[1]):
+                holders = self._holders.get(lead_key)
+                if holders is not None:
+                    holders.discard(key)
+                    if not holders:
+                        del self._holders[lead_key]
+        return entry
+
+    def _lead_keys(self, munchkin_id: str, response: Dict[str, Any]) -> Iterable[Tuple[str, str, Any]]:
+        for lead in response.get("result") or ():
+            if lead.get("id") is not None:
+                yield self._key(munchkin_id, "id", lead["id"])
+            if lead.get("email"):
+                yield self._key(munchkin_id, "email", lead["email"])
+
+    def get_or_load(self, munchkin_id: str, kind: str, value: Any,
+                    load: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Serve a lookup from the cache, or call load and cache its response
+
+        The response is not cached if the lookup, or a lead it returned, was
+        invalidated while load was running, since it may predate the write.
+        """
+        response = self.get(munchkin_id, kind, value)
+        if response is not None:
+            return response
+        key = self._key(munchkin_id, kind, value)
+        with self._lock:
+            self._loading += 1
+            started = self._generation
+        try:
+            response = load()
+        finally:
+            with self._lock:
+                self._loading -= 1
+                if response is not None and response.get("success"):
+                    keys = [key]
+                    keys.extend(self._lead_keys(munchkin_id, response))
+                    if all(self._invalidated.get(k, started) <= started for k in keys):
+                        self._store(key, response)
+                if not self._loading:
+                    self._invalidated.clear()
+        return response
+
+    def invalidate(self, munchkin_id: str, lead_ids: Iterable[Any] = (),
+                   emails: Iterable[str] = ()) -> None:
+        """
+        Drop cached lookups for leads by ID and by email
+
+        Every cached lookup that returned one of the leads is dropped, so a
+        write naming only the ID also drops the lookup by email, and the
+        other way round. Lookups still loading are not cached afterwards.
+
+        Args:
+            munchkin_id: Subscription the leads belong to
+            lead_ids: IDs of the changed leads
+            emails: Emails of the changed leads
+        """
+        keys = [self._key(munchkin_id, "id", lead_id) for lead_id in lead_ids if lead_id is not None]
+        keys += [self._key(munchkin_id, "email", email) for email in emails if email]
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                related = {key} | self._holders.pop(key, set())
+                entry = self._discard(key)
+                if entry is not None:
+                    related.update(self._lead_keys(munchkin_id, entry[1]))
+                dropped = entry is not None
+                for related_key in related:
+                    if related_key != key:
+                        dropped = self._discard(related_key) is not None or dropped
+                    if self._loading:
+                        self._invalidated[related_key] = self._generation
+                if dropped:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._holders.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, eviction and invalidation counters"""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries)
+            }
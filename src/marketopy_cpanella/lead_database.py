@@ -1,17 +1,24 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator, Iterable
+from .base import MarketoBase, MAX_FILTER_VALUES, sync_only
+from .batching import MAX_BATCH_SIZE, chunked, map_ordered
+from .columnar import ColumnarBuffer
+from .checkpoint import CheckpointStore, iter_checkpointed_pages
+from .pagination import iter_token_records
+from .lead_loader import LeadLoader
+from .exceptions import MarketoAPIError
 
 class LeadDatabase(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/leads"
         self.company_endpoint = "v1/companies"
         self.opportunity_endpoint = "v1/opportunities"
         self.custom_object_endpoint = "v1/customobjects"
+        self.loader: Optional[LeadLoader] = None
 
     def describe(self) -> Dict[str, Any]:
-        """Get metadata about the lead object and its fields"""
-        return self._get(f"{self.base_endpoint}/describe.json")
+        """Get metadata about the lead object and its fields (cacheable)"""
+        return self._get_cached(f"{self.base_endpoint}/describe.json")
 
     def get_leads(self, filter_type: str, filter_values: List[str],
                   fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
@@ -25,7 +32,18 @@ class LeadDatabase(MarketoBase):
             fields: List of fields to return
             batch_size: Number of records to return per page
             next_page_token: Token for getting the next page of results
+            
+        Long value lists are sent as a form body via POST ?_method=GET. More than
+        300 values are split into concurrent batches of 300 whose pages are all
+        fetched and merged, deduplicated by id, into a single result.
         """
+        if len(filter_values) > MAX_FILTER_VALUES:
+            if next_page_token:
+                raise ValueError("next_page_token cannot be combined with more than "
+                                 f"{MAX_FILTER_VALUES} filter values")
+            return self._get_split_filter(
+                lambda chunk: self.iter_leads(filter_type, chunk, fields, batch_size, prefetch=False),
+                filter_values, id_field="id")
         params = {
             "filterType": filter_type,
             "filterValues": ",".join(filter_values)
@@ -37,7 +55,47 @@ class LeadDatabase(MarketoBase):
         if next_page_token:
             params["nextPageToken"] = next_page_token
             
-        return self._get(f"{self.base_endpoint}.json", params=params)
+        return self._get_filtered(f"{self.base_endpoint}.json", params)
+
+    @sync_only
+    def iter_leads(self, filter_type: str, filter_values: List[str],
+                   fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                   prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream leads matching the filter across every page
+        
+        Args:
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_leads(filter_type, filter_values, fields, batch_size, token),
+            prefetch=prefetch)
+
+    @sync_only
+    def get_leads_columnar(self, filter_type: str, filter_values: List[str],
+                           fields: Optional[List[str]] = None,
+                           batch_size: Optional[int] = None) -> ColumnarBuffer:
+        """
+        Read every lead matching the filter into typed column buffers
+        
+        Pages are appended to the columns as they arrive, typed from the
+        describe metadata, so no list of lead dicts is built. Convert
+        the result with to_arrow, to_pandas or to_numpy.
+        
+        Args:
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by, any number
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+        """
+        return self._read_columnar(
+            self.describe(),
+            lambda chunk: self.iter_leads(filter_type, chunk, fields, batch_size),
+            filter_values, fields)
 
     def create_or_update_leads(self, leads: List[Dict[str, Any]],
                              action: str = "createOrUpdate",
@@ -55,7 +113,69 @@ class LeadDatabase(MarketoBase):
             "action": action,
             "dedupeBy": dedupe_by
         }
-        return self._post(f"{self.base_endpoint}.json", data=data)
+        response = self._post(f"{self.base_endpoint}.json", data=data)
+        self._invalidate_leads(leads, response)
+        return response
+
+    @sync_only
+    def stream_create_or_update_leads(self, leads: Iterable[Dict[str, Any]],
+                                      action: str = "createOrUpdate",
+                                      dedupe_by: str = "dedupeFields",
+                                      batch_size: int = MAX_BATCH_SIZE,
+                                      max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Upsert any number of leads and yield one result per lead in input order
+        
+        Leads are read lazily, split into calls of at most 300 records and posted
+        concurrently under the shared rate limit. When a whole call fails, each of
+        its leads gets a result with status "failed" and the call's errors as reasons.
+        
+        Args:
+            leads: Iterable of lead dictionaries, e.g. a generator over a file
+            action: Action to take (createOnly, updateOnly, createOrUpdate)
+            dedupe_by: Field to use for deduplication (dedupeFields or idField)
+            batch_size: Records per call (max 300)
+            max_workers: Calls in flight at once (default: the rate limiter's concurrency cap)
+        """
+        def upsert(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            response = self.create_or_update_leads(chunk, action=action, dedupe_by=dedupe_by)
+            results = response.get("result") or []
+            if response.get("success") and len(results) == len(chunk):
+                return results
+            failure = {"status": "failed", "reasons": response.get("errors") or []}
+            return [dict(failure) for _ in chunk]
+
+        for results in map_ordered(upsert, chunked(leads, min(batch_size, MAX_BATCH_SIZE)),
+                                   self._worker_count(max_workers)):
+            for result in results:
+                yield result
+
+    @sync_only
+    def bulk_create_or_update_leads(self, leads: Iterable[Dict[str, Any]],
+                                    action: str = "createOrUpdate",
+                                    dedupe_by: str = "dedupeFields",
+                                    batch_size: int = MAX_BATCH_SIZE,
+                                    max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Upsert any number of leads with chunked, concurrent calls
+        
+        Args:
+            leads: Iterable of lead dictionaries, e.g. a generator over a file
+            action: Action to take (createOnly, updateOnly, createOrUpdate)
+            dedupe_by: Field to use for deduplication (dedupeFields or idField)
+            batch_size: Records per call (max 300)
+            max_workers: Calls in flight at once (default: the rate limiter's concurrency cap)
+            
+        Returns:
+            Dict with "result" holding one status per lead in input order and
+            "success" true only if no lead was skipped or failed
+        """
+        results = list(self.stream_create_or_update_leads(leads, action, dedupe_by,
+                                                          batch_size, max_workers))
+        return {
+            "success": all(result.get("status") not in ("skipped", "failed") for result in results),
+            "result": results
+        }
 
     def delete_leads(self, leads: List[Dict[str, Any]],
                     delete_by: str = "dedupeFields") -> Dict[str, Any]:
@@ -70,7 +190,9 @@ class LeadDatabase(MarketoBase):
             "input": leads,
             "deleteBy": delete_by
         }
-        return self._post(f"{self.base_endpoint}/delete.json", data=data)
+        response = self._post(f"{self.base_endpoint}/delete.json", data=data)
+        self._invalidate_leads(leads, response)
+        return response
 
     def get_lead_activities(self, lead_id: int, activity_type_ids: Optional[List[int]] = None,
                           start_date: Optional[str] = None, end_date: Optional[str] = None,
@@ -101,6 +223,27 @@ class LeadDatabase(MarketoBase):
             
         return self._get(f"{self.base_endpoint}/{lead_id}/activities.json", params=params)
 
+    @sync_only
+    def iter_lead_activities(self, lead_id: int, activity_type_ids: Optional[List[int]] = None,
+                             start_date: Optional[str] = None, end_date: Optional[str] = None,
+                             batch_size: Optional[int] = None,
+                             prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream activities for a specific lead across every page
+        
+        Args:
+            lead_id: ID of the lead
+            activity_type_ids: List of activity type IDs to filter by
+            start_date: Start date for activities (ISO 8601 format)
+            end_date: End date for activities (ISO 8601 format)
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_lead_activities(lead_id, activity_type_ids, start_date,
+                                                   end_date, batch_size, token),
+            prefetch=prefetch)
+
     def get_lead_changes(self, start_date: str, end_date: Optional[str] = None,
                         fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
                         next_page_token: Optional[str] = None) -> Dict[str, Any]:
@@ -126,13 +269,95 @@ class LeadDatabase(MarketoBase):
             
         return self._get(f"{self.base_endpoint}/activities.json", params=params)
 
+    @sync_only
+    def sync_lead_changes(self, store: CheckpointStore, key: str, start_date: str,
+                          end_date: Optional[str] = None, fields: Optional[List[str]] = None,
+                          batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Resumable read of lead changes, yielding one page of records at a time
+        
+        The next page token and latest activityDate are saved to store once the
+        caller asks for the following page; a restarted sync resumes from there.
+        
+        Args:
+            store: Checkpoint store, e.g. FileCheckpointStore or SQLiteCheckpointStore
+            key: Name of this sync in the store
+            start_date: Start date for changes on the first run (ISO 8601 format)
+            end_date: End date for changes (ISO 8601 format)
+            fields: List of fields to return
+            batch_size: Number of records to return per page
+        """
+        since = start_date
+
+        def first_token(high_water_mark: Optional[str]) -> None:
+            # The chain starts from startDate; a completed sync restarts from its high-water mark
+            nonlocal since
+            if high_water_mark is not None:
+                since = high_water_mark
+
+        return iter_checkpointed_pages(
+            store, key,
+            lambda token: self.get_lead_changes(since, end_date, fields, batch_size, token),
+            first_token)
+
+    def _invalidate_leads(self, leads: Iterable[Dict[str, Any]],
+                          response: Optional[Dict[str, Any]] = None) -> None:
+        """Drop cached lookups for leads written through this client"""
+        cache = getattr(self.session, "lead_cache", None)
+        if cache is None:
+            return
+        lead_ids, emails = [], []
+        for lead in list(leads) + list((response or {}).get("result") or ()):
+            lead_ids.append(lead.get("id"))
+            emails.append(lead.get("email"))
+        cache.invalidate(self.auth.munchkin_id, lead_ids, emails)
+
+    @sync_only
+    def coalesce_lookups(self, window: float = 0.01,
+                         fields: Optional[List[str]] = None) -> LeadLoader:
+        """
+        Batch concurrent get_lead_by_id and get_lead_by_email calls
+        
+        Lookups arriving within window seconds are sent as one get_leads call
+        per 300 keys, and each caller gets a response holding its own leads.
+        
+        Args:
+            window: Seconds to collect lookups before sending a batch
+            fields: Lead fields to return (default: the get_leads default fields)
+        """
+        self.loader = LeadLoader(self, window=window, fields=fields)
+        return self.loader
+
+    def _lookup(self, kind: str, value: Any, endpoint: str,
+                params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Look up one lead through the loader when coalescing, else with its own call"""
+        if self.loader is None:
+            return self._get(endpoint, params=params)
+        try:
+            return {"success": True, "result": self.loader.load(kind, value).result()}
+        except MarketoAPIError as e:
+            return e.response
+
     def get_lead_by_id(self, lead_id: int) -> Dict[str, Any]:
-        """Get a lead by ID"""
-        return self._get(f"{self.base_endpoint}/{lead_id}.json")
+        """Get a lead by ID (served from the lead cache when one is configured)"""
+        def load() -> Dict[str, Any]:
+            return self._lookup("id", lead_id, f"{self.base_endpoint}/{lead_id}.json")
+
+        cache = getattr(self.session, "lead_cache", None)
+        if cache is None:
+            return load()
+        return cache.get_or_load(self.auth.munchkin_id, "id", lead_id, load)
 
     def get_lead_by_email(self, email: str) -> Dict[str, Any]:
-        """Get a lead by email"""
-        return self._get(f"{self.base_endpoint}/lookup.json", params={"email": email})
+        """Get a lead by email (served from the lead cache when one is configured)"""
+        def load() -> Dict[str, Any]:
+            return self._lookup("email", email, f"{self.base_endpoint}/lookup.json",
+                                params={"email": email})
+
+        cache = getattr(self.session, "lead_cache", None)
+        if cache is None:
+            return load()
+        return cache.get_or_load(self.auth.munchkin_id, "email", email, load)
 
     def create_or_update_lead(self, leads: List[Dict[str, Any]], 
                             lookup_field: str = "email") -> Dict[str, Any]:
@@ -143,16 +368,20 @@ class LeadDatabase(MarketoBase):
             leads: List of lead dictionaries
             lookup_field: Field to use for deduplication (default: email)
         """
-        return self._post(f"{self.base_endpoint}/upsert.json", 
-                         data={"input": leads, "lookupField": lookup_field})
+        response = self._post(f"{self.base_endpoint}/upsert.json", 
+                              data={"input": leads, "lookupField": lookup_field})
+        self._invalidate_leads(leads, response)
+        return response
 
     def delete_lead(self, lead_id: int) -> Dict[str, Any]:
         """Delete a lead by ID"""
-        return self._delete(f"{self.base_endpoint}/{lead_id}.json")
+        response = self._delete(f"{self.base_endpoint}/{lead_id}.json")
+        self._invalidate_leads([{"id": lead_id}], response)
+        return response
 
     def get_lead_attributes(self) -> Dict[str, Any]:
-        """Get all available lead attributes"""
-        return self._get(f"{self.base_endpoint}/describe.json")
+        """Get all available lead attributes (cacheable)"""
+        return self._get_cached(f"{self.base_endpoint}/describe.json")
 
     # Company methods
     def get_companies(self, max_return: int = 200, offset: int = 0) -> Dict[str, Any]:
@@ -0,0 +1,135 @@
+import contextvars
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from .base import MAX_FILTER_VALUES
+from .lead_cache import normalize_email
+
+if TYPE_CHECKING:
+    from .lead_database import LeadDatabase
+
+DEFAULT_WINDOW = 0.01
+
+_FILTER_FIELDS = {"id": "id", "email": "email"}
+
+
+class LeadLoader:
+    """
+    Coalesces single-lead lookups into batched get_leads calls
+
+    Lookups by ID or by email that arrive within window seconds of the first
+    one are collected and fetched with one get_leads call per 300 keys, and
+    each caller's future gets the leads that matched its key. A full batch is
+    sent immediately, so a burst of 300 lookups costs one call instead of 300.
+    Repeated keys in a batch share the same call.
+    """
+
+    def __init__(self, lead_database: "LeadDatabase", window: float = DEFAULT_WINDOW,
+                 max_batch: int = MAX_FILTER_VALUES, fields: Optional[List[str]] = None):
+        """
+        Initialize the loader
+
+        Args:
+            lead_database: LeadDatabase sub-client the batched calls go through
+            window: Seconds to wait for more lookups after the first one of a batch
+            max_batch: Keys per get_leads call (max 300)
+            fields: Lead fields to return (default: the get_leads default fields)
+        """
+        self.lead_database = lead_database
+        self.window = window
+        self.max_batch = min(max_batch, MAX_FILTER_VALUES)
+        self.fields = fields
+        self._pending: Dict[str, Dict[Any, List[Future]]] = {kind: {} for kind in _FILTER_FIELDS}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.lookups = 0
+
+    @staticmethod
+    def _key(kind: str, value: Any) -> Any:
+        return normalize_email(value) if kind == "email" else int(value)
+
+    def load(self, kind: str, value: Any) -> "Future[List[Dict[str, Any]]]":
+        """
+        Queue a lookup and return a future for the leads matching it
+
+        The future resolves to a list of lead dicts, empty when nothing
+        matched, or raises MarketoAPIError if the batched call failed.
+
+        Args:
+            kind: "id" or "email"
+            value: Lead ID or email address
+        """
+        if kind not in _FILTER_FIELDS:
+            raise ValueError(f"unknown lookup kind {kind!r}; expected 'id' or 'email'")
+        key = self._key(kind, value)
+        future: "Future[List[Dict[str, Any]]]" = Future()
+        with self._lock:
+            self.lookups += 1
+            batch = self._pending[kind]
+            batch.setdefault(key, []).append(future)
+            if len(batch) >= self.max_batch:
+                self._pending[kind] = {}
+                full = batch
+            else:
+                full = None
+                if len(batch) == 1 and len(batch[key]) == 1:
+                    # The batch's calls are attributed to the first caller's quota job
+                    timer = threading.Timer(self.window, contextvars.copy_context().run,
+                                            (self._flush, kind, batch))
+                    timer.daemon = True
+                    timer.start()
+        if full is not None:
+            threading.Thread(target=contextvars.copy_context().run,
+                             args=(self._dispatch, kind, full), daemon=True,
+                             name="marketo-lead-loader").start()
+        return future
+
+    def load_by_id(self, lead_id: int) -> "Future[List[Dict[str, Any]]]":
+        """Queue a lookup by lead ID"""
+        return self.load("id", lead_id)
+
+    def load_by_email(self, email: str) -> "Future[List[Dict[str, Any]]]":
+        """Queue a lookup by email"""
+        return self.load("email", email)
+
+    def flush(self) -> None:
+        """Send every pending lookup now instead of waiting for the window"""
+        for kind in _FILTER_FIELDS:
+            with self._lock:
+                batch, self._pending[kind] = self._pending[kind], {}
+            if batch:
+                self._dispatch(kind, batch)
+
+    def _flush(self, kind: str, batch: Dict[Any, List[Future]]) -> None:
+        # The batch may already have been sent because it filled up
+        with self._lock:
+            if self._pending[kind] is not batch:
+                return
+            self._pending[kind] = {}
+        self._dispatch(kind, batch)
+
+    def _dispatch(self, kind: str, batch: Dict[Any, List[Future]]) -> None:
+        field = _FILTER_FIELDS[kind]
+        fields = self.fields
+        if fields and field not in fields:
+            fields = list(fields) + [field]
+        matches: Dict[Any, List[Dict[str, Any]]] = {key: [] for key in batch}
+        with self._lock:
+            self.calls += 1
+        try:
+            for lead in self.lead_database.iter_leads(field, [str(key) for key in batch],
+                                                      fields, prefetch=False):
+                value = lead.get(field)
+                if value is None:
+                    continue
+                key = self._key(kind, value)
+                if key in matches:
+                    matches[key].append(lead)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        for key, futures in batch.items():
+            for future in futures:
+                future.set_result([dict(lead) for lead in matches[key]])
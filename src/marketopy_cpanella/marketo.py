@@ -1,24 +1,56 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 from .authentication import Authentication
-from .lead_database import LeadDatabase
-from .asset import Asset
-from .user_management import UserManagement
-from .identity import Identity
-from .activities import Activities
-from .fields import Fields
-from .named_accounts import NamedAccounts
-from .opportunity_roles import OpportunityRoles
-from .program_members import ProgramMembers
-from .companies import Companies
-from .custom_objects import CustomObjects
-from .field_list import FieldList
-from .field_types import FieldTypes
-from .named_account_lists import NamedAccountLists
-from .opportunities import Opportunities
-from .sales_persons import SalesPersons
+from .rate_limit import RateLimiter, DEFAULT_CALLS, DEFAULT_PERIOD, DEFAULT_MAX_CONCURRENT
+from .retry import RetryPolicy
+from .metadata_cache import MetadataCache, DEFAULT_METADATA_TTL
+from .codec import JSONCodec
+from .lead_cache import LeadCache
+from .hooks import Hooks
+from .session import (MarketoSession, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE,
+                      DEFAULT_MAX_RETRIES, DEFAULT_BACKOFF_FACTOR)
+
+if TYPE_CHECKING:
+    from .lead_database import LeadDatabase
+    from .asset import Asset
+    from .user_management import UserManagement
+    from .identity import Identity
+    from .activities import Activities
+    from .fields import Fields
+    from .named_accounts import NamedAccounts
+    from .opportunity_roles import OpportunityRoles
+    from .program_members import ProgramMembers
+    from .companies import Companies
+    from .custom_objects import CustomObjects
+    from .field_list import FieldList
+    from .field_types import FieldTypes
+    from .named_account_lists import NamedAccountLists
+    from .opportunities import Opportunities
+    from .sales_persons import SalesPersons
+    from .bulk_extract import BulkExtract
+    from .bulk_import import BulkImport
+    from .quota import QuotaGovernor
 
 class Marketo:
-    def __init__(self, munchkin_id: str, client_id: str, client_secret: str):
+    def __init__(self, munchkin_id: str, client_id: str, client_secret: str,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 session: Optional[MarketoSession] = None,
+                 token_refresh_margin: int = 60,
+                 rate_limit_calls: int = DEFAULT_CALLS,
+                 rate_limit_period: float = DEFAULT_PERIOD,
+                 max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 metadata_cache_ttl: Optional[float] = None,
+                 metadata_cache_dir: Optional[str] = None,
+                 metadata_cache: Optional[MetadataCache] = None,
+                 json_codec: Union[None, str, JSONCodec] = None,
+                 lead_cache: Optional[LeadCache] = None,
+                 coalesce_window: Optional[float] = None,
+                 hooks: Optional[Hooks] = None,
+                 quota: Optional["QuotaGovernor"] = None):
         """
         Initialize the Marketo client
         
@@ -26,133 +58,256 @@ class Marketo:
             munchkin_id: Your Marketo Munchkin ID
             client_id: Your Marketo Client ID
             client_secret: Your Marketo Client Secret
+            pool_connections: Number of host connection pools to cache
+            pool_maxsize: Maximum number of keep-alive connections per host
+            max_retries: Transport-level retries for connection errors and 5xx responses
+            backoff_factor: Exponential backoff factor between transport retries
+            session: Existing MarketoSession to share. Its own pool and rate limit
+                     settings apply, and passing any setting the session holds
+                     (rate_limiter, retry_policy, metadata cache arguments,
+                     json_codec, lead_cache, hooks, quota) raises ValueError;
+                     give those to MarketoSession instead
+            token_refresh_margin: Seconds before expiry at which the shared access
+                                  token is refreshed in the background
+            rate_limit_calls: Calls allowed per rolling window for this subscription
+            rate_limit_period: Length of the rolling window in seconds
+            max_concurrent: Calls allowed in flight at once
+            rate_limiter: Existing RateLimiter to share, e.g. between clients of the
+                          same subscription; overrides the rate limit settings
+            retry_policy: Policy for re-driving Marketo soft errors (601/602/606/615/1029)
+            metadata_cache_ttl: Seconds describe, field list and activity type
+                                responses are served from the metadata cache;
+                                schema calls are not cached unless this, the
+                                directory or a cache is given
+            metadata_cache_dir: Directory where cached schema is persisted per
+                                Munchkin ID, shared by later runs and other workers;
+                                entries last an hour unless a TTL is given
+            metadata_cache: Existing MetadataCache to share; overrides the cache settings
+            json_codec: JSON codec for request and response bodies, or "orjson",
+                        "msgspec" or "json"; defaults to the fastest installed
+            lead_cache: LeadCache serving get_lead_by_id and get_lead_by_email;
+                        writes through this client invalidate the leads they touch
+            coalesce_window: When set, concurrent get_lead_by_id and get_lead_by_email
+                             calls arriving within this many seconds are batched
+                             into one get_leads call per 300 keys
+            hooks: Existing Hooks to share between clients; each client gets its
+                   own otherwise, reachable as marketo.hooks
+            quota: QuotaGovernor counting every call against the daily quota and
+                   enforcing its budgets; share one store between processes
         """
-        self.auth = Authentication(munchkin_id, client_id, client_secret)
-        self._lead_database: Optional[LeadDatabase] = None
-        self._asset: Optional[Asset] = None
-        self._user_management: Optional[UserManagement] = None
-        self._identity: Optional[Identity] = None
-        self._activities: Optional[Activities] = None
-        self._fields: Optional[Fields] = None
-        self._named_accounts: Optional[NamedAccounts] = None
-        self._opportunity_roles: Optional[OpportunityRoles] = None
-        self._program_members: Optional[ProgramMembers] = None
-        self._companies: Optional[Companies] = None
-        self._custom_objects: Optional[CustomObjects] = None
-        self._field_list: Optional[FieldList] = None
-        self._field_types: Optional[FieldTypes] = None
-        self._named_account_lists: Optional[NamedAccountLists] = None
-        self._opportunities: Optional[Opportunities] = None
-        self._sales_persons: Optional[SalesPersons] = None
-
-    @property
-    def lead_database(self) -> LeadDatabase:
+        if session is not None:
+            conflicting = [name for name, value in (
+                ("rate_limiter", rate_limiter), ("retry_policy", retry_policy),
+                ("metadata_cache_ttl", metadata_cache_ttl), ("metadata_cache_dir", metadata_cache_dir),
+                ("metadata_cache", metadata_cache), ("json_codec", json_codec),
+                ("lead_cache", lead_cache), ("hooks", hooks), ("quota", quota)) if value is not None]
+            if conflicting:
+                raise ValueError(f"{', '.join(conflicting)} would be ignored with session=; "
+                                 f"pass them to MarketoSession instead")
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(calls=rate_limit_calls, period=rate_limit_period,
+                                       max_concurrent=max_concurrent)
+        if metadata_cache is None and (metadata_cache_ttl is not None or metadata_cache_dir is not None):
+            metadata_cache = MetadataCache(
+                ttl=metadata_cache_ttl if metadata_cache_ttl is not None else DEFAULT_METADATA_TTL,
+                directory=metadata_cache_dir)
+        self.session = session if session is not None else MarketoSession(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            metadata_cache=metadata_cache,
+            codec=json_codec,
+            lead_cache=lead_cache,
+            hooks=hooks,
+            quota=quota
+        )
+        self.rate_limiter = self.session.rate_limiter
+        self.metadata_cache = self.session.metadata_cache
+        self.lead_cache = self.session.lead_cache
+        self.hooks = self.session.hooks
+        self.quota = self.session.quota
+        self.coalesce_window = coalesce_window
+        self.auth = Authentication(munchkin_id, client_id, client_secret,
+                                   session=self.session, refresh_margin=token_refresh_margin)
+        self._lead_database: Optional["LeadDatabase"] = None
+        self._asset: Optional["Asset"] = None
+        self._user_management: Optional["UserManagement"] = None
+        self._identity: Optional["Identity"] = None
+        self._activities: Optional["Activities"] = None
+        self._fields: Optional["Fields"] = None
+        self._named_accounts: Optional["NamedAccounts"] = None
+        self._opportunity_roles: Optional["OpportunityRoles"] = None
+        self._program_members: Optional["ProgramMembers"] = None
+        self._companies: Optional["Companies"] = None
+        self._custom_objects: Optional["CustomObjects"] = None
+        self._field_list: Optional["FieldList"] = None
+        self._field_types: Optional["FieldTypes"] = None
+        self._named_account_lists: Optional["NamedAccountLists"] = None
+        self._opportunities: Optional["Opportunities"] = None
+        self._sales_persons: Optional["SalesPersons"] = None
+        self._bulk_extract: Optional["BulkExtract"] = None
+        self._bulk_import: Optional["BulkImport"] = None
+
+    @property
+    def retry_stats(self) -> Dict[str, Any]:
+        """Retry counts and backoff time spent per Marketo error code"""
+        return self.session.retry_policy.stats.as_dict()
+
+    def close(self) -> None:
+        """Release the pooled connections held by this client"""
+        self.session.close()
+
+    def __enter__(self) -> "Marketo":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def lead_database(self) -> "LeadDatabase":
         """Access the Lead Database API"""
         if self._lead_database is None:
-            self._lead_database = LeadDatabase(self.auth)
+            from .lead_database import LeadDatabase
+            self._lead_database = LeadDatabase(self.auth, self.session)
+            if self.coalesce_window is not None:
+                self._lead_database.coalesce_lookups(self.coalesce_window)
         return self._lead_database
 
     @property
-    def asset(self) -> Asset:
+    def asset(self) -> "Asset":
         """Access the Asset API"""
         if self._asset is None:
-            self._asset = Asset(self.auth)
+            from .asset import Asset
+            self._asset = Asset(self.auth, self.session)
         return self._asset
 
     @property
-    def user_management(self) -> UserManagement:
+    def user_management(self) -> "UserManagement":
         """Access the User Management API"""
         if self._user_management is None:
-            self._user_management = UserManagement(self.auth)
+            from .user_management import UserManagement
+            self._user_management = UserManagement(self.auth, self.session)
         return self._user_management
 
     @property
-    def identity(self) -> Identity:
+    def identity(self) -> "Identity":
         """Access the Identity API"""
         if self._identity is None:
-            self._identity = Identity(self.auth)
+            from .identity import Identity
+            self._identity = Identity(self.auth, self.session)
         return self._identity
 
     @property
-    def activities(self) -> Activities:
+    def activities(self) -> "Activities":
         """Access the Activities API"""
         if self._activities is None:
-            self._activities = Activities(self.auth)
+            from .activities import Activities
+            self._activities = Activities(self.auth, self.session)
         return self._activities
 
     @property
-    def fields(self) -> Fields:
+    def fields(self) -> "Fields":
         """Access the Fields API"""
         if self._fields is None:
-            self._fields = Fields(self.auth)
+            from .fields import Fields
+            self._fields = Fields(self.auth, self.session)
         return self._fields
 
     @property
-    def named_accounts(self) -> NamedAccounts:
+    def named_accounts(self) -> "NamedAccounts":
         """Access the Named Accounts API"""
         if self._named_accounts is None:
-            self._named_accounts = NamedAccounts(self.auth)
+            from .named_accounts import NamedAccounts
+            self._named_accounts = NamedAccounts(self.auth, self.session)
         return self._named_accounts
 
     @property
-    def opportunity_roles(self) -> OpportunityRoles:
+    def opportunity_roles(self) -> "OpportunityRoles":
         """Access the Opportunity Roles API"""
         if self._opportunity_roles is None:
-            self._opportunity_roles = OpportunityRoles(self.auth)
+            from .opportunity_roles import OpportunityRoles
+            self._opportunity_roles = OpportunityRoles(self.auth, self.session)
         return self._opportunity_roles
 
     @property
-    def program_members(self) -> ProgramMembers:
+    def program_members(self) -> "ProgramMembers":
         """Access the Program Members API"""
         if self._program_members is None:
-            self._program_members = ProgramMembers(self.auth)
+            from .program_members import ProgramMembers
+            self._program_members = ProgramMembers(self.auth, self.session)
         return self._program_members
 
     @property
-    def companies(self) -> Companies:
+    def companies(self) -> "Companies":
         """Access the Companies API"""
         if self._companies is None:
-            self._companies = Companies(self.auth)
+            from .companies import Companies
+            self._companies = Companies(self.auth, self.session)
         return self._companies
 
     @property
-    def custom_objects(self) -> CustomObjects:
+    def custom_objects(self) -> "CustomObjects":
         """Access the Custom Objects API"""
         if self._custom_objects is None:
-            self._custom_objects = CustomObjects(self.auth)
+            from .custom_objects import CustomObjects
+            self._custom_objects = CustomObjects(self.auth, self.session)
         return self._custom_objects
 
     @property
-    def field_list(self) -> FieldList:
+    def field_list(self) -> "FieldList":
         """Access the Field List API"""
         if self._field_list is None:
-            self._field_list = FieldList(self.auth)
+            from .field_list import FieldList
+            self._field_list = FieldList(self.auth, self.session)
         return self._field_list
 
     @property
-    def field_types(self) -> FieldTypes:
+    def field_types(self) -> "FieldTypes":
         """Access the Field Types API"""
         if self._field_types is None:
-            self._field_types = FieldTypes(self.auth)
+            from .field_types import FieldTypes
+            self._field_types = FieldTypes(self.auth, self.session)
         return self._field_types
 
     @property
-    def named_account_lists(self) -> NamedAccountLists:
+    def named_account_lists(self) -> "NamedAccountLists":
         """Access the Named Account Lists API"""
         if self._named_account_lists is None:
-            self._named_account_lists = NamedAccountLists(self.auth)
+            from .named_account_lists import NamedAccountLists
+            self._named_account_lists = NamedAccountLists(self.auth, self.session)
         return self._named_account_lists
 
     @property
-    def opportunities(self) -> Opportunities:
+    def opportunities(self) -> "Opportunities":
         """Access the Opportunities API"""
         if self._opportunities is None:
-            self._opportunities = Opportunities(self.auth)
+            from .opportunities import Opportunities
+            self._opportunities = Opportunities(self.auth, self.session)
         return self._opportunities
 
     @property
-    def sales_persons(self) -> SalesPersons:
+    def sales_persons(self) -> "SalesPersons":
         """Access the Sales Persons API"""
         if self._sales_persons is None:
-            self._sales_persons = SalesPersons(self.auth)
-        return self._sales_persons 
\ No newline at end of file
+            from .sales_persons import SalesPersons
+            self._sales_persons = SalesPersons(self.auth, self.session)
+        return self._sales_persons 
+
+    @property
+    def bulk_extract(self) -> "BulkExtract":
+        """Access the Bulk Extract API"""
+        if self._bulk_extract is None:
+            from .bulk_extract import BulkExtract
+            self._bulk_extract = BulkExtract(self.auth, self.session)
+        return self._bulk_extract
+
+    @property
+    def bulk_import(self) -> "BulkImport":
+        """Access the Bulk Import API"""
+        if self._bulk_import is None:
+            from .bulk_import import BulkImport
+            self._bulk_import = BulkImport(self.auth, self.session)
+        return self._bulk_import
@@ -0,0 +1,195 @@
+import contextlib
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_METADATA_TTL = 3600.0
+
+
+class MetadataCache:
+    """
+    TTL cache for schema responses (describe, field and activity type lists)
+
+    Entries are kept per Munchkin ID so one cache can serve several
+    subscriptions. With a directory, each subscription's entries are also
+    written to <directory>/<munchkin_id>.json and read back by the next
+    process, so cold starts and worker fleets skip the schema calls while the
+    entries are fresh. Writes re-read the file and merge into it under a file
+    lock (fcntl, where available), and reads reload it once it
+    changes, so processes sharing a directory see each other's entries.
+    Concurrent misses for the same key share one load.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_METADATA_TTL, directory: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            ttl: Seconds an entry stays fresh
+            directory: Directory for on-disk persistence; in memory only when None
+        """
+        self.ttl = ttl
+        self.directory = directory
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._versions: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, munchkin_id: str) -> str:
+        return os.path.join(self.directory, f"{munchkin_id}.json")
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        # Caller holds self._lock; serializes writers in other processes where fcntl exists
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _version(self, munchkin_id: str) -> Optional[Tuple[int, int, int]]:
+        # Every write replaces the file, so the inode changes even within one mtime tick
+        try:
+            stat = os.stat(self._path(munchkin_id))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read(self, munchkin_id: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._path(munchkin_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _subscription(self, munchkin_id: str) -> Dict[str, Dict[str, Any]]:
+        # Caller holds self._lock
+        entries = self._entries.get(munchkin_id)
+        if self.directory is None:
+            if entries is None:
+                entries = self._entries[munchkin_id] = {}
+            return entries
+        # Reload when another process has rewritten or removed the file since we last saw it
+        version = self._version(munchkin_id)
+        if entries is None or version != self._versions.get(munchkin_id):
+            entries = self._entries[munchkin_id] = self._read(munchkin_id)
+            self._versions[munchkin_id] = version
+        return entries
+
+    def _update(self, munchkin_id: str, change: Callable[[Dict[str, Dict[str, Any]]], None]) -> None:
+        # Caller holds self._lock
+        if self.directory is None:
+            change(self._subscription(munchkin_id))
+            return
+        with self._locked():
+            # Apply the change to the file as it is now, keeping other processes' entries
+            entries = self._read(munchkin_id)
+            change(entries)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".metadata-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self._path(munchkin_id))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self._entries[munchkin_id] = entries
+            self._versions[munchkin_id] = self._version(munchkin_id)
+
+    def get(self, munchkin_id: str, key: str) -> Optional[Any]:
+        """Get a fresh copy of an entry, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._subscription(munchkin_id).get(key)
+            if entry is None or time.time() - entry["stored_at"] >= self.ttl:
+                return None
+            value = entry["value"]
+        # Callers may mutate responses; never hand out the cached object
+        return copy.deepcopy(value)
+
+    def set(self, munchkin_id: str, key: str, value: Any) -> None:
+        """Store an entry"""
+        entry = {"stored_at": time.time(), "value": copy.deepcopy(value)}
+        with self._lock:
+            self._update(munchkin_id, lambda entries: entries.__setitem__(key, entry))
+
+    def get_or_load(self, munchkin_id: str, key: str, load: Callable[[], Any]) -> Any:
+        """
+        Get a fresh entry, or call load and cache its result if the call succeeded
+
+        Args:
+            munchkin_id: Subscription the entry belongs to
+            key: Cache key, e.g. the endpoint and its query
+            load: Callable returning the API response
+        """
+        value = self.get(munchkin_id, key)
+        if value is not None:
+            self.hits += 1
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(f"{munchkin_id}:{key}", threading.Lock())
+        with key_lock:
+            value = self.get(munchkin_id, key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = load()
+            if isinstance(value, dict) and value.get("success", True):
+                self.set(munchkin_id, key, value)
+            return value
+
+    def _persisted_ids(self) -> List[str]:
+        # Caller holds self._lock
+        if self.directory is None:
+            return []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [name[:-len(".json")] for name in names
+                if name.endswith(".json") and not name.startswith(".")]
+
+    def _remove(self, munchkin_id: str) -> None:
+        # Caller holds self._lock
+        self._entries[munchkin_id] = {}
+        if self.directory is None:
+            return
+        with self._locked():
+            try:
+                os.remove(self._path(munchkin_id))
+            except FileNotFoundError:
+                pass
+        self._versions[munchkin_id] = None
+
+    def invalidate(self, munchkin_id: Optional[str] = None, key: Optional[str] = None) -> None:
+        """
+        Drop cached entries, in memory and on disk
+
+        Args:
+            munchkin_id: Subscription to drop entries for (default: every
+                         subscription, including ones only persisted on disk)
+            key: Single entry to drop (default: every entry of the subscription)
+        """
+        with self._lock:
+            if munchkin_id is not None:
+                munchkin_ids = [munchkin_id]
+            else:
+                munchkin_ids = list(dict.fromkeys(list(self._entries) + self._persisted_ids()))
+            for subscription in munchkin_ids:
+                if key is None:
+                    self._remove(subscription)
+                else:
+                    self._update(subscription, lambda entries: entries.pop(key, None))
@@ -0,0 +1,175 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from .batching import submit_in_context
+from .config_reader import CONFIG_FILE, read_secrets_subscriptions, read_subscriptions
+from .marketo import Marketo
+
+DEFAULT_MAX_WORKERS = 16
+
+
+class InstanceResult:
+    """The outcome of an operation on one subscription"""
+
+    __slots__ = ("munchkin_id", "environment", "result", "error", "elapsed")
+
+    def __init__(self, munchkin_id: str, environment: str, result: Any = None,
+                 error: Optional[BaseException] = None, elapsed: float = 0.0):
+        self.munchkin_id = munchkin_id
+        self.environment = environment
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """Whether the operation completed without raising"""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = "ok" if self.ok else f"error={self.error!r}"
+        return f"InstanceResult({self.munchkin_id} {outcome} elapsed={self.elapsed:.3f})"
+
+
+class MultiMarketo:
+    """
+    One Marketo client per subscription, with operations fanned out across them
+
+    Every subscription gets its own Marketo client, and so its own connection
+    pool, access token and rate limiter, since Marketo enforces limits per
+    Munchkin ID. map runs an operation on every client in parallel and tags
+    each result with its Munchkin ID; a failure on one subscription is
+    captured in its result instead of aborting the sweep.
+    """
+
+    def __init__(self, subscriptions: Iterable[Dict[str, str]],
+                 max_workers: int = DEFAULT_MAX_WORKERS, **client_kwargs: Any):
+        """
+        Create a client per subscription
+
+        Args:
+            subscriptions: Dicts with munchkin_id, client_id, client_secret and
+                           optionally environment, e.g. from read_subscriptions
+            max_workers: Subscriptions worked on at once
+            client_kwargs: Keyword arguments for every Marketo client; objects
+                           passed here (a session, rate limiter or cache) would be
+                           shared by all subscriptions
+        """
+        self.max_workers = max_workers
+        self.clients: Dict[str, Marketo] = {}
+        self.environments: Dict[str, str] = {}
+        for subscription in subscriptions:
+            munchkin_id = subscription["munchkin_id"]
+            if munchkin_id in self.clients:
+                raise ValueError(f"subscription {munchkin_id} is listed more than once")
+            self.clients[munchkin_id] = Marketo(munchkin_id, subscription["client_id"],
+                                                subscription["client_secret"], **client_kwargs)
+            self.environments[munchkin_id] = subscription.get("environment") or ""
+
+    @classmethod
+    def from_config(cls, path: str = CONFIG_FILE, **kwargs: Any) -> "MultiMarketo":
+        """Create a client for every row of subscriptions.csv"""
+        return cls(read_subscriptions(path), **kwargs)
+
+    @classmethod
+    def from_secrets(cls, **kwargs: Any) -> "MultiMarketo":
+        """Create a client for every entry of SUBSCRIPTION_INFORMATION in secrets.py"""
+        return cls(read_secrets_subscriptions(), **kwargs)
+
+    def __getitem__(self, munchkin_id: str) -> Marketo:
+        return self.clients[munchkin_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.clients)
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def _run(self, munchkin_id: str, operation: Callable[[Marketo], Any]) -> InstanceResult:
+        started = time.perf_counter()
+        try:
+            result = operation(self.clients[munchkin_id])
+        except Exception as e:
+            return InstanceResult(munchkin_id, self.environments.get(munchkin_id, ""), error=e,
+                                  elapsed=time.perf_counter() - started)
+        return InstanceResult(munchkin_id, self.environments[munchkin_id], result=result,
+                              elapsed=time.perf_counter() - started)
+
+    def iter_map(self, operation: Callable[[Marketo], Any],
+                 munchkin_ids: Optional[Iterable[str]] = None) -> Iterator[InstanceResult]:
+        """
+        Run an operation on several subscriptions in parallel, yielding results as they finish
+
+        Args:
+            operation: Callable taking a subscription's Marketo client
+            munchkin_ids: Subscriptions to run on (default: all of them); an ID
+                          without a configured subscription raises ValueError
+        """
+        targets = list(munchkin_ids) if munchkin_ids is not None else list(self.clients)
+        unknown = [munchkin_id for munchkin_id in targets if munchkin_id not in self.clients]
+        if unknown:
+            raise ValueError(f"no subscription configured for {', '.join(unknown)}")
+        if not targets:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets)),
+                                      thread_name_prefix="marketo-fanout")
+        futures = []
+        try:
+            futures = [submit_in_context(executor, self._run, munchkin_id, operation)
+                       for munchkin_id in targets]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def map(self, operation: Callable[[Marketo], Any],
+            munchkin_ids: Optional[Iterable[str]] = None,
+            raise_errors: bool = False) -> Dict[str, InstanceResult]:
+        """
+        Run an operation on several subscriptions in parallel
+
+        Args:
+            operation: Callable taking a subscription's Marketo client
+            munchkin_ids: Subscriptions to run on (default: all of them)
+            raise_errors: Re-raise the first failure instead of returning it
+
+        Returns:
+            InstanceResult per Munchkin ID, in subscription order
+        """
+        targets = list(munchkin_ids) if munchkin_ids is not None else list(self.clients)
+        results = {result.munchkin_id: result for result in self.iter_map(operation, targets)}
+        ordered = {munchkin_id: results[munchkin_id] for munchkin_id in targets}
+        if raise_errors:
+            for result in ordered.values():
+                if result.error is not None:
+                    raise result.error
+        return ordered
+
+    def find_leads(self, filter_type: str, filter_values: List[str],
+                   fields: Optional[List[str]] = None) -> Dict[str, InstanceResult]:
+        """
+        Look leads up in every subscription at once
+
+        Args:
+            filter_type: Field to filter by, e.g. "email"
+            filter_values: Values to filter by
+            fields: List of fields to return
+
+        Returns:
+            InstanceResult per Munchkin ID whose result is the get_leads response
+        """
+        return self.map(lambda marketo: marketo.lead_database.get_leads(
+            filter_type, filter_values, fields))
+
+    def close(self) -> None:
+        """Release every subscription's pooled connections"""
+        for client in self.clients.values():
+            client.close()
+
+    def __enter__(self) -> "MultiMarketo":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -1,14 +1,15 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, sync_only
+from .pagination import iter_token_records
 
 class Opportunities(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/opportunities"
 
     def describe(self) -> Dict[str, Any]:
-        """Get metadata about the opportunity object and its fields"""
-        return self._get(f"{self.base_endpoint}/describe.json")
+        """Get metadata about the opportunity object and its fields (cacheable)"""
+        return self._get_cached(f"{self.base_endpoint}/describe.json")
 
     def get_opportunities(self, filter_type: str, filter_values: List[str],
                          fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
@@ -36,6 +37,25 @@ class Opportunities(MarketoBase):
             
         return self._get(f"{self.base_endpoint}.json", params=params)
 
+    @sync_only
+    def iter_opportunities(self, filter_type: str, filter_values: List[str],
+                           fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                           prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream opportunities matching the filter across every page
+        
+        Args:
+            filter_type: Field to filter by (must be from searchableFields or dedupeFields)
+            filter_values: Values to filter by
+            fields: List of fields to return
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_opportunities(filter_type, filter_values, fields,
+                                                 batch_size, token),
+            prefetch=prefetch)
+
     def create_or_update_opportunities(self, opportunities: List[Dict[str, Any]],
                                     action: str = "createOrUpdate",
                                     dedupe_by: str = "dedupeFields") -> Dict[str, Any]:
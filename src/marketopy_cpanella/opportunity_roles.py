@@ -1,9 +1,10 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, sync_only
+from .pagination import iter_offset_records
 
 class OpportunityRoles(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/opportunityRoles"
 
     def get_opportunity_roles(self, max_return: int = 200, offset: int = 0) -> Dict[str, Any]:
@@ -17,6 +18,21 @@ class OpportunityRoles(MarketoBase):
         return self._get(f"{self.base_endpoint}.json",
                         params={"maxReturn": max_return, "offset": offset})
 
+    @sync_only
+    def iter_opportunity_roles(self, max_return: int = 200, max_workers: Optional[int] = None,
+                               ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all opportunity roles, fetching offset windows concurrently
+        
+        Args:
+            max_return: Maximum number of records per window
+            max_workers: Windows in flight at once (default: the rate limiter's concurrency cap)
+            ordered: Yield records in offset order; otherwise yield each window as it arrives
+        """
+        return iter_offset_records(
+            lambda offset, size: self.get_opportunity_roles(size, offset),
+            max_return=max_return, max_workers=self._worker_count(max_workers), ordered=ordered)
+
     def get_opportunity_role_by_id(self, role_id: int) -> Dict[str, Any]:
         """
         Get an opportunity role by ID
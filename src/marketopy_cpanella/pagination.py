@@ -0,0 +1,302 @@
+import heapq
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from .batching import submit_in_context
+from .exceptions import MarketoAPIError
+
+DEFAULT_MAX_RETURN = 200
+DEFAULT_MAX_BUFFERED = 10000
+
+PageFetcher = Callable[[Optional[str]], Dict[str, Any]]
+WindowFetcher = Callable[[int, int], Dict[str, Any]]
+
+
+def check_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Raise MarketoAPIError for a response with success false"""
+    if not response.get("success", True):
+        raise MarketoAPIError(response)
+    return response
+
+
+def has_next_page(response: Dict[str, Any]) -> bool:
+    """
+    Whether a nextPageToken response has more pages
+
+    Activity endpoints always return a nextPageToken and signal the end with
+    moreResult false; the other endpoints omit the token on the last page.
+    """
+    if "moreResult" in response:
+        return bool(response["moreResult"]) and bool(response.get("nextPageToken"))
+    return bool(response.get("nextPageToken"))
+
+
+def iter_token_pages(fetch: PageFetcher, next_page_token: Optional[str] = None,
+                     prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Follow a nextPageToken chain and yield each page response
+
+    With prefetch, the request for the next page is sent on a background
+    thread as soon as a page arrives, so the network wait overlaps with the
+    caller's processing. At most two pages are held at any time.
+
+    Args:
+        fetch: Callable taking a page token (None for the first page) and returning the response
+        next_page_token: Token to resume from instead of the first page
+        prefetch: Fetch the next page while the current one is being consumed
+    """
+    if not prefetch:
+        while True:
+            response = check_response(fetch(next_page_token))
+            yield response
+            if not has_next_page(response):
+                return
+            next_page_token = response["nextPageToken"]
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="marketo-prefetch")
+    pending = submit_in_context(executor, fetch, next_page_token)
+    try:
+        while pending is not None:
+            response = check_response(pending.result())
+            pending = None
+            if has_next_page(response):
+                pending = submit_in_context(executor, fetch, response["nextPageToken"])
+            yield response
+    finally:
+        if pending is not None:
+            pending.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_token_records(fetch: PageFetcher, next_page_token: Optional[str] = None,
+                       prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Follow a nextPageToken chain and yield the records of every page
+
+    Args:
+        fetch: Callable taking a page token (None for the first page) and returning the response
+        next_page_token: Token to resume from instead of the first page
+        prefetch: Fetch the next page while the current one is being consumed
+    """
+    for response in iter_token_pages(fetch, next_page_token, prefetch):
+        for record in response.get("result") or ():
+            yield record
+
+
+def iter_offset_records(fetch: WindowFetcher, max_return: int = DEFAULT_MAX_RETURN,
+                        max_workers: int = 4, ordered: bool = True,
+                        offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch maxReturn/offset windows concurrently and yield their records
+
+    Windows are requested max_workers at a time, ahead of the data's end,
+    which is only discovered when a window comes back short or empty. Windows
+    past that point are discarded, so up to max_workers - 1 extra calls may be
+    spent at the end of the data in exchange for not paging sequentially.
+
+    Args:
+        fetch: Callable taking (offset, max_return) and returning the response
+        max_return: Records requested per window
+        max_workers: Windows in flight at once
+        ordered: Yield records in offset order; otherwise yield each window as it lands
+        offset: Offset of the first window
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="marketo-offset")
+    in_flight: Dict[Any, int] = {}
+    completed: Dict[int, List[Dict[str, Any]]] = {}
+    next_offset = offset
+    next_yield = offset
+    end_offset: Optional[int] = None
+    try:
+        while True:
+            while (end_offset is None
+                   and len(in_flight) + len(completed) < max_workers * 2
+                   and len(in_flight) < max_workers):
+                in_flight[submit_in_context(executor, fetch, next_offset, max_return)] = next_offset
+                next_offset += max_return
+            if not in_flight and (not ordered or next_yield not in completed):
+                return
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                window = in_flight.pop(future)
+                records = check_response(future.result()).get("result") or []
+                if end_offset is not None and window > end_offset:
+                    continue
+                if len(records) < max_return:
+                    end_offset = window if end_offset is None else min(end_offset, window)
+                if ordered:
+                    completed[window] = records
+                else:
+                    for record in records:
+                        yield record
+            if end_offset is not None:
+                # Drop windows that turned out to lie past the end of the data
+                for future, window in list(in_flight.items()):
+                    if window > end_offset:
+                        future.cancel()
+                        del in_flight[future]
+                for window in [w for w in completed if w > end_offset]:
+                    del completed[window]
+            while ordered and next_yield in completed:
+                for record in completed.pop(next_yield):
+                    yield record
+                if end_offset is not None and next_yield >= end_offset:
+                    return
+                next_yield += max_return
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class TokenStream:
+    """
+    One nextPageToken chain taking part in a merged read
+
+    Args:
+        fetch: Callable taking a page token and returning the response
+        next_page_token: Token of the first page
+        until: Stop the chain at the first record whose sort key is at or past this value
+        since: Drop records whose sort key is below this value, e.g. the datetime the
+               paging token was taken at; also lets an ordered merge yield other
+               chains' records before this one returns any
+    """
+
+    def __init__(self, fetch: PageFetcher, next_page_token: Optional[str],
+                 until: Optional[Any] = None, since: Optional[Any] = None):
+        self.fetch = fetch
+        self.next_page_token = next_page_token
+        self.until = until
+        self.since = since
+        self.last_key: Optional[Any] = since
+        self.done = False
+
+    def next_page(self, sort_key: Callable[[Dict[str, Any]], Any]) -> List[Dict[str, Any]]:
+        """Fetch the next page and advance the chain"""
+        response = check_response(self.fetch(self.next_page_token))
+        records = response.get("result") or []
+        if self.since is not None:
+            skip = next((index for index, record in enumerate(records)
+                         if sort_key(record) >= self.since), len(records))
+            records = records[skip:]
+        if self.until is not None:
+            for index, record in enumerate(records):
+                if sort_key(record) >= self.until:
+                    records = records[:index]
+                    self.done = True
+                    break
+        if records:
+            self.last_key = sort_key(records[-1])
+        if not has_next_page(response):
+            self.done = True
+        else:
+            self.next_page_token = response["nextPageToken"]
+        return records
+
+
+def merge_token_streams(streams: List[TokenStream], sort_key: Callable[[Dict[str, Any]], Any],
+                        max_workers: int = 4, ordered: bool = True,
+                        max_buffered: int = DEFAULT_MAX_BUFFERED) -> Iterator[Dict[str, Any]]:
+    """
+    Run several nextPageToken chains concurrently and yield one merged stream
+
+    Ordered merges assume each chain returns records in ascending sort_key
+    order, and yield the buffered records no chain can still undercut: those
+    at or below the lowest last-seen key among unfinished chains. Every round
+    fetches the chains that hold that watermark back, those at the lowest key
+    or with no key yet, and, while fewer than max_buffered records are
+    buffered, the chains furthest behind among the rest. A chain that keeps
+    returning empty pages therefore cannot make the buffer grow without
+    limit: once it is full, only the lagging chains are read. Unordered
+    merges run each chain independently and yield pages as they arrive.
+
+    Args:
+        streams: Chains to run
+        sort_key: Key records are ordered by, e.g. activityDate
+        max_workers: Pages in flight at once
+        ordered: Yield one stream ordered by sort_key
+        max_buffered: Buffered records past which chains that are ahead stop
+                      being read, in ordered merges
+    """
+    if not ordered:
+        for record in _iter_unordered(streams, sort_key, max_workers):
+            yield record
+        return
+
+    buffer: List[Any] = []
+    sequence = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="marketo-merge")
+    try:
+        active = [stream for stream in streams if not stream.done]
+        while active:
+            keys = [stream.last_key for stream in active if stream.last_key is not None]
+            floor = min(keys) if len(keys) == len(active) else None
+            lagging = [stream for stream in active
+                       if stream.last_key is None or stream.last_key == floor]
+            fetching = lagging
+            if len(buffer) < max_buffered:
+                ahead = sorted((stream for stream in active if stream not in lagging),
+                               key=lambda stream: stream.last_key)
+                fetching = lagging + ahead[:max(max_workers - len(lagging), 0)]
+            pages = [future.result() for future in
+                     [submit_in_context(executor, stream.next_page, sort_key) for stream in fetching]]
+            for records in pages:
+                for record in records:
+                    heapq.heappush(buffer, (sort_key(record), sequence, record))
+                    sequence += 1
+            active = [stream for stream in active if not stream.done]
+            if any(stream.last_key is None for stream in active):
+                continue
+            watermark = min((stream.last_key for stream in active), default=None)
+            while buffer and (watermark is None or buffer[0][0] <= watermark):
+                yield heapq.heappop(buffer)[2]
+        while buffer:
+            yield heapq.heappop(buffer)[2]
+    finally:
+        executor.shutdown(wait=False)
+
+
+_STREAM_DONE = object()
+
+
+def _iter_unordered(streams: List[TokenStream], sort_key: Callable[[Dict[str, Any]], Any],
+                    max_workers: int) -> Iterator[Dict[str, Any]]:
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=max_workers * 2)
+    cancelled = threading.Event()
+
+    def put(item: Any) -> None:
+        # Time out periodically so producers exit once the consumer has gone away
+        while not cancelled.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run(stream: TokenStream) -> None:
+        try:
+            while not stream.done and not cancelled.is_set():
+                put(stream.next_page(sort_key))
+        except BaseException as e:
+            put(e)
+        finally:
+            put(_STREAM_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="marketo-merge")
+    try:
+        for stream in streams:
+            submit_in_context(executor, run, stream)
+        remaining = len(streams)
+        while remaining:
+            page = pages.get()
+            if page is _STREAM_DONE:
+                remaining -= 1
+            elif isinstance(page, BaseException):
+                raise page
+            else:
+                for record in page:
+                    yield record
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False)
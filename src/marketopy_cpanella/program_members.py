@@ -1,9 +1,10 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, sync_only
+from .pagination import iter_offset_records
 
 class ProgramMembers(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/programs"
 
     def get_program_members(self, program_id: int, max_return: int = 200, 
@@ -19,6 +20,23 @@ class ProgramMembers(MarketoBase):
         return self._get(f"{self.base_endpoint}/{program_id}/members.json",
                         params={"maxReturn": max_return, "offset": offset})
 
+    @sync_only
+    def iter_program_members(self, program_id: int, max_return: int = 200,
+                             max_workers: Optional[int] = None,
+                             ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all members of a program, fetching offset windows concurrently
+        
+        Args:
+            program_id: ID of the program
+            max_return: Maximum number of records per window
+            max_workers: Windows in flight at once (default: the rate limiter's concurrency cap)
+            ordered: Yield records in offset order; otherwise yield each window as it arrives
+        """
+        return iter_offset_records(
+            lambda offset, size: self.get_program_members(program_id, size, offset),
+            max_return=max_return, max_workers=self._worker_count(max_workers), ordered=ordered)
+
     def get_program_member_by_id(self, program_id: int, member_id: int) -> Dict[str, Any]:
         """
         Get a specific program member
@@ -0,0 +1,391 @@
+import contextlib
+import contextvars
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from .exceptions import QuotaExceededError
+
+DEFAULT_DAILY_LIMIT = 50000
+DEFAULT_TAG = "default"
+
+PRIORITIES = ("low", "normal", "high")
+
+
+def _quota_timezone() -> tzinfo:
+    # Marketo resets the daily quota at midnight US Central time
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo("America/Chicago")
+    except Exception:
+        return timezone(timedelta(hours=-6), "CST")
+
+
+class QuotaStore:
+    """
+    Persists call counts per quota day and job tag
+
+    Subclass and implement increment and usage to plug in another backend,
+    and check_and_increment to make the governor's check and count one
+    atomic step; the default runs them one after the other.
+    """
+
+    def increment(self, day: str, tag: str, calls: int = 1) -> None:
+        """Add calls to the count of a tag for a day"""
+        raise NotImplementedError
+
+    def usage(self, day: str) -> Dict[str, int]:
+        """Call counts per tag for a day"""
+        raise NotImplementedError
+
+    def check_and_increment(self, day: str, tag: str, calls: int,
+                            check: Callable[[Dict[str, int]], float]) -> float:
+        """
+        Pass the day's usage to check and add calls to the tag if it returns 0
+
+        Args:
+            day: Quota day
+            tag: Job tag the calls are counted under
+            calls: Calls to count
+            check: Called with the call counts per tag; returns 0 to count the
+                   calls, a delay to leave them uncounted, or raises
+
+        Returns:
+            What check returned
+        """
+        delay = check(self.usage(day))
+        if delay <= 0:
+            self.increment(day, tag, calls)
+        return delay
+
+
+class MemoryQuotaStore(QuotaStore):
+    """Counts kept in memory for the life of the process"""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, day: str, tag: str, calls: int) -> None:
+        # Caller holds self._lock; only the current day is ever read back
+        counts = self._counts.setdefault(day, {})
+        if len(self._counts) > 1:
+            self._counts = {day: counts}
+        counts[tag] = counts.get(tag, 0) + calls
+
+    def increment(self, day: str, tag: str, calls: int = 1) -> None:
+        with self._lock:
+            self._add(day, tag, calls)
+
+    def usage(self, day: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts.get(day, {}))
+
+    def check_and_increment(self, day: str, tag: str, calls: int,
+                            check: Callable[[Dict[str, int]], float]) -> float:
+        with self._lock:
+            delay = check(dict(self._counts.get(day, {})))
+            if delay <= 0:
+                self._add(day, tag, calls)
+            return delay
+
+
+class FileQuotaStore(QuotaStore):
+    """
+    Counts kept in one JSON file, rewritten atomically on every call
+
+    Processes on the same host share the file safely where fcntl is
+    available; elsewhere only threads of one process are serialized.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the JSON file; created on first call
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            try:
+                import fcntl
+            except ImportError:
+                yield
+                return
+            with open(f"{self.path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict[str, int]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, counts: Dict[str, Dict[str, int]]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".quota-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(counts, f, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def increment(self, day: str, tag: str, calls: int = 1) -> None:
+        with self._locked():
+            # Earlier days are dropped; only the current day is ever read back
+            counts = {day: self._read().get(day, {})}
+            counts[day][tag] = counts[day].get(tag, 0) + calls
+            self._write(counts)
+
+    def usage(self, day: str) -> Dict[str, int]:
+        with self._locked():
+            return dict(self._read().get(day, {}))
+
+    def check_and_increment(self, day: str, tag: str, calls: int,
+                            check: Callable[[Dict[str, int]], float]) -> float:
+        with self._locked():
+            counts = {day: self._read().get(day, {})}
+            delay = check(dict(counts[day]))
+            if delay <= 0:
+                counts[day][tag] = counts[day].get(tag, 0) + calls
+                self._write(counts)
+            return delay
+
+
+class SQLiteQuotaStore(QuotaStore):
+    """Counts kept in a SQLite table, safe to share between processes"""
+
+    def __init__(self, path: str, table: str = "marketo_quota"):
+        """
+        Args:
+            path: Path of the SQLite database file
+            table: Table holding the counts; created if missing
+        """
+        self.path = path
+        self.table = table
+        with self._connect() as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "day TEXT NOT NULL, tag TEXT NOT NULL, calls INTEGER NOT NULL, "
+                "PRIMARY KEY (day, tag))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the store usable from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def increment(self, day: str, tag: str, calls: int = 1) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                f"INSERT OR IGNORE INTO {self.table} (day, tag, calls) VALUES (?, ?, 0)", (day, tag))
+            connection.execute(
+                f"UPDATE {self.table} SET calls = calls + ? WHERE day = ? AND tag = ?",
+                (calls, day, tag))
+
+    def usage(self, day: str) -> Dict[str, int]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT tag, calls FROM {self.table} WHERE day = ?", (day,)).fetchall()
+        return {tag: calls for tag, calls in rows}
+
+    def check_and_increment(self, day: str, tag: str, calls: int,
+                            check: Callable[[Dict[str, int]], float]) -> float:
+        connection = self._connect()
+        try:
+            # Take the write lock before reading so no other process counts in between
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                f"SELECT tag, calls FROM {self.table} WHERE day = ?", (day,)).fetchall()
+            delay = check({row_tag: row_calls for row_tag, row_calls in rows})
+            if delay <= 0:
+                connection.execute(
+                    f"INSERT OR IGNORE INTO {self.table} (day, tag, calls) VALUES (?, ?, 0)",
+                    (day, tag))
+                connection.execute(
+                    f"UPDATE {self.table} SET calls = calls + ? WHERE day = ? AND tag = ?",
+                    (calls, day, tag))
+            connection.commit()
+            return delay
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+
+_current_job: "contextvars.ContextVar[Tuple[str, str]]" = contextvars.ContextVar(
+    "marketo_quota_job", default=(DEFAULT_TAG, "normal"))
+
+
+class QuotaGovernor:
+    """
+    Daily API quota accounting with per-tag budgets and low-priority cutoff
+
+    Every call made through the client is counted against the current
+    quota day (midnight to midnight US Central, when Marketo resets the
+    quota) under the tag of the job making it, and persisted in the store so
+    that processes sharing the store share the count. Before each call:
+
+    - any call is rejected once the daily limit is spent;
+    - calls of a tag with a budget are rejected once the budget is spent;
+    - low priority calls are deferred until the quota resets, or rejected,
+      once total usage crosses low_priority_threshold of the limit;
+    - low and normal priority calls are rejected once only reserve calls are
+      left, which keeps that headroom for high priority work.
+
+    Rejections raise QuotaExceededError. Each check and count is one atomic
+    step in the store, so concurrent callers sharing it cannot overshoot a
+    limit.
+    """
+
+    def __init__(self, daily_limit: int = DEFAULT_DAILY_LIMIT,
+                 store: Optional[QuotaStore] = None,
+                 budgets: Optional[Dict[str, int]] = None,
+                 low_priority_threshold: float = 0.8,
+                 low_priority_action: str = "defer",
+                 reserve: int = 0):
+        """
+        Initialize the governor
+
+        Args:
+            daily_limit: Calls allowed per day for the subscription
+            store: Where counts are persisted; in memory when None
+            budgets: Maximum calls per day for job tags
+            low_priority_threshold: Fraction of the daily limit after which low
+                                    priority calls are deferred or rejected
+            low_priority_action: "defer" to block until the quota resets, or "reject"
+            reserve: Calls kept back for high priority work
+        """
+        if low_priority_action not in ("defer", "reject"):
+            raise ValueError("low_priority_action must be 'defer' or 'reject'")
+        self.daily_limit = daily_limit
+        self.store = store if store is not None else MemoryQuotaStore()
+        self.budgets = dict(budgets or {})
+        self.low_priority_threshold = low_priority_threshold
+        self.low_priority_action = low_priority_action
+        self.reserve = reserve
+        self.timezone = _quota_timezone()
+
+    def _day_and_reset(self) -> Tuple[str, datetime]:
+        now = datetime.now(self.timezone)
+        reset = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return now.strftime("%Y-%m-%d"), reset
+
+    @contextlib.contextmanager
+    def job(self, tag: str, priority: str = "normal") -> Iterator[None]:
+        """
+        Attribute the calls made inside the block to a job tag and priority
+
+        The tag follows the current thread or asyncio task.
+
+        Args:
+            tag: Job tag counted against its budget
+            priority: "low", "normal" or "high"
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {PRIORITIES}")
+        token = _current_job.set((tag, priority))
+        try:
+            yield
+        finally:
+            _current_job.reset(token)
+
+    @staticmethod
+    def current_job() -> Tuple[str, str]:
+        """The (tag, priority) calls are currently attributed to"""
+        return _current_job.get()
+
+    def acquire(self, job: Optional[Tuple[str, str]] = None, calls: int = 1) -> None:
+        """
+        Check the budgets for a call and count it, deferring low priority work if configured
+
+        Args:
+            job: (tag, priority) of the call (default: the current job)
+            calls: Calls to count
+        """
+        if job is None:
+            job = _current_job.get()
+        while True:
+            delay = self.try_acquire(job, calls)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def try_acquire(self, job: Optional[Tuple[str, str]] = None, calls: int = 1) -> float:
+        """
+        Check the budgets for a call and count it, without waiting
+
+        Args:
+            job: (tag, priority) of the call (default: the current job)
+            calls: Calls to count
+
+        Returns:
+            0 once the call is counted, or the seconds until the quota resets
+            when a low priority call is deferred; check again after waiting
+        """
+        tag, priority = job if job is not None else _current_job.get()
+        day, reset = self._day_and_reset()
+
+        def check(usage: Dict[str, int]) -> float:
+            used = sum(usage.values())
+            if used + calls > self.daily_limit:
+                raise QuotaExceededError(f"daily quota of {self.daily_limit} calls is spent", tag)
+            budget = self.budgets.get(tag)
+            if budget is not None and usage.get(tag, 0) + calls > budget:
+                raise QuotaExceededError(f"budget of {budget} calls for {tag!r} is spent", tag)
+            if priority != "high" and used + calls > self.daily_limit - self.reserve:
+                raise QuotaExceededError(
+                    f"the last {self.reserve} calls are reserved for high priority work", tag)
+            if priority == "low" and used + calls > self.daily_limit * self.low_priority_threshold:
+                if self.low_priority_action == "reject":
+                    raise QuotaExceededError(
+                        f"usage is past {self.low_priority_threshold:.0%} of the daily quota; "
+                        "low priority calls are rejected", tag)
+                # A second past the reset, so the next check counts against the new day
+                return max((reset - datetime.now(self.timezone)).total_seconds(), 0) + 1
+            return 0
+
+        return self.store.check_and_increment(day, tag, calls, check)
+
+    def headroom(self) -> Dict[str, Any]:
+        """
+        Remaining calls for the current quota day, for schedulers planning bulk jobs
+
+        Returns:
+            Dict with the day, reset time, limit, used and remaining calls,
+            calls left for low and normal priority work, and per tag usage and
+            remaining budget
+        """
+        day, reset = self._day_and_reset()
+        usage = self.store.usage(day)
+        used = sum(usage.values())
+        remaining = max(self.daily_limit - used, 0)
+        tags = {}
+        for tag in set(usage) | set(self.budgets):
+            tags[tag] = {"used": usage.get(tag, 0)}
+            if tag in self.budgets:
+                tags[tag]["budget"] = self.budgets[tag]
+                tags[tag]["remaining"] = max(min(self.budgets[tag] - usage.get(tag, 0), remaining), 0)
+        return {
+            "day": day,
+            "resets_at": reset.isoformat(),
+            "limit": self.daily_limit,
+            "used": used,
+            "remaining": remaining,
+            "low_priority_remaining": max(int(self.daily_limit * self.low_priority_threshold) - used, 0),
+            "normal_priority_remaining": max(self.daily_limit - self.reserve - used, 0),
+            "tags": tags
+        }
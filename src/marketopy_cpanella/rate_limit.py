@@ -0,0 +1,77 @@
+import collections
+import threading
+import time
+from typing import Any
+
+DEFAULT_CALLS = 100
+DEFAULT_PERIOD = 20.0
+DEFAULT_MAX_CONCURRENT = 10
+
+
+class RateLimiter:
+    """
+    Client-wide governor for Marketo's rate and concurrency limits
+
+    Marketo rejects calls beyond 100 per rolling 20 seconds (error 606) and
+    beyond 10 in flight at once (error 615). The rate side is a token bucket
+    whose tokens return one at a time, period seconds after each was spent,
+    so no rolling window ever sees more than `calls` requests. The concurrency
+    side is a semaphore. One instance is shared by every sub-client of a
+    Marketo client; share it between clients that target the same subscription.
+    """
+
+    def __init__(self, calls: int = DEFAULT_CALLS, period: float = DEFAULT_PERIOD,
+                 max_concurrent: int = DEFAULT_MAX_CONCURRENT):
+        """
+        Initialize the limiter
+
+        Args:
+            calls: Calls allowed per rolling window
+            period: Length of the rolling window in seconds
+            max_concurrent: Calls allowed in flight at once
+        """
+        if calls < 1 or max_concurrent < 1:
+            raise ValueError("calls and max_concurrent must be at least 1")
+        self.calls = calls
+        self.period = period
+        self.max_concurrent = max_concurrent
+        self._spent = collections.deque()
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+
+    def reserve(self) -> float:
+        """
+        Reserve the next call slot in the rolling window
+
+        Returns:
+            Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = now
+            if len(self._spent) >= self.calls:
+                start = max(now, self._spent.popleft() + self.period)
+            self._spent.append(start)
+            return start - now
+
+    def acquire(self) -> None:
+        """Block until a concurrency slot and a rate slot are both available"""
+        self._semaphore.acquire()
+        try:
+            delay = self.reserve()
+            if delay > 0:
+                time.sleep(delay)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self) -> None:
+        """Return the concurrency slot taken by acquire"""
+        self._semaphore.release()
+
+    def __enter__(self) -> "RateLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
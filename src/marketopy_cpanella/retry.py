@@ -0,0 +1,108 @@
+import random
+import threading
+from typing import Any, Dict, Optional
+
+TOKEN_ERROR_CODES = frozenset(["601", "602"])
+THROTTLE_ERROR_CODES = frozenset(["606", "615"])
+QUEUE_ERROR_CODES = frozenset(["1029"])
+RETRYABLE_ERROR_CODES = TOKEN_ERROR_CODES | THROTTLE_ERROR_CODES | QUEUE_ERROR_CODES
+
+
+class RetryStats:
+    """Thread-safe counters for retries driven by Marketo soft errors"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries: Dict[str, int] = {}
+        self.wait_seconds: Dict[str, float] = {}
+        self.exhausted: Dict[str, int] = {}
+
+    def record_retry(self, code: str, delay: float) -> None:
+        with self._lock:
+            self.retries[code] = self.retries.get(code, 0) + 1
+            self.wait_seconds[code] = self.wait_seconds.get(code, 0.0) + delay
+
+    def record_exhausted(self, code: str) -> None:
+        with self._lock:
+            self.exhausted[code] = self.exhausted.get(code, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of the counters, keyed by Marketo error code"""
+        with self._lock:
+            return {
+                "total_retries": sum(self.retries.values()),
+                "total_wait_seconds": sum(self.wait_seconds.values()),
+                "retries": dict(self.retries),
+                "wait_seconds": dict(self.wait_seconds),
+                "exhausted": dict(self.exhausted)
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.retries.clear()
+            self.wait_seconds.clear()
+            self.exhausted.clear()
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to re-drive a call that failed with a Marketo soft error
+
+    Marketo reports most failures as HTTP 200 with success false and an errors
+    array. 601/602 (invalid or expired token) are retried at once after the
+    token is refreshed, 606/615 (rate and concurrency limits) back off
+    exponentially with jitter, and 1029 (bulk queue full) backs off on a slower
+    schedule since queue slots free up in minutes rather than seconds.
+    """
+
+    def __init__(self, max_retries: int = 5, backoff_base: float = 1.0,
+                 backoff_max: float = 20.0, queue_backoff_base: float = 10.0,
+                 queue_backoff_max: float = 120.0):
+        """
+        Initialize the policy
+
+        Args:
+            max_retries: Maximum retries per call before the error response is returned
+            backoff_base: First backoff in seconds for 606/615
+            backoff_max: Upper bound in seconds for a single 606/615 backoff
+            queue_backoff_base: First backoff in seconds for 1029
+            queue_backoff_max: Upper bound in seconds for a single 1029 backoff
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_backoff_base = queue_backoff_base
+        self.queue_backoff_max = queue_backoff_max
+        self.stats = RetryStats()
+
+    @staticmethod
+    def retryable_code(response: Any) -> Optional[str]:
+        """
+        Get the first retryable error code from a response body
+
+        Args:
+            response: Decoded response body
+        """
+        if not isinstance(response, dict) or response.get("success", True):
+            return None
+        for error in response.get("errors") or ():
+            code = str(error.get("code", ""))
+            if code in RETRYABLE_ERROR_CODES:
+                return code
+        return None
+
+    def delay(self, code: str, attempt: int) -> float:
+        """
+        Seconds to wait before retry number attempt (starting at 0) for an error code
+
+        Uses equal jitter: half the exponential backoff is fixed and half is random,
+        which spreads out parallel workers without retrying immediately.
+        """
+        if code in TOKEN_ERROR_CODES:
+            return 0.0
+        if code in QUEUE_ERROR_CODES:
+            base, cap = self.queue_backoff_base, self.queue_backoff_max
+        else:
+            base, cap = self.backoff_base, self.backoff_max
+        backoff = min(cap, base * (2 ** attempt))
+        return backoff / 2 + random.uniform(0, backoff / 2)
@@ -1,9 +1,10 @@
-from typing import Dict, Any, List, Optional
-from .base import MarketoBase
+from typing import Dict, Any, List, Optional, Iterator
+from .base import MarketoBase, sync_only
+from .pagination import iter_token_records
 
 class SalesPersons(MarketoBase):
-    def __init__(self, auth):
-        super().__init__(auth)
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
         self.base_endpoint = "v1/salespersons"
 
     def get_sales_persons(self, batch_size: Optional[int] = None,
@@ -23,6 +24,20 @@ class SalesPersons(MarketoBase):
             
         return self._get(f"{self.base_endpoint}.json", params=params)
 
+    @sync_only
+    def iter_sales_persons(self, batch_size: Optional[int] = None,
+                           prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every sales person across all pages
+        
+        Args:
+            batch_size: Number of records to request per page
+            prefetch: Fetch the next page while the current one is being consumed
+        """
+        return iter_token_records(
+            lambda token: self.get_sales_persons(batch_size, token),
+            prefetch=prefetch)
+
     def get_sales_person_by_id(self, sales_person_id: int) -> Dict[str, Any]:
         """
         Get a specific sales person
@@ -0,0 +1,158 @@
+import threading
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Union
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .metadata_cache import MetadataCache
+from .lead_cache import LeadCache
+from .hooks import Hooks
+from .codec import JSONCodec, get_codec
+
+if TYPE_CHECKING:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from .quota import QuotaGovernor
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class MarketoSession:
+    """
+    Pooled, keep-alive HTTP session shared by every sub-client of a Marketo instance
+
+    All threads send through one HTTPAdapter, so connections to the
+    {munchkin}.mktorest.com host are reused across calls and across threads.
+    Each thread gets its own requests.Session on top of that adapter, which
+    keeps per-session state such as cookies from being mutated concurrently.
+
+    requests is imported and the adapter is built on the first request, so
+    creating a session costs no imports and no network I/O.
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 status_forcelist: Iterable[int] = RETRY_STATUS_CODES,
+                 pool_block: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 metadata_cache: Optional[MetadataCache] = None,
+                 codec: Union[None, str, JSONCodec] = None,
+                 lead_cache: Optional[LeadCache] = None,
+                 hooks: Optional[Hooks] = None,
+                 quota: Optional["QuotaGovernor"] = None):
+        """
+        Initialize the session
+
+        Args:
+            pool_connections: Number of host pools to cache
+            pool_maxsize: Maximum number of keep-alive connections per host
+            max_retries: Retries for connection errors and retryable HTTP statuses
+            backoff_factor: Exponential backoff factor between transport retries
+            status_forcelist: HTTP status codes that trigger a transport retry
+            pool_block: Block when the pool is exhausted instead of opening
+                        throwaway connections
+            rate_limiter: Governor applied to every API call; defaults to
+                          Marketo's 100 calls/20s and 10 concurrent calls
+            retry_policy: Policy for re-driving Marketo soft errors such as 606
+            metadata_cache: Cache for schema responses shared by every sub-client;
+                            schema calls are not cached when None
+            codec: JSON codec for request and response bodies, or the name of one
+                   ("orjson", "msgspec", "json"); defaults to the fastest installed
+            lead_cache: Read-through cache for single-lead lookups by ID and
+                        email; lookups are not cached when None
+            hooks: Request instrumentation hooks; a new empty set when None
+            quota: Daily quota governor counting every call; calls are not
+                   counted when None
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = tuple(status_forcelist)
+        self.pool_block = pool_block
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.metadata_cache = metadata_cache
+        self._codec = codec
+        self.lead_cache = lead_cache
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.quota = quota
+        self._adapter: Optional["HTTPAdapter"] = None
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @property
+    def codec(self) -> JSONCodec:
+        """The JSON codec, resolved on first use so construction imports nothing"""
+        if not isinstance(self._codec, JSONCodec):
+            self._codec = get_codec(self._codec)
+        return self._codec
+
+    @property
+    def adapter(self) -> "HTTPAdapter":
+        """The pooled transport adapter, built on first use"""
+        if self._adapter is None:
+            with self._lock:
+                if self._adapter is None:
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+                    retry = Retry(
+                        total=self.max_retries,
+                        connect=self.max_retries,
+                        read=self.max_retries,
+                        status=self.max_retries,
+                        backoff_factor=self.backoff_factor,
+                        status_forcelist=self.status_forcelist,
+                        raise_on_status=False
+                    )
+                    self._adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        max_retries=retry,
+                        pool_block=self.pool_block
+                    )
+        return self._adapter
+
+    def _session(self) -> "requests.Session":
+        """Get the requests.Session bound to the calling thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            adapter = self.adapter
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a request over the shared connection pool"""
+        return self._session().request(method=method, url=url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a GET request over the shared connection pool"""
+        return self.request("GET", url, **kwargs)
+
+    def close(self) -> None:
+        """Close every thread's session and release pooled connections"""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        if self._adapter is not None:
+            self._adapter.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "MarketoSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,105 @@
+"""
+Shared fixtures: an in-process fake Marketo, clients pointed at it, and a
+scripted transport for exact response sequences
+"""
+import json
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+import requests
+
+from fake_marketo import FakeMarketo
+from marketopy_cpanella import Marketo, RetryPolicy
+
+TOKEN_PATH = ("/identity/oauth/token?grant_type=client_credentials"
+              "&client_id={1}&client_secret={2}")
+
+SUB_CLIENTS = ["lead_database", "activities", "program_members", "companies",
+               "custom_objects", "bulk_extract", "bulk_import"]
+
+
+def point_at(client: Any, url: str) -> Any:
+    """Send a client's token and API calls to url"""
+    client.auth.auth_url = url + TOKEN_PATH
+    for name in SUB_CLIENTS:
+        if hasattr(type(client), name):
+            getattr(client, name).base_url = url + "/rest"
+    return client
+
+
+@pytest.fixture
+def fake() -> Iterator[FakeMarketo]:
+    with FakeMarketo(leads=2000, activities=1000, program_members=1000) as server:
+        yield server
+
+
+@pytest.fixture
+def connect(fake: FakeMarketo) -> Iterator[Callable[..., Marketo]]:
+    """Build Marketo clients against the fake server, closed after the test"""
+    clients: List[Marketo] = []
+
+    def build(**kwargs: Any) -> Marketo:
+        kwargs.setdefault("retry_policy", RetryPolicy(backoff_base=0.01, backoff_max=0.05))
+        marketo = point_at(Marketo("000-AAA-000", "client", "secret", **kwargs), fake.url)
+        clients.append(marketo)
+        return marketo
+
+    yield build
+    for marketo in clients:
+        marketo.close()
+
+
+@pytest.fixture
+def marketo(connect: Callable[..., Marketo]) -> Marketo:
+    return connect()
+
+
+class ScriptedTransport:
+    """
+    Stands in for MarketoSession.request: issues numbered tokens and answers
+    API calls with the queued bodies in order, recording what was sent
+    """
+
+    def __init__(self):
+        self.bodies: List[Any] = []
+        self.sent: List[requests.PreparedRequest] = []
+        self.tokens = 0
+
+    def __call__(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        if "/identity/oauth/token" in url:
+            self.tokens += 1
+            return self._response(method, url, {"access_token": f"token-{self.tokens}",
+                                                "expires_in": 3600})
+        kwargs.pop("stream", None)
+        request = requests.Request(method, url, **kwargs).prepare()
+        self.sent.append(request)
+        body = self.bodies.pop(0)
+        if isinstance(body, Exception):
+            raise body
+        return self._response(method, url, body, request)
+
+    @staticmethod
+    def _response(method: str, url: str, body: Dict[str, Any],
+                  request: Any = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(body).encode("utf-8")
+        response.headers["Content-Type"] = "application/json;charset=UTF-8"
+        response.headers["Content-Length"] = str(len(response._content))
+        response.request = request if request is not None else requests.Request(method, url).prepare()
+        return response
+
+
+@pytest.fixture
+def scripted(monkeypatch: pytest.MonkeyPatch) -> Callable[..., Any]:
+    """Build a Marketo client whose calls are answered by a ScriptedTransport"""
+    def build(**kwargs: Any) -> Any:
+        kwargs.setdefault("retry_policy", RetryPolicy(backoff_base=0.01, backoff_max=0.02,
+                                                      queue_backoff_base=0.01,
+                                                      queue_backoff_max=0.02))
+        marketo = Marketo("000-AAA-000", "client", "secret", **kwargs)
+        transport = ScriptedTransport()
+        monkeypatch.setattr(marketo.session, "request", transport)
+        return marketo, transport
+
+    return build
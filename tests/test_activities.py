@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+
+from fake_marketo import ACTIVITY_EPOCH
+
+
+@pytest.mark.parametrize("shards, ordered", [(1, True), (6, True), (7, False), (40, False)])
+def test_backfill_shards_cover_the_range_without_gaps_or_overlap(marketo, fake, shards, ordered):
+    since, until = ACTIVITY_EPOCH + timedelta(seconds=15), ACTIVITY_EPOCH + timedelta(seconds=995)
+    activities = list(marketo.activities.backfill_activities(
+        since, until, [1, 2], shards=shards, ordered=ordered))
+
+    ids = [activity["id"] for activity in activities]
+    # Activity N is dated N-1 seconds after the epoch
+    assert sorted(ids) == list(range(16, 996))
+    if ordered:
+        assert ids == sorted(ids)
+
+
+def test_backfill_reads_each_shard_from_its_own_start(marketo, fake):
+    list(marketo.activities.backfill_activities(
+        ACTIVITY_EPOCH, ACTIVITY_EPOCH + timedelta(seconds=900), [1], shards=3))
+    # 300 activities per shard: one full page each, plus the page that crosses the boundary
+    assert fake.stats["calls"] == 3 + 3 * 2
+
+
+def test_stream_activities_starts_at_since(marketo):
+    activities = list(marketo.activities.stream_activities("2024-01-01T00:15:00Z", range(1, 15)))
+    assert [activity["id"] for activity in activities] == \
+        sorted(activity["id"] for activity in activities)
+    assert activities[0]["activityDate"] == "2024-01-01T00:15:00Z"
+
+
+ACTIVITY_TYPES = {"success": True, "result": [
+    {"id": 1, "name": "Visit Webpage", "primaryAttribute": {"name": "Webpage ID", "dataType": "integer"},
+     "attributes": [{"name": "Client IP Address", "dataType": "string"},
+                    {"name": "Score", "dataType": "integer"},
+                    {"name": "Is Mobile", "dataType": "boolean"},
+                    {"name": "Visited At", "dataType": "datetime"}]},
+]}
+
+
+def test_decode_flattens_and_converts_attributes(scripted):
+    marketo, transport = scripted()
+    transport.bodies = [ACTIVITY_TYPES]
+    activities = [
+        {"id": 7, "activityTypeId": 1, "primaryAttributeValue": "42",
+         "attributes": [{"name": "Client IP Address", "value": "127.0.0.1"},
+                        {"name": "Score", "value": "12"},
+                        {"name": "Is Mobile", "value": "true"},
+                        {"name": "Visited At", "value": "2024-01-01T00:00:00Z"}]},
+        {"id": 8, "activityTypeId": 99, "attributes": [{"name": "Score", "value": "3"}]},
+    ]
+    known, unknown = marketo.activities.decode_activities(activities)
+
+    assert known == {"id": 7, "activityTypeId": 1, "primaryAttributeValue": "42",
+                     "activityType": "Visit Webpage", "Webpage ID": "42",
+                     "Client IP Address": "127.0.0.1", "Score": 12, "Is Mobile": True,
+                     "Visited At": "2024-01-01T00:00:00Z"}
+    # An unknown type keeps its attributes as received
+    assert unknown == {"id": 8, "activityTypeId": 99, "activityType": None, "Score": "3"}
+
+
+def test_registry_is_built_once_per_parse_dates_until_types_change(scripted):
+    marketo, transport = scripted()
+    transport.bodies = [ACTIVITY_TYPES, ACTIVITY_TYPES, {"success": True, "result": []},
+                        ACTIVITY_TYPES]
+    activities = marketo.activities
+    registry = activities.get_activity_type_registry()
+    list(activities.decode_activities([]))
+    assert activities.get_activity_type_registry() is registry
+    assert activities.get_activity_type_registry(parse_dates=True) is not registry
+    assert len(transport.sent) == 2
+
+    activities.create_custom_activity_attributes("visit", [{"name": "Referrer"}])
+    assert activities.get_activity_type_registry() is not registry
+    assert len(transport.sent) == 4
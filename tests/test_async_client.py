@@ -0,0 +1,106 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import point_at
+from fake_marketo import FakeMarketo
+from marketopy_cpanella import QuotaGovernor, RateLimiter
+
+pytest.importorskip("aiohttp")
+
+from marketopy_cpanella import AsyncMarketo  # noqa: E402
+
+
+def run(url, scenario, **kwargs):
+    async def main():
+        async with point_at(AsyncMarketo("000-AAA-000", "client", "secret", **kwargs), url) as marketo:
+            return await scenario(marketo)
+    return asyncio.run(main())
+
+
+def test_endpoint_methods_are_awaitable(fake):
+    async def scenario(marketo):
+        return await marketo.lead_database.get_leads("id", ["1", "2", "3"])
+
+    response = run(fake.url, scenario)
+    assert [lead["id"] for lead in response["result"]] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("call", [
+    lambda m: m.lead_database.iter_leads("id", ["1"]),
+    lambda m: m.lead_database.bulk_create_or_update_leads([{"email": "a@example.com"}]),
+    lambda m: m.lead_database.get_leads_columnar("id", ["1"]),
+    lambda m: m.lead_database.coalesce_lookups(),
+    lambda m: m.activities.stream_activities("2024-01-01T00:00:00Z", [1]),
+    lambda m: m.activities.get_activity_type_registry(),
+    lambda m: m.program_members.iter_program_members(1),
+])
+def test_sync_only_helpers_raise_instead_of_leaking_coroutines(fake, call):
+    async def scenario(marketo):
+        with pytest.raises(NotImplementedError, match="synchronous Marketo client"):
+            call(marketo)
+        return fake.stats["calls"]
+
+    assert run(fake.url, scenario) == 0
+
+
+def test_more_than_300_filter_values_raise(fake):
+    async def scenario(marketo):
+        with pytest.raises(NotImplementedError, match="more than 300 filter values"):
+            marketo.lead_database.get_leads("id", [str(i) for i in range(1, 401)])
+
+    run(fake.url, scenario)
+
+
+def test_no_named_account_lists_property():
+    assert not hasattr(AsyncMarketo, "named_account_lists")
+
+
+def test_deferred_low_priority_calls_do_not_hold_threads(fake):
+    quota = QuotaGovernor(daily_limit=1000, low_priority_threshold=0.0)
+
+    async def scenario(marketo):
+        async def low_priority():
+            with quota.job("backfill", "low"):
+                await marketo.lead_database.get_lead_by_id(1)
+
+        # More deferred calls than the session has threads
+        deferred = [asyncio.ensure_future(low_priority()) for _ in range(8)]
+        await asyncio.sleep(0.2)
+        started = time.perf_counter()
+        response = await asyncio.wait_for(marketo.lead_database.get_lead_by_id(2), 5)
+        elapsed = time.perf_counter() - started
+        for task in deferred:
+            task.cancel()
+        await asyncio.gather(*deferred, return_exceptions=True)
+        return response, elapsed
+
+    response, elapsed = run(fake.url, scenario, quota=quota, max_concurrent=2)
+    assert response["result"][0]["id"] == 2
+    assert elapsed < 1
+    assert quota.headroom()["tags"]["default"]["used"] == 1
+
+
+def test_package_import_does_not_load_asyncio():
+    code = "import sys, marketopy_cpanella; print('asyncio' in sys.modules)"
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    output = subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.PIPE,
+                            text=True, env=dict(os.environ, PYTHONPATH=src)).stdout
+    assert output.strip() == "False"
+
+
+def test_shared_limiter_shares_the_call_window_but_not_the_concurrency_cap():
+    shared = RateLimiter(max_concurrent=10)
+    with FakeMarketo(latency=0.05, max_concurrent=2) as server:
+        async def scenario(marketo):
+            return await asyncio.gather(*[marketo.lead_database.get_lead_by_id(i) for i in range(1, 9)])
+
+        responses = run(server.url, scenario, max_concurrent=2, rate_limiter=shared)
+        # The async client's own cap kept the fake under its limit of 2 in flight
+        assert server.stats["615"] == 0
+    assert all(response["success"] for response in responses)
+    assert len(shared._spent) == 8
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from conftest import TOKEN_PATH
+from marketopy_cpanella import Authentication
+from marketopy_cpanella.session import MarketoSession
+
+
+@pytest.fixture
+def auth(fake):
+    with MarketoSession() as session:
+        auth = Authentication("000-AAA-000", "client", "secret", session=session)
+        auth.auth_url = fake.url + TOKEN_PATH
+        yield auth
+
+
+def concurrently(count, call):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_first_calls_share_one_token_request(auth, fake):
+    tokens = concurrently(20, auth.getAuthToken)
+    assert fake.stats["tokens"] == 1
+    assert len(set(tokens)) == 1
+    assert auth.getAuthToken() == tokens[0]
+
+
+def test_expired_token_is_refreshed_once_for_every_waiting_caller(auth, fake):
+    first = auth.getAuthToken()
+    auth.expires_at = time.monotonic() - 1
+    tokens = concurrently(20, auth.getAuthToken)
+    assert fake.stats["tokens"] == 2
+    assert set(tokens) == {auth.token} and auth.token != first
+
+
+def test_token_inside_the_refresh_margin_is_refreshed_in_the_background(auth, fake):
+    first = auth.getAuthToken()
+    auth.expires_at = time.monotonic() + 30
+    # Still valid, so it is handed out while one refresh runs behind it
+    assert concurrently(10, auth.getAuthToken) == [first] * 10
+    auth._background_refresh.join()
+    assert fake.stats["tokens"] == 2
+    assert auth.getAuthToken() != first
+
+
+def test_invalidate_only_drops_the_matching_token(auth):
+    token = auth.getAuthToken()
+    auth.invalidate("a-token-another-thread-already-replaced")
+    assert auth.token == token
+    assert not auth.needs_refresh()
+    auth.invalidate(token)
+    assert auth.token is None
+    assert auth.needs_refresh()
+    assert auth.getAuthToken() != token
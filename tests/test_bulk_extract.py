@@ -0,0 +1,63 @@
+import pytest
+
+from marketopy_cpanella import MarketoError
+
+
+class FakeDownload:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def bulk_extract(marketo, monkeypatch):
+    client = marketo.bulk_extract
+    client.downloads = []
+
+    def make_request(method, endpoint, headers=None, raw=False, **kwargs):
+        client.downloads.append(headers)
+        return client.responses.pop(0)
+
+    monkeypatch.setattr(client, "_make_request", make_request)
+    return client
+
+
+def test_empty_export_is_written_without_a_request(bulk_extract, tmp_path):
+    path = str(tmp_path / "leads.csv")
+    bulk_extract.responses = []
+    assert bulk_extract.download_export("leads", "job-1", path, file_size=0) == path
+    assert open(path, "rb").read() == b""
+    assert bulk_extract.downloads == []
+
+
+def test_empty_body_without_a_size_is_written(bulk_extract, tmp_path):
+    path = str(tmp_path / "leads.csv")
+    bulk_extract.responses = [FakeDownload(b"")]
+    bulk_extract.download_export("leads", "job-1", path)
+    assert open(path, "rb").read() == b""
+
+
+def test_partial_download_resumes_with_range(bulk_extract, tmp_path):
+    path = str(tmp_path / "leads.csv")
+    with open(f"{path}.part", "wb") as f:
+        f.write(b"id,email\n")
+    bulk_extract.responses = [FakeDownload(b"1,a@example.com\n", status_code=206)]
+    bulk_extract.download_export("leads", "job-1", path, chunk_size=4, file_size=25)
+    assert open(path, "rb").read() == b"id,email\n1,a@example.com\n"
+    assert bulk_extract.downloads == [{"Range": "bytes=9-"}]
+
+
+def test_short_download_keeps_the_part_file(bulk_extract, tmp_path):
+    path = str(tmp_path / "leads.csv")
+    bulk_extract.responses = [FakeDownload(b"id,")] * 2
+    with pytest.raises(MarketoError, match="incomplete"):
+        bulk_extract.download_export("leads", "job-1", path, file_size=25, max_attempts=2)
+    assert (tmp_path / "leads.csv.part").exists()
+    assert not (tmp_path / "leads.csv").exists()
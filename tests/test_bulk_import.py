@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from marketopy_cpanella import MarketoAPIError
+from marketopy_cpanella.bulk_import import iter_csv_files
+
+FAILURES = ("email,firstName,Import Failure Reason\n"
+            "bad@,Ann,Invalid email\n"
+            "\"x@example.com\",\"Smith, Jr\",Value too long\n")
+WARNINGS = "email,firstName,Import Warning Reason\nok@example.com,Bo,Field truncated\n"
+
+
+@pytest.fixture
+def bulk_import(marketo, monkeypatch):
+    client = marketo.bulk_import
+    client.files = []
+    client.polls = {}
+
+    def submit(file, lookup_field=None, list_id=None, partition_name=None):
+        client.files.append(file)
+        if len(client.files) == 2:
+            return {"success": False, "errors": [{"code": "1016", "message": "Too many imports"}]}
+        return {"success": True, "result": [{"batchId": 100 + len(client.files), "status": "Queued"}]}
+
+    def status(batch_id):
+        client.polls[batch_id] = client.polls.get(batch_id, 0) + 1
+        if client.polls[batch_id] == 1:
+            return {"success": True, "result": [{"batchId": batch_id, "status": "Importing"}]}
+        failed = 2 if batch_id == 101 else 0
+        return {"success": True, "result": [{
+            "batchId": batch_id, "status": "Complete", "numOfLeadsProcessed": 3 - failed,
+            "numOfRowsFailed": failed, "numOfRowsWithWarning": 1 if batch_id == 103 else 0}]}
+
+    monkeypatch.setattr(client, "import_leads_file", submit)
+    monkeypatch.setattr(client, "get_leads_import_status", status)
+    monkeypatch.setattr(client, "get_leads_import_failures", lambda batch_id: FAILURES)
+    monkeypatch.setattr(client, "get_leads_import_warnings", lambda batch_id: WARNINGS)
+    return client
+
+
+def leads(count):
+    return ({"email": f"lead{i}@example.com", "firstName": "Lead"} for i in range(count))
+
+
+def test_csv_files_stay_under_the_size_limit_with_a_header_each():
+    files = list(iter_csv_files(leads(9), max_file_size=90))
+    assert len(files) == 3
+    for file in files:
+        assert len(file) <= 90
+        assert file.startswith(b"email,firstName\n")
+    assert sum(file.count(b"\n") - 1 for file in files) == 9
+
+
+def test_report_parses_failures_and_warnings(bulk_import):
+    report = bulk_import.import_leads(leads(9), max_file_size=90, poll_interval=0)
+    assert report["rowsProcessed"] == 1 + 3
+    assert report["rowsFailed"] == 2
+    assert report["rowsWithWarning"] == 1
+    assert report["failures"] == [
+        {"batchId": 101, "reason": "Invalid email", "row": {"email": "bad@", "firstName": "Ann"}},
+        {"batchId": 101, "reason": "Value too long",
+         "row": {"email": "x@example.com", "firstName": "Smith, Jr"}},
+    ]
+    assert report["warnings"] == [
+        {"batchId": 103, "reason": "Field truncated",
+         "row": {"email": "ok@example.com", "firstName": "Bo"}}]
+
+
+def test_failed_submission_keeps_the_other_batches(bulk_import):
+    report = bulk_import.import_leads(leads(9), max_file_size=90, poll_interval=0)
+    assert not report["success"]
+    by_file = {batch["file"]: batch for batch in report["batches"]}
+    assert sorted(by_file) == [1, 2, 3]
+    assert by_file[1]["batchId"] == 101
+    assert by_file[3]["batchId"] == 103
+    assert by_file[2]["status"] == "Failed"
+    assert by_file[2]["error"] == str(MarketoAPIError(
+        {"success": False, "errors": [{"code": "1016", "message": "Too many imports"}]}))
+    assert "1016: Too many imports" in by_file[2]["error"]
+    json.dumps(report)
@@ -0,0 +1,64 @@
+import time
+
+
+def slow_early_batches(lead_database, monkeypatch, fail_batch=None):
+    """Make earlier batches finish last, and optionally fail one batch as a whole"""
+    upsert = lead_database.create_or_update_leads
+
+    def delayed(chunk, **kwargs):
+        index = chunk[0]["index"]
+        time.sleep(0.05 * (5 - index // 100) if index < 500 else 0)
+        if fail_batch is not None and index // 100 == fail_batch:
+            return {"success": False, "errors": [{"code": "1003", "message": "Invalid batch"}]}
+        return upsert([{k: v for k, v in lead.items() if k != "index"} for lead in chunk], **kwargs)
+
+    monkeypatch.setattr(lead_database, "create_or_update_leads", delayed)
+
+
+def leads(count):
+    for index in range(count):
+        if index % 10 == 0:
+            yield {"index": index, "firstName": "No email"}
+        elif index % 10 == 1:
+            yield {"index": index, "id": 5000 + index}
+        else:
+            yield {"index": index, "email": f"bulk{index}@example.com"}
+
+
+def expected_status(index):
+    return {0: "skipped", 1: "updated"}.get(index % 10, "created")
+
+
+def test_results_keep_input_order_across_batches(marketo, fake, monkeypatch):
+    lead_database = marketo.lead_database
+    slow_early_batches(lead_database, monkeypatch)
+    results = list(lead_database.stream_create_or_update_leads(leads(750), batch_size=100,
+                                                               max_workers=8))
+    assert [result["status"] for result in results] == [expected_status(i) for i in range(750)]
+    assert [results[i]["id"] for i in range(1, 750, 10)] == list(range(5001, 5750, 10))
+    assert fake.stats["calls"] == 8
+
+
+def test_a_failed_batch_marks_each_of_its_leads_failed(marketo, monkeypatch):
+    lead_database = marketo.lead_database
+    slow_early_batches(lead_database, monkeypatch, fail_batch=2)
+    response = lead_database.bulk_create_or_update_leads(leads(450), batch_size=100, max_workers=4)
+
+    results = response["result"]
+    assert response["success"] is False
+    assert len(results) == 450
+    for index, result in enumerate(results):
+        if index // 100 == 2:
+            assert result == {"status": "failed",
+                              "reasons": [{"code": "1003", "message": "Invalid batch"}]}
+        else:
+            assert result["status"] == expected_status(index)
+    # Each lead gets its own copy of the failure
+    assert results[200] is not results[201]
+
+
+def test_bulk_upsert_succeeds_when_no_lead_was_skipped(marketo):
+    response = marketo.lead_database.bulk_create_or_update_leads(
+        {"email": f"ok{index}@example.com"} for index in range(301))
+    assert response["success"] is True
+    assert [result["status"] for result in response["result"]] == ["created"] * 301
@@ -0,0 +1,119 @@
+import pytest
+
+from marketopy_cpanella import FileCheckpointStore, SQLiteCheckpointStore
+from marketopy_cpanella.checkpoint import iter_checkpointed_pages
+
+PAGE_SIZE = 2
+
+
+class Chain:
+    """A nextPageToken chain over a growing list of changes, ending without a token"""
+
+    def __init__(self, dates):
+        self.records = []
+        self.fetched = []
+        self.add(dates)
+
+    def add(self, dates):
+        for date in dates:
+            self.records.append({"id": len(self.records) + 1, "activityDate": date})
+
+    def fetch(self, token):
+        self.fetched.append(token)
+        if token is None:
+            start = 0
+        elif token.startswith("since:"):
+            # Like sinceDatetime, the mark itself is included
+            since = token[len("since:"):]
+            start = next((index for index, record in enumerate(self.records)
+                          if record["activityDate"] >= since), len(self.records))
+        else:
+            start = int(token)
+        end = start + PAGE_SIZE
+        response = {"success": True, "result": self.records[start:end]}
+        if end < len(self.records):
+            response["nextPageToken"] = str(end)
+            response["moreResult"] = True
+        return response
+
+    @staticmethod
+    def start_token(high_water_mark):
+        return None if high_water_mark is None else f"since:{high_water_mark}"
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+    return SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+
+
+def ids(pages):
+    return [record["id"] for page in pages for record in page]
+
+
+def test_resume_rereads_only_the_uncommitted_page(store):
+    chain = Chain(["2024-01-0%d" % day for day in range(1, 8)])
+    pages = iter_checkpointed_pages(store, "sync", chain.fetch, chain.start_token)
+    assert ids([next(pages), next(pages)]) == [1, 2, 3, 4]
+    # The process dies while working on the second page
+    pages.close()
+
+    chain.fetched.clear()
+    resumed = list(iter_checkpointed_pages(store, "sync", chain.fetch, chain.start_token))
+    assert ids(resumed) == [3, 4, 5, 6, 7]
+    assert chain.fetched[0] == "2"
+
+
+def test_completed_chain_resumes_from_high_water_mark(store):
+    chain = Chain(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-03"])
+    assert ids(iter_checkpointed_pages(store, "sync", chain.fetch, chain.start_token)) == [1, 2, 3, 4]
+    checkpoint = store.load("sync")
+    assert checkpoint["completed"] is True
+    assert checkpoint["high_water_mark"] == "2024-01-03"
+    assert sorted(checkpoint["high_water_ids"]) == [3, 4]
+
+    # A late change at the mark and a newer one arrive before the next run
+    chain.add(["2024-01-03", "2024-01-04"])
+    chain.fetched.clear()
+    resumed = ids(iter_checkpointed_pages(store, "sync", chain.fetch, chain.start_token))
+    assert resumed == [5, 6]
+    assert chain.fetched[0] == "since:2024-01-03"
+
+    chain.fetched.clear()
+    assert ids(iter_checkpointed_pages(store, "sync", chain.fetch, chain.start_token)) == []
+    assert chain.fetched == ["since:2024-01-04"]
+
+
+def test_continuation_token_is_kept_at_the_end_of_the_chain(store):
+    responses = {
+        None: {"success": True, "result": [{"id": 1, "activityDate": "2024-01-01"}],
+               "nextPageToken": "after-1", "moreResult": False},
+        "after-1": {"success": True, "result": [{"id": 2, "activityDate": "2024-01-02"}],
+                    "nextPageToken": "after-2", "moreResult": False},
+    }
+    fetched = []
+
+    def fetch(token):
+        fetched.append(token)
+        return responses[token]
+
+    assert ids(iter_checkpointed_pages(store, "sync", fetch, lambda mark: None)) == [1]
+    assert store.load("sync")["completed"] is False
+    assert ids(iter_checkpointed_pages(store, "sync", fetch, lambda mark: None)) == [2]
+    assert fetched == [None, "after-1"]
+
+
+def test_lead_database_sync_restarts_from_the_mark(marketo, tmp_path, monkeypatch):
+    store = FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+    calls = []
+
+    def get_lead_changes(start_date, end_date, fields, batch_size, token):
+        calls.append((start_date, token))
+        return {"success": True, "result": [{"id": 7, "activityDate": "2024-03-01T00:00:00Z"}]}
+
+    lead_database = marketo.lead_database
+    monkeypatch.setattr(lead_database, "get_lead_changes", get_lead_changes)
+    assert ids(lead_database.sync_lead_changes(store, "changes", "2024-01-01T00:00:00Z")) == [7]
+    assert ids(lead_database.sync_lead_changes(store, "changes", "2024-01-01T00:00:00Z")) == []
+    assert calls == [("2024-01-01T00:00:00Z", None), ("2024-03-01T00:00:00Z", None)]
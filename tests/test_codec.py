@@ -0,0 +1,62 @@
+import pytest
+
+from marketopy_cpanella import codec
+from marketopy_cpanella.codec import JSONCodec, MsgspecCodec, OrjsonCodec, get_codec
+
+DOCUMENT = {"success": True, "result": [{"id": 1, "email": "zoë@example.com", "score": 1.5,
+                                         "unsubscribed": False, "notes": None}]}
+
+
+@pytest.mark.parametrize("codec_class, module", [
+    (JSONCodec, None), (OrjsonCodec, "orjson"), (MsgspecCodec, "msgspec")])
+def test_codecs_round_trip_to_compact_utf8_bytes(codec_class, module):
+    if module:
+        pytest.importorskip(module)
+    instance = codec_class()
+    encoded = instance.dumps(DOCUMENT)
+    assert isinstance(encoded, bytes)
+    assert b": " not in encoded and b", " not in encoded
+    assert "zoë".encode("utf-8") in encoded
+    assert instance.loads(encoded) == DOCUMENT
+    assert instance.loads(encoded.decode("utf-8")) == DOCUMENT
+
+
+def test_get_codec_falls_back_to_the_next_installed_library(monkeypatch):
+    def missing():
+        raise ImportError("not installed")
+
+    monkeypatch.setitem(codec._CODECS, "orjson", missing)
+    monkeypatch.setitem(codec._CODECS, "msgspec", missing)
+    assert type(get_codec()) is JSONCodec
+    with pytest.raises(ImportError):
+        get_codec("orjson")
+
+
+def test_get_codec_resolves_names_and_instances():
+    custom = JSONCodec()
+    assert get_codec(custom) is custom
+    assert type(get_codec("json")) is JSONCodec
+    with pytest.raises(ValueError, match="unknown JSON codec"):
+        get_codec("simplejson")
+
+
+def test_requests_and_responses_go_through_the_session_codec(connect):
+    class CountingCodec(JSONCodec):
+        def __init__(self):
+            self.dumped = []
+            self.loaded = 0
+
+        def dumps(self, obj):
+            self.dumped.append(obj)
+            return super().dumps(obj)
+
+        def loads(self, data):
+            self.loaded += 1
+            return super().loads(data)
+
+    counting = CountingCodec()
+    marketo = connect(json_codec=counting)
+    marketo.lead_database.create_or_update_leads([{"email": "new@example.com"}])
+    marketo.lead_database.get_leads("id", ["1"])
+    assert counting.dumped[0]["input"] == [{"email": "new@example.com"}]
+    assert counting.loaded == 2
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from marketopy_cpanella import ColumnarBuffer
+
+FIELD_TYPES = {"id": "integer", "score": "float", "unsubscribed": "boolean",
+               "updatedAt": "datetime", "email": "email"}
+
+
+def test_typed_columns_keep_values_and_nulls():
+    buffer = ColumnarBuffer(FIELD_TYPES).extend([
+        {"id": 1, "score": "1.5", "unsubscribed": "false", "updatedAt": "2024-01-01T00:00:00Z"},
+        {"id": "2", "score": None, "unsubscribed": True, "updatedAt": None},
+    ])
+    assert [buffer.columns[name].kind for name in ("id", "score", "unsubscribed", "updatedAt")] == \
+        ["int", "float", "bool", "datetime"]
+    assert buffer.to_pydict() == {
+        "id": [1, 2],
+        "score": [1.5, None],
+        "unsubscribed": [False, True],
+        "updatedAt": [datetime(2024, 1, 1, tzinfo=timezone.utc), None],
+    }
+
+
+@pytest.mark.parametrize("field, values", [
+    ("id", [1, None, "n/a", 4]),
+    ("score", [0.5, "high", None]),
+    ("unsubscribed", [True, None, "maybe"]),
+    ("updatedAt", ["2024-01-01T00:00:00Z", None, "yesterday"]),
+    ("updatedAt", ["2024-01-01T00:00:00Z", 1704067200, None]),
+    ("updatedAt", [["2024-01-01T00:00:00Z"], None]),
+])
+def test_a_value_that_does_not_fit_demotes_the_column(field, values):
+    buffer = ColumnarBuffer(FIELD_TYPES).extend({field: value} for value in values)
+    column = buffer.columns[field]
+    assert column.kind == "object"
+    assert buffer.to_pydict()[field] == values
+    assert column.null_count == values.count(None)
+
+
+def test_fields_seen_late_are_backfilled_with_nulls():
+    buffer = ColumnarBuffer(FIELD_TYPES, ["id"]).extend([{"id": 1}, {"id": 2, "score": 3.0}])
+    assert buffer.to_pydict() == {"id": [1, 2], "score": [None, 3.0]}
+    assert buffer.columns["score"].kind == "float"
+
+
+def test_demoted_column_converts_to_arrow_as_strings():
+    pa = pytest.importorskip("pyarrow")
+    buffer = ColumnarBuffer(FIELD_TYPES).extend(
+        [{"id": 1, "updatedAt": "2024-01-01T00:00:00Z"}, {"id": 2, "updatedAt": "soon"}])
+    table = buffer.to_arrow()
+    assert table.column("id").type == pa.int64()
+    assert table.column("updatedAt").to_pylist() == ["2024-01-01T00:00:00Z", "soon"]
+
+
+def test_get_leads_columnar_types_fields_from_describe(marketo, monkeypatch):
+    describe = {"success": True, "result": [
+        {"dataType": "integer", "rest": {"name": "id"}},
+        {"dataType": "email", "rest": {"name": "email"}},
+        {"dataType": "datetime", "rest": {"name": "updatedAt"}},
+    ]}
+    monkeypatch.setattr(marketo.lead_database, "describe", lambda: describe)
+    buffer = marketo.lead_database.get_leads_columnar(
+        "id", [str(i) for i in range(1, 351)], ["id", "email", "updatedAt"])
+
+    assert len(buffer) == 350
+    assert buffer.columns["id"].kind == "int"
+    assert buffer.columns["updatedAt"].kind == "datetime"
+    columns = buffer.to_pydict()
+    assert columns["id"] == list(range(1, 351))
+    assert columns["email"][0] == "lead1@example.com"
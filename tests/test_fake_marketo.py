@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+import requests
+
+from bench_throughput import SCENARIOS, run_once
+from fake_marketo import FakeMarketo
+
+
+def get_token(server):
+    return requests.get(server.url + "/identity/oauth/token").json()["access_token"]
+
+
+def call(server, token, path="/rest/v1/leads/1.json", **kwargs):
+    method = "POST" if "json" in kwargs or "data" in kwargs else "GET"
+    return requests.request(method, server.url + path,
+                            headers={"Authorization": f"Bearer {token}"}, **kwargs).json()
+
+
+def test_calls_need_an_issued_token(fake):
+    assert call(fake, "made-up")["errors"][0]["code"] == "601"
+    token = get_token(fake)
+    assert call(fake, token)["result"][0]["email"] == "lead1@example.com"
+    assert (fake.stats["calls"], fake.stats["601"], fake.stats["tokens"]) == (2, 1, 1)
+
+
+def test_calls_past_the_rolling_window_get_606():
+    with FakeMarketo(rate_calls=3, rate_period=60) as server:
+        token = get_token(server)
+        codes = [call(server, token).get("errors", [{}])[0].get("code") for _ in range(5)]
+    assert codes == [None, None, None, "606", "606"]
+
+
+def test_calls_past_the_concurrency_limit_get_615():
+    with FakeMarketo(latency=0.3, max_concurrent=2) as server:
+        token = get_token(server)
+        barrier = threading.Barrier(4)
+        responses = []
+
+        def send():
+            barrier.wait()
+            responses.append(call(server, token))
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sum(response["success"] for response in responses) <= 2
+    assert server.stats["615"] >= 2
+
+
+def test_upserts_report_created_updated_and_skipped(fake):
+    token = get_token(fake)
+    payload = {"input": [{"email": "new@example.com"}, {"email": "new@example.com"},
+                         {"id": 7}, {"firstName": "No email"}]}
+    result = call(fake, token, "/rest/v1/leads.json", json=payload)["result"]
+    assert [entry["status"] for entry in result] == ["created", "updated", "updated", "skipped"]
+    assert result[0]["id"] == result[1]["id"] == 2001
+    too_many = call(fake, token, "/rest/v1/leads.json", json={"input": [{}] * 301})
+    assert too_many["errors"][0]["code"] == "1003"
+
+
+def test_filtered_reads_page_and_accept_post_with_method_get(fake):
+    token = get_token(fake)
+    values = ",".join(str(i) for i in range(1, 251))
+    first = call(fake, token, "/rest/v1/leads.json", data={"filterType": "id", "filterValues": values,
+                                                          "batchSize": "200"},
+                 params={"_method": "GET"})
+    assert len(first["result"]) == 200
+    second = call(fake, token, "/rest/v1/leads.json",
+                  params={"filterType": "id", "filterValues": values,
+                          "nextPageToken": first["nextPageToken"]})
+    assert [lead["id"] for lead in second["result"]] == list(range(201, 251))
+    assert "nextPageToken" not in second
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_benchmark_scenarios_run(scenario):
+    result = run_once(scenario, latency=0.0, records=600, trace_memory=False)
+    assert result["records"] > 0 and result["calls"] > 0
+    if scenario == "throttled_upserts":
+        assert result["retries"] > 0 and result["throttled"] > 0
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+import requests
+
+from marketopy_cpanella import RateLimiter, RetryPolicy
+
+
+def record(marketo):
+    events = {"before_request": [], "after_response": [], "on_error": []}
+    for name, received in events.items():
+        marketo.hooks.subscribe(name, received.append)
+    return events
+
+
+def test_event_describes_the_sent_request_and_its_response(scripted):
+    marketo, transport = scripted()
+    events = record(marketo)
+    response = {"requestId": "b#2", "success": True, "result": [{"id": 9, "status": "created"}]}
+    transport.bodies = [response]
+    marketo.lead_database.create_or_update_leads([{"email": "new@example.com"}])
+
+    (event,) = events["after_response"]
+    assert events["before_request"] == [event]
+    assert events["on_error"] == []
+    assert event.method_name == "LeadDatabase.create_or_update_leads"
+    assert (event.http_method, event.attempt, event.status_code) == ("POST", 0, 200)
+    assert event.url.endswith("/rest/v1/leads.json")
+    assert event.request_id == "b#2"
+    assert event.success is True and event.will_retry is False and event.error_codes == []
+    assert event.bytes_sent == len(transport.sent[0].body) > 0
+    assert event.bytes_received == len(json.dumps(response))
+    assert event.queue_seconds >= 0 and event.elapsed >= 0
+
+
+def test_queue_seconds_is_the_wait_for_the_rate_limiter(connect):
+    marketo = connect(rate_limiter=RateLimiter(calls=1, period=0.3))
+    events = record(marketo)
+    marketo.lead_database.get_lead_by_id(1)
+    marketo.lead_database.get_lead_by_id(2)
+    first, second = events["after_response"]
+    assert first.queue_seconds < 0.1
+    assert 0.2 <= second.queue_seconds < 1.0
+    assert second.elapsed < second.queue_seconds
+
+
+def test_method_name_is_the_public_method_behind_the_request(marketo):
+    events = record(marketo)
+    list(marketo.lead_database.iter_leads("id", [str(i) for i in range(1, 400)]))
+    marketo.lead_database.get_lead_by_id(1)
+    marketo.program_members.get_program_members(1000)
+    assert [event.method_name for event in events["after_response"]] == [
+        "LeadDatabase.get_leads", "LeadDatabase.get_leads", "LeadDatabase.get_lead_by_id",
+        "ProgramMembers.get_program_members"]
+
+
+def test_soft_errors_are_reported_with_whether_they_are_retried(scripted):
+    marketo, transport = scripted(retry_policy=RetryPolicy(max_retries=1, backoff_base=0.001,
+                                                           backoff_max=0.001))
+    events = record(marketo)
+    failed = {"requestId": "a#1", "success": False, "errors": [{"code": "606", "message": "rate"}]}
+    transport.bodies = [failed, failed]
+    marketo.lead_database.get_lead_by_id(1)
+
+    first, last = events["after_response"]
+    assert events["on_error"] == [first, last]
+    assert (first.attempt, first.will_retry, first.success) == (0, True, False)
+    assert (last.attempt, last.will_retry, last.success) == (1, False, False)
+    assert first.error_codes == ["606"] and first.request_id == "a#1"
+
+    transport.bodies = [{"success": True, "result": []}]
+    marketo.lead_database.get_lead_by_id(1)
+    assert len(events["on_error"]) == 2
+
+
+def test_exceptions_are_reported_to_on_error_only(scripted):
+    marketo, transport = scripted()
+    events = record(marketo)
+    transport.bodies = [requests.ConnectionError("connection reset")]
+    with pytest.raises(requests.ConnectionError):
+        marketo.lead_database.get_lead_by_id(1)
+
+    (event,) = events["on_error"]
+    assert events["after_response"] == []
+    assert isinstance(event.exception, requests.ConnectionError)
+    assert event.success is False and event.status_code is None
+    assert event.queue_seconds is not None and event.elapsed is not None
+
+
+def test_before_request_can_veto_a_call_and_unsubscribed_hooks_go_quiet(scripted):
+    marketo, transport = scripted()
+
+    def veto(event):
+        raise PermissionError(event.method_name)
+
+    marketo.hooks.before_request(veto)
+    with pytest.raises(PermissionError, match="LeadDatabase.get_lead_by_id"):
+        marketo.lead_database.get_lead_by_id(1)
+    assert transport.sent == []
+
+    marketo.hooks.unsubscribe("before_request", veto)
+    assert not marketo.hooks.active
+    transport.bodies = [{"success": True, "result": []}]
+    assert marketo.lead_database.get_lead_by_id(1)["success"]
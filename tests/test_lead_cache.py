@@ -0,0 +1,74 @@
+from marketopy_cpanella import LeadCache
+
+MUNCHKIN_ID = "000-AAA-000"
+LEAD = {"id": 5, "email": "lead5@example.com"}
+
+
+def found(*leads):
+    return {"success": True, "result": [dict(lead) for lead in leads]}
+
+
+def test_invalidating_by_email_drops_the_id_entry_too():
+    cache = LeadCache()
+    cache.put(MUNCHKIN_ID, "id", 5, found(LEAD))
+    cache.put(MUNCHKIN_ID, "email", "Lead5@Example.com", found(LEAD))
+    cache.invalidate(MUNCHKIN_ID, emails=["LEAD5@example.com"])
+    assert cache.get(MUNCHKIN_ID, "id", 5) is None
+    assert cache.get(MUNCHKIN_ID, "email", "lead5@example.com") is None
+    assert len(cache) == 0
+
+
+def test_load_overtaken_by_a_write_is_not_cached():
+    cache = LeadCache()
+
+    def load():
+        # The write lands after Marketo answered but before the response is cached
+        cache.invalidate(MUNCHKIN_ID, lead_ids=[5])
+        return found(LEAD)
+
+    assert cache.get_or_load(MUNCHKIN_ID, "id", 5, load)["result"] == [LEAD]
+    assert cache.get(MUNCHKIN_ID, "id", 5) is None
+
+
+def test_write_by_id_discards_an_email_lookup_in_flight():
+    cache = LeadCache()
+
+    def load():
+        cache.invalidate(MUNCHKIN_ID, lead_ids=[5])
+        return found(LEAD)
+
+    cache.get_or_load(MUNCHKIN_ID, "email", "lead5@example.com", load)
+    assert cache.get(MUNCHKIN_ID, "email", "lead5@example.com") is None
+
+
+def test_unrelated_write_during_a_load_keeps_it_cached():
+    cache = LeadCache()
+
+    def load():
+        cache.invalidate(MUNCHKIN_ID, lead_ids=[6], emails=["lead6@example.com"])
+        return found(LEAD)
+
+    cache.get_or_load(MUNCHKIN_ID, "id", 5, load)
+    assert cache.get(MUNCHKIN_ID, "id", 5)["result"] == [LEAD]
+    assert cache.get_or_load(MUNCHKIN_ID, "id", 5, lambda: found()) == found(LEAD)
+
+
+def test_client_writes_invalidate_cached_lookups(connect, monkeypatch):
+    cache = LeadCache()
+    marketo = connect(lead_cache=cache)
+    lead_database = marketo.lead_database
+    lookups = []
+
+    def get(endpoint, params=None):
+        lookups.append(params["email"])
+        return found(LEAD)
+
+    monkeypatch.setattr(lead_database, "_get", get)
+    lead_database.get_lead_by_email("lead5@example.com")
+    lead_database.get_lead_by_email("lead5@example.com")
+    assert lookups == ["lead5@example.com"]
+
+    # The write only names the ID; the cached email lookup of that lead goes too
+    lead_database.create_or_update_leads([{"id": 5, "firstName": "Changed"}], dedupe_by="id")
+    lead_database.get_lead_by_email("lead5@example.com")
+    assert lookups == ["lead5@example.com"] * 2
@@ -0,0 +1,41 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.mark.parametrize("count", [1, 300, 301, 650])
+def test_concurrent_lookups_share_one_call_per_300_keys(marketo, fake, count):
+    loader = marketo.lead_database.coalesce_lookups(window=0.5)
+    # Every fifth ID does not exist
+    lead_ids = [index if index % 5 else 5000 + index for index in range(1, count + 1)]
+    barrier = threading.Barrier(count)
+
+    def lookup(lead_id):
+        barrier.wait()
+        return marketo.lead_database.get_lead_by_id(lead_id)
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        responses = list(executor.map(lookup, lead_ids))
+
+    assert loader.calls == math.ceil(count / 300)
+    assert loader.lookups == count
+    assert fake.stats["calls"] == loader.calls
+    for lead_id, response in zip(lead_ids, responses):
+        assert response["success"]
+        if lead_id > 2000:
+            assert response["result"] == []
+        else:
+            assert [lead["id"] for lead in response["result"]] == [lead_id]
+
+
+def test_repeated_keys_share_the_lookup(marketo, fake):
+    loader = marketo.lead_database.coalesce_lookups(window=0.2)
+    futures = [loader.load_by_email("Lead7@Example.com"), loader.load_by_email("lead7@example.com"),
+               loader.load_by_id(7)]
+    results = [future.result() for future in futures]
+    assert [[lead["id"] for lead in result] for result in results] == [[7], [7], [7]]
+    assert loader.calls == 2
+    # Each caller gets its own copies
+    assert results[0][0] is not results[1][0]
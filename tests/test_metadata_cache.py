@@ -0,0 +1,97 @@
+import os
+import threading
+
+from marketopy_cpanella.metadata_cache import MetadataCache
+
+
+def count_describes(marketo, monkeypatch):
+    companies = marketo.companies
+    calls = []
+
+    def get(endpoint, params=None):
+        calls.append(endpoint)
+        return {"success": True, "result": [{"name": "Company"}]}
+
+    monkeypatch.setattr(companies, "_get", get)
+    return companies, calls
+
+
+def test_schema_calls_are_not_cached_by_default(marketo, monkeypatch):
+    assert marketo.metadata_cache is None
+    companies, calls = count_describes(marketo, monkeypatch)
+    companies.describe()
+    companies.describe()
+    assert len(calls) == 2
+
+
+def test_cache_is_opt_in_with_a_ttl(connect, monkeypatch):
+    marketo = connect(metadata_cache_ttl=60)
+    companies, calls = count_describes(marketo, monkeypatch)
+    first = companies.describe()
+    first["result"].clear()
+    assert companies.describe()["result"] == [{"name": "Company"}]
+    assert len(calls) == 1
+
+
+def test_invalidate_all_removes_persisted_subscriptions(tmp_path):
+    directory = str(tmp_path / "cache")
+    writer = MetadataCache(directory=directory)
+    writer.set("111-AAA-111", "describe", {"success": True})
+    writer.set("222-BBB-222", "describe", {"success": True})
+
+    # A later process that has only touched one subscription
+    cache = MetadataCache(directory=directory)
+    assert cache.get("111-AAA-111", "describe") == {"success": True}
+    cache.invalidate()
+    assert [name for name in os.listdir(directory) if name.endswith(".json")] == []
+    assert MetadataCache(directory=directory).get("222-BBB-222", "describe") is None
+    assert cache.get("111-AAA-111", "describe") is None
+
+
+def test_invalidate_one_key_keeps_the_rest_on_disk(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = MetadataCache(directory=directory)
+    cache.set("111-AAA-111", "describe", {"success": True})
+    cache.set("111-AAA-111", "fields", {"success": True})
+    cache.invalidate("111-AAA-111", "describe")
+    reloaded = MetadataCache(directory=directory)
+    assert reloaded.get("111-AAA-111", "describe") is None
+    assert reloaded.get("111-AAA-111", "fields") == {"success": True}
+
+
+def test_writers_merge_into_the_file_instead_of_overwriting_it(tmp_path):
+    directory = str(tmp_path / "cache")
+    first, second = MetadataCache(directory=directory), MetadataCache(directory=directory)
+    assert first.get("111-AAA-111", "describe") is None
+    assert second.get("111-AAA-111", "fields") is None
+
+    # Each process loaded the file before the other wrote to it
+    first.set("111-AAA-111", "describe", {"success": True, "result": ["describe"]})
+    second.set("111-AAA-111", "fields", {"success": True, "result": ["fields"]})
+    reloaded = MetadataCache(directory=directory)
+    assert reloaded.get("111-AAA-111", "describe")["result"] == ["describe"]
+    assert reloaded.get("111-AAA-111", "fields")["result"] == ["fields"]
+
+
+def test_readers_pick_up_changes_made_by_another_process(tmp_path):
+    directory = str(tmp_path / "cache")
+    reader, writer = MetadataCache(directory=directory), MetadataCache(directory=directory)
+    assert reader.get("111-AAA-111", "describe") is None
+    writer.set("111-AAA-111", "describe", {"success": True})
+    assert reader.get("111-AAA-111", "describe") == {"success": True}
+    writer.invalidate("111-AAA-111")
+    assert reader.get("111-AAA-111", "describe") is None
+
+
+def test_concurrent_writers_keep_every_entry(tmp_path):
+    directory = str(tmp_path / "cache")
+    caches = [MetadataCache(directory=directory) for _ in range(8)]
+    threads = [threading.Thread(target=cache.set, args=("111-AAA-111", f"key-{index}", {"n": index}))
+               for index, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    reloaded = MetadataCache(directory=directory)
+    assert [reloaded.get("111-AAA-111", f"key-{index}") for index in range(8)] == \
+        [{"n": index} for index in range(8)]
@@ -0,0 +1,37 @@
+import pytest
+
+from conftest import point_at
+from marketopy_cpanella import MarketoAPIError, MultiMarketo
+
+
+@pytest.fixture
+def multi(fake):
+    subscriptions = [
+        {"munchkin_id": "111-AAA-111", "client_id": "a", "client_secret": "a", "environment": "prod"},
+        {"munchkin_id": "222-BBB-222", "client_id": "b", "client_secret": "b"},
+    ]
+    with MultiMarketo(subscriptions) as multi:
+        for munchkin_id in multi:
+            point_at(multi[munchkin_id], fake.url)
+        yield multi
+
+
+def test_map_tags_results_and_captures_failures(multi):
+    def operation(marketo):
+        if marketo is multi["222-BBB-222"]:
+            raise MarketoAPIError({"errors": [{"code": "610", "message": "Not found"}]})
+        return marketo.lead_database.get_leads("id", ["5"])["result"][0]["id"]
+
+    results = multi.map(operation)
+    assert list(results) == ["111-AAA-111", "222-BBB-222"]
+    assert results["111-AAA-111"].result == 5
+    assert results["111-AAA-111"].environment == "prod"
+    assert not results["222-BBB-222"].ok
+    assert isinstance(results["222-BBB-222"].error, MarketoAPIError)
+
+
+def test_unknown_munchkin_id_is_rejected_before_any_call(multi, fake):
+    with pytest.raises(ValueError, match="999-ZZZ-999"):
+        multi.map(lambda marketo: marketo.lead_database.get_leads("id", ["5"]),
+                  ["111-AAA-111", "999-ZZZ-999"])
+    assert fake.stats["calls"] == 0
@@ -0,0 +1,194 @@
+import threading
+import time
+
+import pytest
+
+from conftest import point_at
+from fake_marketo import FakeMarketo
+from marketopy_cpanella import Marketo
+from marketopy_cpanella.exceptions import MarketoAPIError
+from marketopy_cpanella.pagination import (TokenStream, iter_offset_records, iter_token_records,
+                                           merge_token_streams)
+
+
+def key(record):
+    return record["key"]
+
+
+class Chain:
+    """In-memory nextPageToken chain serving fixed pages of sorted keys"""
+
+    def __init__(self, pages):
+        self.pages = [[{"key": k} for k in page] for page in pages]
+        self.fetched = 0
+
+    def __call__(self, token):
+        index = int(token or 0)
+        self.fetched += 1
+        more = index + 1 < len(self.pages)
+        return {"success": True, "result": self.pages[index], "moreResult": more,
+                "nextPageToken": str(index + 1)}
+
+
+def pages_of(keys, size):
+    return [keys[i:i + size] for i in range(0, len(keys), size)]
+
+
+def test_ordered_merge_yields_every_record_in_key_order():
+    chains = [Chain(pages_of(list(range(start, 300, 3)), 7)) for start in range(3)]
+    chains.append(Chain([[], [], [50, 150], [], [299]]))
+    merged = [key(record) for record in
+              merge_token_streams([TokenStream(chain, None) for chain in chains], key)]
+    assert merged == sorted(list(range(300)) + [50, 150, 299])
+
+
+def test_until_cuts_each_chain_and_since_lets_empty_chains_release_records():
+    dense = Chain(pages_of(list(range(100)), 10))
+    # A later shard that has not returned anything yet only holds back records from 60 on
+    empty = Chain([[]] * 5 + [[70]])
+    yielded = []
+    for record in merge_token_streams([TokenStream(dense, None, until=60),
+                                       TokenStream(empty, None, since=60)], key, max_workers=1):
+        yielded.append(key(record))
+        if len(yielded) == 1:
+            assert empty.fetched < 6
+    assert yielded == list(range(60)) + [70]
+
+
+def test_buffer_stays_bounded_while_a_chain_returns_only_empty_pages():
+    dense = Chain(pages_of(list(range(1000)), 10))
+    sparse = Chain([[]] * 200 + [[5]])
+    lock = threading.Lock()
+    yielded = 0
+    peak = 0
+
+    def tracked(chain):
+        def fetch(token):
+            nonlocal peak
+            response = chain(token)
+            with lock:
+                fetched = sum(len(page) for page in dense.pages[:dense.fetched])
+                peak = max(peak, fetched - yielded)
+            return response
+        return fetch
+
+    merged = []
+    for record in merge_token_streams([TokenStream(tracked(dense), None),
+                                       TokenStream(tracked(sparse), None)], key, max_buffered=50):
+        merged.append(key(record))
+        with lock:
+            yielded += 1
+
+    assert merged == sorted(list(range(1000)) + [5])
+    # One page over the cap at most, instead of every page the dense chain has
+    assert peak <= 60
+    assert sparse.fetched == 201
+
+
+def test_chains_ahead_of_the_watermark_are_not_read_once_the_buffer_is_full():
+    behind = Chain(pages_of(list(range(0, 100)), 10))
+    ahead = Chain(pages_of(list(range(1000, 1100)), 10))
+    streams = [TokenStream(behind, None), TokenStream(ahead, None)]
+    merged = merge_token_streams(streams, key, max_buffered=10)
+    assert key(next(merged)) == 0
+    # The first page of the chain ahead filled the buffer; only the lagging chain is read
+    while behind.fetched < 10:
+        next(merged)
+    assert ahead.fetched == 1
+    assert [key(record) for record in merged][-1] == 1099
+
+
+@pytest.mark.parametrize("total", [0, 200, 450, 1000])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_offset_windows_return_every_member_once(total, ordered):
+    with FakeMarketo(program_members=total) as server:
+        with point_at(Marketo("000-AAA-000", "client", "secret"), server.url) as marketo:
+            members = list(marketo.program_members.iter_program_members(
+                1001, max_workers=3, ordered=ordered))
+        calls = server.stats["calls"]
+
+    ids = [member["id"] for member in members]
+    assert sorted(ids) == list(range(1, total + 1))
+    if ordered:
+        assert ids == sorted(ids)
+    # Every window up to the first short one, plus at most max_workers - 1 past it
+    needed = total // 200 + 1
+    assert needed <= calls <= needed + 2
+
+
+def test_offset_windows_start_at_the_given_offset():
+    with FakeMarketo(program_members=450) as server:
+        with point_at(Marketo("000-AAA-000", "client", "secret"), server.url) as marketo:
+            members = list(iter_offset_records(
+                lambda offset, size: marketo.program_members.get_program_members(1001, size, offset),
+                max_return=100, offset=250))
+    assert [member["id"] for member in members] == list(range(251, 451))
+
+
+def prefetch_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("marketo-prefetch")]
+
+
+def test_next_page_is_fetched_while_the_current_one_is_consumed():
+    chain = Chain([[1, 2], [3, 4], [5]])
+    second_requested = threading.Event()
+
+    def fetch(token):
+        if token == "1":
+            second_requested.set()
+        return chain(token)
+
+    records = iter_token_records(fetch)
+    assert key(next(records)) == 1
+    # Requested before the caller has asked for anything past the first page
+    assert second_requested.wait(1)
+    assert [key(record) for record in records] == [2, 3, 4, 5]
+    assert chain.fetched == 3
+
+
+def test_a_failed_prefetch_raises_once_the_earlier_pages_are_consumed():
+    chain = Chain([[1, 2], [3, 4]])
+
+    def fetch(token):
+        if token == "1":
+            return {"success": False, "errors": [{"code": "1003", "message": "bad token"}]}
+        return chain(token)
+
+    received = []
+    with pytest.raises(MarketoAPIError):
+        for record in iter_token_records(fetch):
+            received.append(key(record))
+    assert received == [1, 2]
+
+
+def test_closing_early_stops_the_prefetch_worker():
+    chain = Chain([[1], [2], [3]])
+    started, release = threading.Event(), threading.Event()
+    earlier = set(prefetch_threads())
+
+    def fetch(token):
+        if token == "1":
+            started.set()
+            release.wait(1)
+        return chain(token)
+
+    records = iter_token_records(fetch)
+    assert key(next(records)) == 1
+    assert started.wait(1)
+    records.close()
+    release.set()
+    deadline = time.monotonic() + 2
+    while set(prefetch_threads()) - earlier and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert set(prefetch_threads()) - earlier == set()
+    # The page in flight when the caller stopped is the last one requested
+    assert chain.fetched == 2
+
+
+def test_without_prefetch_pages_are_fetched_on_demand():
+    chain = Chain([[1], [2], [3]])
+    records = iter_token_records(chain, prefetch=False)
+    assert key(next(records)) == 1
+    time.sleep(0.05)
+    assert chain.fetched == 1
+    assert [key(record) for record in records] == [2, 3]
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from marketopy_cpanella import FileQuotaStore, QuotaExceededError, QuotaGovernor, SQLiteQuotaStore
+from marketopy_cpanella.quota import MemoryQuotaStore
+
+
+def test_calls_are_counted_under_their_job_tag(connect, fake):
+    quota = QuotaGovernor(daily_limit=100, budgets={"backfill": 10})
+    marketo = connect(quota=quota)
+    marketo.lead_database.get_leads("id", ["1"])
+    with quota.job("backfill", "low"):
+        marketo.lead_database.get_leads("id", ["2"])
+        marketo.lead_database.get_leads("id", ["3"])
+
+    headroom = quota.headroom()
+    assert headroom["used"] == 3 == fake.stats["calls"]
+    assert headroom["tags"]["default"] == {"used": 1}
+    assert headroom["tags"]["backfill"] == {"used": 2, "budget": 10, "remaining": 8}
+
+
+def test_spent_budget_rejects_before_sending(connect, fake):
+    quota = QuotaGovernor(daily_limit=100, budgets={"backfill": 1})
+    marketo = connect(quota=quota)
+    with quota.job("backfill"):
+        marketo.lead_database.get_leads("id", ["1"])
+        with pytest.raises(QuotaExceededError, match="backfill") as raised:
+            marketo.lead_database.get_leads("id", ["2"])
+    assert raised.value.tag == "backfill"
+    assert fake.stats["calls"] == 1
+
+
+def test_reserve_is_kept_for_high_priority_work():
+    quota = QuotaGovernor(daily_limit=3, reserve=1)
+    quota.acquire(("sync", "normal"), calls=2)
+    with pytest.raises(QuotaExceededError, match="reserved"):
+        quota.acquire(("sync", "normal"))
+    quota.acquire(("alerts", "high"))
+    with pytest.raises(QuotaExceededError, match="daily quota"):
+        quota.acquire(("alerts", "high"))
+
+
+def test_low_priority_calls_are_deferred_uncounted_past_the_threshold():
+    quota = QuotaGovernor(daily_limit=10, low_priority_threshold=0.5)
+    quota.acquire(("sync", "normal"), calls=5)
+    delay = quota.try_acquire(("backfill", "low"))
+    assert 0 < delay <= 24 * 3600 + 1
+    assert quota.headroom()["used"] == 5
+
+    rejecting = QuotaGovernor(daily_limit=10, low_priority_threshold=0.5,
+                              low_priority_action="reject", store=quota.store)
+    with pytest.raises(QuotaExceededError, match="low priority"):
+        rejecting.try_acquire(("backfill", "low"))
+
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def make_store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryQuotaStore()
+        return lambda: store
+    if request.param == "file":
+        return lambda: FileQuotaStore(str(tmp_path / "quota.json"))
+    path = str(tmp_path / "quota.db")
+    SQLiteQuotaStore(path)
+    return lambda: SQLiteQuotaStore(path)
+
+
+def test_concurrent_callers_never_overshoot_the_limit(make_store):
+    limit = 40
+    counted = []
+    rejected = []
+
+    def worker():
+        # A store per worker, as separate processes would have
+        quota = QuotaGovernor(daily_limit=limit, store=make_store())
+        for _ in range(10):
+            try:
+                quota.acquire(("sync", "normal"))
+                counted.append(1)
+            except QuotaExceededError:
+                rejected.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(counted) == limit
+    assert len(rejected) == 8 * 10 - limit
+    assert QuotaGovernor(daily_limit=limit, store=make_store()).headroom()["used"] == limit
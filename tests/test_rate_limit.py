@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from marketopy_cpanella import RateLimiter
+from marketopy_cpanella import rate_limit
+
+
+class FakeClock:
+    """monotonic and sleep for the limiter module; sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_no_rolling_window_sees_more_than_the_call_limit(clock):
+    limiter = RateLimiter()
+    sent = []
+    for _ in range(250):
+        with limiter:
+            sent.append(clock.now)
+        clock.now += 0.01
+
+    # The first 100 go out at once, then each waits for a slot 20s after an earlier call
+    assert clock.slept[0] == pytest.approx(20.0 - 100 * 0.01)
+    for index, start in enumerate(sent):
+        in_window = [moment for moment in sent[index:] if moment < start + 20.0]
+        assert len(in_window) <= 100
+    assert sent[100] == pytest.approx(sent[0] + 20.0)
+    assert sent[-1] - sent[0] == pytest.approx(40.0 + 49 * 0.01)
+
+
+def test_reserve_reports_the_wait_without_sleeping(clock):
+    limiter = RateLimiter(calls=2, period=5.0)
+    assert limiter.reserve() == 0
+    clock.now += 1.0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(4.0)
+    assert limiter.reserve() == pytest.approx(5.0)
+    assert clock.slept == []
+
+
+def test_no_more_than_max_concurrent_calls_are_in_flight():
+    limiter = RateLimiter(calls=1000, max_concurrent=10)
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def call():
+        nonlocal in_flight, peak
+        with limiter:
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 10
+
+
+def test_a_slot_is_returned_when_waiting_for_the_rate_is_interrupted(clock):
+    limiter = RateLimiter(calls=1, max_concurrent=1)
+    limiter.reserve()
+
+    def interrupted(seconds):
+        raise KeyboardInterrupt
+
+    clock.sleep = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire()
+    # The concurrency slot was given back, so a later call is not stuck
+    assert limiter._semaphore.acquire(blocking=False)
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(calls=0)
+    with pytest.raises(ValueError):
+        RateLimiter(max_concurrent=0)
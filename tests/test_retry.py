@@ -0,0 +1,70 @@
+import pytest
+
+from marketopy_cpanella import QuotaGovernor, RetryPolicy
+
+OK = {"success": True, "result": [{"id": 1}]}
+
+
+def error(code):
+    return {"success": False, "errors": [{"code": code, "message": "soft error"}]}
+
+
+def test_throttle_and_queue_errors_back_off_then_succeed(scripted):
+    marketo, transport = scripted()
+    transport.bodies = [error("606"), error("615"), error("1029"), OK]
+    assert marketo.lead_database.get_lead_by_id(1) == OK
+
+    stats = marketo.session.retry_policy.stats.as_dict()
+    assert stats["retries"] == {"606": 1, "615": 1, "1029": 1}
+    assert all(0.005 <= stats["wait_seconds"][code] <= 0.02 for code in ("606", "615", "1029"))
+    assert stats["exhausted"] == {}
+    assert len(transport.sent) == 4
+    assert transport.tokens == 1
+
+
+@pytest.mark.parametrize("code", ["601", "602"])
+def test_token_errors_drop_the_token_and_retry_at_once(scripted, code):
+    marketo, transport = scripted()
+    transport.bodies = [error(code), OK]
+    assert marketo.lead_database.get_lead_by_id(1) == OK
+
+    assert transport.tokens == 2
+    assert [request.headers["Authorization"] for request in transport.sent] == \
+        ["Bearer token-1", "Bearer token-2"]
+    assert marketo.session.retry_policy.stats.wait_seconds == {code: 0.0}
+
+
+def test_running_out_of_retries_returns_the_last_response(scripted):
+    marketo, transport = scripted(retry_policy=RetryPolicy(max_retries=2, backoff_base=0.001,
+                                                           backoff_max=0.001))
+    transport.bodies = [error("606"), error("606"), error("615"), OK]
+    assert marketo.lead_database.get_lead_by_id(1) == error("615")
+
+    stats = marketo.session.retry_policy.stats.as_dict()
+    assert stats["retries"] == {"606": 2}
+    assert stats["exhausted"] == {"615": 1}
+    assert transport.bodies == [OK]
+
+
+def test_other_errors_are_returned_without_retrying(scripted):
+    marketo, transport = scripted()
+    transport.bodies = [error("610"), OK]
+    assert marketo.lead_database.get_lead_by_id(1) == error("610")
+    assert marketo.session.retry_policy.stats.as_dict()["total_retries"] == 0
+
+
+def test_every_attempt_is_counted_against_the_quota(scripted):
+    quota = QuotaGovernor(daily_limit=100)
+    marketo, transport = scripted(quota=quota)
+    transport.bodies = [error("606"), error("601"), OK]
+    marketo.lead_database.get_lead_by_id(1)
+    assert quota.headroom()["used"] == 3
+
+
+def test_revoked_token_is_replaced_against_the_fake_server(marketo, fake):
+    marketo.lead_database.get_leads("id", ["1"])
+    fake._tokens.clear()
+    response = marketo.lead_database.get_leads("id", ["2"])
+    assert response["result"][0]["id"] == 2
+    assert fake.stats["601"] == 1
+    assert fake.stats["tokens"] == 2
@@ -0,0 +1,27 @@
+import pytest
+
+from marketopy_cpanella import Hooks, LeadCache, Marketo, RateLimiter, RetryPolicy
+from marketopy_cpanella.metadata_cache import MetadataCache
+from marketopy_cpanella.session import MarketoSession
+
+
+@pytest.mark.parametrize("setting", [
+    {"rate_limiter": RateLimiter()}, {"retry_policy": RetryPolicy()}, {"hooks": Hooks()},
+    {"lead_cache": LeadCache()}, {"metadata_cache": MetadataCache()},
+    {"metadata_cache_ttl": 60}, {"metadata_cache_dir": "/tmp/cache"}, {"json_codec": "json"},
+])
+def test_settings_held_by_a_shared_session_cannot_be_passed_alongside_it(setting):
+    with MarketoSession() as session:
+        with pytest.raises(ValueError, match=next(iter(setting))):
+            Marketo("000-AAA-000", "client", "secret", session=session, **setting)
+
+
+def test_clients_sharing_a_session_share_its_state():
+    hooks = Hooks()
+    with MarketoSession(hooks=hooks, retry_policy=RetryPolicy(max_retries=1)) as session:
+        first = Marketo("000-AAA-000", "client", "secret", session=session)
+        second = Marketo("111-BBB-111", "client", "secret", session=session, coalesce_window=0.01)
+        assert first.session is second.session is session
+        assert first.hooks is second.hooks is hooks
+        assert first.rate_limiter is second.rate_limiter is session.rate_limiter
+        assert first.lead_database.session is session
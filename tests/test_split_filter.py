@@ -0,0 +1,24 @@
+def test_large_id_lists_are_split_deduplicated_and_merged(marketo, fake):
+    values = [str(i) for i in range(1, 451)]
+    # Repeated values are sent once; "05" reaches lead 5 again from the second batch
+    values += ["7", "450", "05", "99999"]
+    response = marketo.lead_database.get_leads("id", values, batch_size=100)
+
+    assert response["success"]
+    ids = [lead["id"] for lead in response["result"]]
+    assert sorted(ids) == list(range(1, 451))
+    # Two batches of values, each read in pages of 100
+    assert fake.stats["calls"] == 3 + 2
+
+
+def test_repeated_emails_are_looked_up_once(marketo, fake):
+    emails = [f"lead{i}@example.com" for i in range(1, 302)] * 2
+    response = marketo.lead_database.get_leads("email", emails)
+    assert len(response["result"]) == 301
+    assert fake.stats["calls"] == 2
+
+
+def test_a_failed_batch_returns_its_error_response(marketo):
+    response = marketo.lead_database.get_leads("cookies", [str(i) for i in range(400)])
+    assert response["success"] is False
+    assert response["errors"][0]["code"] == "1003"
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+HEAVY_MODULES = ["requests", "urllib3", "aiohttp", "pandas", "numpy", "pyarrow"]
+
+SUB_CLIENT_MODULES = ["lead_database", "activities", "asset", "program_members", "companies",
+                      "custom_objects", "bulk_extract", "bulk_import", "async_client", "columnar"]
+
+CHILD = """
+import json, sys
+watched = {watched!r}
+loaded = lambda: sorted(name for name in watched if name in sys.modules)
+from marketopy_cpanella import Marketo
+after_import = loaded()
+marketo = Marketo("000-AAA-000", "client-id", "client-secret")
+after_construct = loaded()
+marketo.lead_database
+print(json.dumps([after_import, after_construct, loaded()]))
+"""
+
+
+def test_import_and_construction_defer_heavy_modules():
+    watched = HEAVY_MODULES + [f"marketopy_cpanella.{name}" for name in SUB_CLIENT_MODULES]
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run([sys.executable, "-c", CHILD.format(watched=watched)], env=env,
+                            check=True, stdout=subprocess.PIPE).stdout
+    after_import, after_construct, after_use = json.loads(output)
+
+    assert after_import == []
+    assert after_construct == []
+    # Touching a sub-client loads its module, and still none of the heavy dependencies
+    assert "marketopy_cpanella.lead_database" in after_use
+    assert [name for name in after_use if name in HEAVY_MODULES] == []